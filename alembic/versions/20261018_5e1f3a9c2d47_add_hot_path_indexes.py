@@ -0,0 +1,55 @@
+"""add_hot_path_indexes
+
+Revision ID: 5e1f3a9c2d47
+Revises: 0c7d11e0af04
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1f3a9c2d47'
+down_revision = '0c7d11e0af04'
+branch_labels = None
+depends_on = None
+
+# Repositories filter with `is_deleted IS false`; the partial index predicate
+# must be written the same way for the planner to prove it applies.
+NOT_DELETED = sa.text('is_deleted IS false')
+
+INDEXES = [
+    ('ix_orders_customer_id_status_id', 'orders', ['customer_id', 'status', 'id'], NOT_DELETED),
+    ('ix_orders_worker_id_status_id', 'orders', ['worker_id', 'status', 'id'], NOT_DELETED),
+    ('ix_visits_id_not_deleted', 'visits', ['id'], NOT_DELETED),
+    ('ix_users_username_not_deleted', 'users', ['username'], NOT_DELETED),
+    ('ix_users_first_name_not_deleted', 'users', ['first_name'], NOT_DELETED),
+    ('ix_users_store_id', 'users', ['store_id'], None),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,99 @@
+"""add_outbox
+
+Revision ID: 5f0c3b9e7d26
+Revises: e2b6c9d4a871
+Create Date: 2026-10-18 19:40:12.318554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5f0c3b9e7d26'
+down_revision = 'e2b6c9d4a871'
+branch_labels = None
+depends_on = None
+
+AGGREGATES = (('orders', 'order'), ('visits', 'visit'))
+
+APPEND_OUTBOX_INSERTS_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION append_outbox_inserts() RETURNS trigger AS $$ "
+    "BEGIN "
+    "INSERT INTO outbox (aggregate, aggregate_id, event, payload) "
+    "SELECT TG_ARGV[0], new_rows.id, TG_ARGV[0] || '_created', to_jsonb(new_rows) "
+    "FROM new_rows ORDER BY new_rows.id; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+APPEND_OUTBOX_UPDATES_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION append_outbox_updates() RETURNS trigger AS $$ "
+    "BEGIN "
+    "INSERT INTO outbox (aggregate, aggregate_id, event, payload) "
+    "SELECT TG_ARGV[0], new_rows.id, TG_ARGV[0] || CASE "
+    "WHEN new_rows.is_deleted AND NOT coalesce(old_rows.is_deleted, false) THEN '_deleted' "
+    "WHEN to_jsonb(new_rows) -> 'status' IS DISTINCT FROM to_jsonb(old_rows) -> 'status' THEN '_status_changed' "
+    "ELSE '_updated' END, to_jsonb(new_rows) "
+    "FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id "
+    "WHERE to_jsonb(new_rows) - 'updated_at' <> to_jsonb(old_rows) - 'updated_at' "
+    "ORDER BY new_rows.id; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+
+
+def upgrade():
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column(
+            'txid', sa.BigInteger(),
+            server_default=sa.text('CAST(CAST(pg_current_xact_id() AS text) AS bigint)'), nullable=False,
+        ),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('aggregate', sa.String(length=16), nullable=False),
+        sa.Column('aggregate_id', sa.BigInteger(), nullable=False),
+        sa.Column('event', sa.String(length=32), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_outbox_txid_id', 'outbox', ['txid', 'id'], unique=False)
+    op.create_index('ix_outbox_created_at', 'outbox', ['created_at'], unique=False)
+    op.create_table(
+        'outbox_cursors',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('event_id', sa.BigInteger(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index(op.f('ix_outbox_cursors_id'), 'outbox_cursors', ['id'], unique=False)
+
+    op.execute(APPEND_OUTBOX_INSERTS_FUNCTION)
+    op.execute(APPEND_OUTBOX_UPDATES_FUNCTION)
+    for table, aggregate in AGGREGATES:
+        op.execute(
+            f"CREATE TRIGGER {table}_append_outbox_inserts AFTER INSERT ON {table} "
+            f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION append_outbox_inserts('{aggregate}')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_append_outbox_updates AFTER UPDATE ON {table} "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION append_outbox_updates('{aggregate}')"
+        )
+
+
+def downgrade():
+    for table, _ in AGGREGATES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_append_outbox_updates ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_append_outbox_inserts ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS append_outbox_updates()")
+    op.execute("DROP FUNCTION IF EXISTS append_outbox_inserts()")
+    op.drop_index(op.f('ix_outbox_cursors_id'), table_name='outbox_cursors')
+    op.drop_table('outbox_cursors')
+    op.drop_index('ix_outbox_created_at', table_name='outbox')
+    op.drop_index('ix_outbox_txid_id', table_name='outbox')
+    op.drop_table('outbox')
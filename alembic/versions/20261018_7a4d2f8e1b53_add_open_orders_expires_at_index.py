@@ -0,0 +1,39 @@
+"""add_open_orders_expires_at_index
+
+Revision ID: 7a4d2f8e1b53
+Revises: c3d8a5e2f914
+Create Date: 2026-10-18 16:05:27.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4d2f8e1b53'
+down_revision = 'c3d8a5e2f914'
+branch_labels = None
+depends_on = None
+
+# Only orders the expiry sweeper can still cancel, so the index stays small
+# however many ended and canceled orders pile up
+OPEN_NOT_DELETED = sa.text("is_deleted IS false AND status IN ('started', 'in_process', 'awaiting')")
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_open_expires_at',
+            'orders',
+            ['expires_at'],
+            unique=False,
+            postgresql_where=OPEN_NOT_DELETED,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_open_expires_at', table_name='orders', postgresql_concurrently=True, if_exists=True)
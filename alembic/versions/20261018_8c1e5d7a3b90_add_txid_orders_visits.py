@@ -0,0 +1,95 @@
+"""add_txid_orders_visits
+
+Revision ID: 8c1e5d7a3b90
+Revises: 5f0c3b9e7d26
+Create Date: 2026-10-18 21:12:40.517093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e5d7a3b90'
+down_revision = '5f0c3b9e7d26'
+branch_labels = None
+depends_on = None
+
+TABLES = ('orders', 'visits')
+OWNERS = ('customer_id', 'worker_id')
+
+SET_UPDATED_AT_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+    "BEGIN "
+    "NEW.updated_at := clock_timestamp(); "
+    "NEW.txid := CAST(CAST(pg_current_xact_id() AS text) AS bigint); "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql"
+)
+OLD_SET_UPDATED_AT_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+    "BEGIN NEW.updated_at := clock_timestamp(); RETURN NEW; END $$ LANGUAGE plpgsql"
+)
+
+
+def append_outbox_updates_function(ignored: str) -> str:
+    return (
+        "CREATE OR REPLACE FUNCTION append_outbox_updates() RETURNS trigger AS $$ "
+        "BEGIN "
+        "INSERT INTO outbox (aggregate, aggregate_id, event, payload) "
+        "SELECT TG_ARGV[0], new_rows.id, TG_ARGV[0] || CASE "
+        "WHEN new_rows.is_deleted AND NOT coalesce(old_rows.is_deleted, false) THEN '_deleted' "
+        "WHEN to_jsonb(new_rows) -> 'status' IS DISTINCT FROM to_jsonb(old_rows) -> 'status' THEN '_status_changed' "
+        "ELSE '_updated' END, to_jsonb(new_rows) "
+        "FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id "
+        f"WHERE to_jsonb(new_rows) - {ignored} <> to_jsonb(old_rows) - {ignored} "
+        "ORDER BY new_rows.id; "
+        "RETURN NULL; "
+        "END $$ LANGUAGE plpgsql"
+    )
+
+
+def upgrade():
+    # Existing rows are older than every running transaction, a constant
+    # default adds the column without a table rewrite
+    for table in TABLES:
+        op.add_column(table, sa.Column('txid', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+    op.execute(SET_UPDATED_AT_FUNCTION)
+    op.execute(append_outbox_updates_function("'updated_at' - 'txid'"))
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for owner in OWNERS:
+                op.create_index(
+                    f'ix_{table}_{owner}_txid_id',
+                    table,
+                    [owner, 'txid', 'id'],
+                    unique=False,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+                op.drop_index(
+                    f'ix_{table}_{owner}_updated_at_id', table_name=table, postgresql_concurrently=True, if_exists=True
+                )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for owner in OWNERS:
+                op.create_index(
+                    f'ix_{table}_{owner}_updated_at_id',
+                    table,
+                    [owner, 'updated_at', 'id'],
+                    unique=False,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+                op.drop_index(
+                    f'ix_{table}_{owner}_txid_id', table_name=table, postgresql_concurrently=True, if_exists=True
+                )
+    op.execute(append_outbox_updates_function("'updated_at'"))
+    op.execute(OLD_SET_UPDATED_AT_FUNCTION)
+    for table in TABLES:
+        op.drop_column(table, 'txid')
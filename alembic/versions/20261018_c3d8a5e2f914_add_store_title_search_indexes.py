@@ -0,0 +1,53 @@
+"""add_store_title_search_indexes
+
+Revision ID: c3d8a5e2f914
+Revises: 9b7e4c1f0a26
+Create Date: 2026-10-18 12:40:03.117850
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8a5e2f914'
+down_revision = '9b7e4c1f0a26'
+branch_labels = None
+depends_on = None
+
+NOT_DELETED = sa.text('is_deleted IS false')
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_stores_title_trgm',
+            'stores',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_with={'fastupdate': 'off'},
+            postgresql_where=NOT_DELETED,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_stores_lower_title_pattern',
+            'stores',
+            [sa.func.lower(sa.column('title')).label('lower_title')],
+            unique=False,
+            postgresql_ops={'lower_title': 'text_pattern_ops'},
+            postgresql_where=NOT_DELETED,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_stores_lower_title_pattern', table_name='stores', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_stores_title_trgm', table_name='stores', postgresql_concurrently=True, if_exists=True)
+    # pg_trgm is left installed, other objects may depend on it
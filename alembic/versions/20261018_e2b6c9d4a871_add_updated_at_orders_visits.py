@@ -0,0 +1,61 @@
+"""add_updated_at_orders_visits
+
+Revision ID: e2b6c9d4a871
+Revises: 7a4d2f8e1b53
+Create Date: 2026-10-18 18:22:51.906344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6c9d4a871'
+down_revision = '7a4d2f8e1b53'
+branch_labels = None
+depends_on = None
+
+TABLES = ('orders', 'visits')
+
+
+def upgrade():
+    op.execute(
+        "CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+        "BEGIN NEW.updated_at := clock_timestamp(); RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    for table in TABLES:
+        # now() is stable, so existing rows get it without a table rewrite
+        op.add_column(
+            table,
+            sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_set_updated_at BEFORE INSERT OR UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for owner in ('customer_id', 'worker_id'):
+                op.create_index(
+                    f'ix_{table}_{owner}_updated_at_id',
+                    table,
+                    [owner, 'updated_at', 'id'],
+                    unique=False,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for owner in ('customer_id', 'worker_id'):
+                op.drop_index(
+                    f'ix_{table}_{owner}_updated_at_id', table_name=table, postgresql_concurrently=True, if_exists=True
+                )
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}")
+        op.drop_column(table, 'updated_at')
+    op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
@@ -3,12 +3,16 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
-from api.depends import get_session
-from exceptions import AlreadyExistsException, DataValidationException
+from api.depends import get_read_session, get_session
+from core.constants import EXPORT_MEDIA_TYPES
+from core.responses import RowsJSONResponse
+from exceptions import AlreadyExistsException, DataValidationException, ServiceOverloadedException
+from schemas.order_schemas import ExportFilter
 from schemas.user_schemas import UserOut, UserIn, User, UserFilter
-from usecases.crm_usecases import create_user_usecase, get_users_usecase
+from usecases.crm_usecases import create_user_usecase, get_users_usecase, export_orders_usecase, \
+    export_visits_usecase
 
 router = APIRouter()
 
@@ -33,22 +37,61 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'message': e.message, 'error_code': e.error_code},
         )
+    except ServiceOverloadedException as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={'message': e.message, 'error_code': e.error_code},
+        )
 
 
 @router.get(
     "/get-users/",
     status_code=status.HTTP_200_OK,
-    description="List users with filter(first_name, username)",
+    description="List users with filter(first_name, username). `fields` (e.g. `username`) limits the response to those fields and `id`",
     response_model=List[UserOut]
 )
 async def get_userss(
         filters: UserFilter = Depends(),
-        db_session: Session = Depends(get_session)
+        db_session: Session = Depends(get_read_session)
 ):
     try:
-        return await get_users_usecase(db_session, filters)
+        return RowsJSONResponse(await get_users_usecase(db_session, filters), UserOut)
     except DataValidationException as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'message': e.message, 'error_code': e.error_code},
         )
+
+
+@router.get(
+    "/orders/export/",
+    status_code=status.HTTP_200_OK,
+    description="Stream orders as NDJSON or CSV, filtered by store and created_at range [created_from, created_to)",
+    response_class=StreamingResponse,
+)
+async def export_orders(
+        filters: ExportFilter = Depends(),
+        db_session: Session = Depends(get_session),
+):
+    return StreamingResponse(
+        export_orders_usecase(db_session, filters),
+        media_type=EXPORT_MEDIA_TYPES[filters.format],
+        headers={'Content-Disposition': f'attachment; filename="orders.{filters.format.value}"'},
+    )
+
+
+@router.get(
+    "/visits/export/",
+    status_code=status.HTTP_200_OK,
+    description="Stream visits as NDJSON or CSV, filtered by store and created_at range [created_from, created_to)",
+    response_class=StreamingResponse,
+)
+async def export_visits(
+        filters: ExportFilter = Depends(),
+        db_session: Session = Depends(get_session),
+):
+    return StreamingResponse(
+        export_visits_usecase(db_session, filters),
+        media_type=EXPORT_MEDIA_TYPES[filters.format],
+        headers={'Content-Disposition': f'attachment; filename="visits.{filters.format.value}"'},
+    )
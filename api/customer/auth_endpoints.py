@@ -3,11 +3,11 @@ from sqlalchemy.orm import Session
 from starlette import status
 from starlette.responses import JSONResponse
 
-from api.depends import get_session
-from exceptions import NotFoundException, AuthenticationError
-from schemas.auth_schemas import TokenSchema
-from schemas.user_schemas import UserLoginIn
-from usecases.customer_usecases import user_login_usecase
+from api.depends import get_session, get_current_user
+from exceptions import NotFoundException, AuthenticationError, ServiceOverloadedException
+from schemas.auth_schemas import TokenSchema, SuccessResponse
+from schemas.user_schemas import UserLoginIn, User
+from usecases.customer_usecases import user_login_usecase, revoke_tokens_usecase
 
 router = APIRouter()
 
@@ -38,3 +38,28 @@ async def customer_login(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"message": e.message, "error_code": e.error_code},
         )
+    except ServiceOverloadedException as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"message": e.message, "error_code": e.error_code},
+        )
+
+
+@router.post(
+    '/revoke-tokens/',
+    status_code=status.HTTP_200_OK,
+    description='Revoke every self-contained access token issued to the current user',
+    response_model=SuccessResponse,
+)
+async def revoke_tokens(
+    db_session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    try:
+        await revoke_tokens_usecase(db_session, user)
+        return SuccessResponse(message="Tokens revoked")
+    except NotFoundException as e:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"message": e.message, "error_code": e.error_code},
+        )
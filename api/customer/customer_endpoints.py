@@ -3,18 +3,24 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
-from api.depends import get_session, get_current_user, get_current_customer
-from exceptions import NotFoundException, DataValidationException, AccessDeniedException
+from api.depends import get_session, get_read_session, get_current_user, get_current_customer
+from core.constants import EVENT_STREAM_MEDIA_TYPE, NEXT_CURSOR_HEADER
+from core.pagination import encode_cursor
+from core.responses import RowsJSONResponse
+from exceptions import NotFoundException, DataValidationException, AccessDeniedException, \
+    InvalidStatusTransitionException, TimeIsUpException
 from schemas.auth_schemas import SuccessResponse
 from schemas.enums import OrderStatusEnum
 from schemas.order_schemas import OrderOut, OrderIn, Order, OrderFilter, OrderUpdateIn, StoreOut, StoreFilter, VisitOut, \
-    VisitIn, Visit, VisitFilter, OrderUpdateStatusOut, OrderUpdateStatusIn
+    VisitIn, Visit, VisitFilter, OrderUpdateStatusOut, OrderUpdateStatusIn, OrderBulkIn, OrderBulkItemOut, \
+    SyncFilter, SyncOut
 from schemas.user_schemas import User
 from usecases.customer_usecases import create_order_usecase, get_orders_usecase, update_order_usecase, \
     delete_order_usecase, get_stores_usecase, create_visit_usecase, get_visits_usecase, delete_visit_usecase, \
-    update_order_status_usecase
+    update_order_status_usecase, create_orders_bulk_usecase, sync_usecase, \
+    stream_order_events_usecase
 
 router = APIRouter()
 
@@ -47,25 +53,76 @@ async def create_order(
         )
 
 
+@router.post(
+    '/orders/bulk/',
+    status_code=status.HTTP_200_OK,
+    description='Create many orders at once, only customer. Every item gets its own result',
+    response_model=List[OrderBulkItemOut],
+    dependencies=[Depends(get_current_customer)]
+)
+async def create_orders_bulk(
+        orders_in: OrderBulkIn,
+        db_session: Session = Depends(get_session),
+        user: User = Depends(get_current_user),
+):
+    orders = [Order(**order_in.model_dump(exclude_unset=True)) for order_in in orders_in.orders]
+
+    try:
+        return await create_orders_bulk_usecase(db_session, orders, user)
+    except DataValidationException as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={'message': e.message, 'error_code': e.error_code},
+        )
+
+
 @router.get(
     "/orders/",
     status_code=status.HTTP_200_OK,
-    description="Get orders",
+    description="Get orders, newest first. Pass the X-Next-Cursor header value as `cursor` to fetch the next page. "
+                "`fields` (e.g. `status,expires_at`) limits the response to those fields and `id`",
     response_model=List[OrderOut],
 )
 async def get_orders(
         filters: OrderFilter = Depends(),
-        db_session: Session = Depends(get_session),
+        db_session: Session = Depends(get_read_session),
         user: User = Depends(get_current_user)
 ):
     try:
-        return await get_orders_usecase(db_session, filters, user)
+        orders = await get_orders_usecase(db_session, filters, user)
     except DataValidationException as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'message': e.message, 'error_code': e.error_code},
         )
 
+    headers = {}
+    if len(orders) == filters.limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1]["id"])
+    return RowsJSONResponse(orders, OrderOut, headers=headers)
+
+
+@router.get(
+    "/orders/stream/",
+    status_code=status.HTTP_200_OK,
+    description="Server-Sent Events for orders of the current user: order_created, order_updated and "
+                "order_status_changed with the order as data. After a resync event, events were dropped: "
+                "fetch the orders again. A comment line is sent when there is nothing else to send",
+    response_class=StreamingResponse,
+)
+async def stream_orders(
+        db_session: Session = Depends(get_session),
+        user: User = Depends(get_current_user),
+):
+    # The stream may stay open for hours, do not keep the connection
+    # authentication may have taken from the pool
+    await db_session.close()
+    return StreamingResponse(
+        stream_order_events_usecase(user),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.patch(
     "/orders/{order_id}/",
@@ -112,15 +169,15 @@ async def delete_order(
 @router.get(
     "/stores/",
     status_code=status.HTTP_200_OK,
-    description="List store with filter id and title",
+    description="List store with filter id and title. `fields` (e.g. `title`) limits the response to those fields and `id`",
     response_model=List[StoreOut],
 )
 async def get_stores(
         filters: StoreFilter = Depends(),
-        db_session: Session = Depends(get_session),
+        db_session: Session = Depends(get_read_session),
 ):
     try:
-        return await get_stores_usecase(db_session, filters)
+        return RowsJSONResponse(await get_stores_usecase(db_session, filters), StoreOut)
     except DataValidationException as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -144,12 +201,17 @@ async def create_visit(
     visit.customer_id = user.id
     try:
         return await create_visit_usecase(db_session, user, visit)
+    except NotFoundException as e:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={'message': e.message, 'error_code': e.error_code},
+        )
     except AccessDeniedException as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'message': e.message, 'error_code': e.error_code},
         )
-    except DataValidationException as e:
+    except (DataValidationException, TimeIsUpException) as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={'message': e.message, 'error_code': e.error_code},
@@ -159,15 +221,15 @@ async def create_visit(
 @router.get(
     "/visits/",
     status_code=status.HTTP_200_OK,
-    description="List visits",
+    description="List visits. `fields` (e.g. `order_id,created_at`) limits the response to those fields and `id`",
     response_model=List[VisitOut]
 )
 async def get_visits(
         filters: VisitFilter = Depends(),
-        db_session: Session = Depends(get_session)
+        db_session: Session = Depends(get_read_session)
 ):
     try:
-        return await get_visits_usecase(db_session, filters)
+        return RowsJSONResponse(await get_visits_usecase(db_session, filters), VisitOut)
     except DataValidationException as e:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -214,3 +276,31 @@ async def update_order_status(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"message": e.message, "error_code": e.error_code},
         )
+    except InvalidStatusTransitionException as e:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"message": e.message, "error_code": e.error_code},
+        )
+
+
+@router.get(
+    "/sync/",
+    status_code=status.HTTP_200_OK,
+    description="Orders and visits of the current user changed since `cursor`, deleted ones as ids only. "
+                "Leave `cursor` out for the first sync, then pass the returned `cursor`. "
+                "While `has_more` is true, sync again right away",
+    response_model=SyncOut,
+)
+async def sync(
+        filters: SyncFilter = Depends(),
+        # The primary: the horizon comes from its running transactions
+        db_session: Session = Depends(get_session),
+        user: User = Depends(get_current_user)
+):
+    try:
+        return await sync_usecase(db_session, filters, user)
+    except DataValidationException as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={'message': e.message, 'error_code': e.error_code},
+        )
@@ -8,7 +8,10 @@ from jose import jwt
 from core.config import settings
 from core.constants import JWT_ALGORITHM, INVALID_AUTHENTICATION_CREDENTIALS, PERMISSION_DENIED_MESSAGE
 from exceptions import NotFoundException, StoreVisitHTTPException
+from resource_access.caches.lookup_tables import lookup_tables
+from resource_access.caches.user_caches import principal_cache, token_version_cache
 from resource_access.db_session import AsyncSessionLocal
+from resource_access.replicas import replica_router
 from resource_access.repositories.user_repos import UserRepository
 from schemas.auth_schemas import TokenPayload
 from schemas.enums import UserRoleEnum
@@ -30,6 +33,22 @@ async def get_session() -> Session:
         await session.close()
 
 
+async def get_read_session() -> Session:
+    """A replica session when one is within the allowed lag, otherwise the primary.
+
+    Only for endpoints whose usecases never write: anything that writes, or
+    reads back what it wrote, keeps using get_session.
+    """
+    session = replica_router.read_session()
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 async def get_token_data(token: str = Depends(oauth2_schema)) -> TokenPayload:
     try:
         payload = jwt.decode(
@@ -48,11 +67,20 @@ async def get_token_data(token: str = Depends(oauth2_schema)) -> TokenPayload:
 
 async def get_current_user(
     token: TokenPayload = Depends(get_token_data),
+    raw_token: str = Depends(oauth2_schema),
     db_session: Session = Depends(get_session),
 ) -> User:
+    if settings.self_contained_access_tokens and token.ver is not None:
+        return await get_user_from_token_claims(token, db_session)
+
+    cached_user = principal_cache.get(token.sub, raw_token) or lookup_tables.get_user(token.sub)
+    if cached_user:
+        return cached_user
+
     try:
         user_repo = UserRepository(db_session)
         user_from_repo = await user_repo.get_user_by_id(token.sub)
+        principal_cache.set(token.sub, raw_token, user_from_repo)
         return user_from_repo
     except NotFoundException:
         raise HTTPException(
@@ -62,6 +90,24 @@ async def get_current_user(
         )
 
 
+async def get_user_from_token_claims(token: TokenPayload, db_session: Session) -> User:
+    current_version = token_version_cache.get(token.sub)
+    try:
+        if current_version is None:
+            user_repo = UserRepository(db_session)
+            current_version = await user_repo.get_token_version(token.sub)
+    except NotFoundException:
+        current_version = None
+
+    if current_version != token.ver:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=INVALID_AUTHENTICATION_CREDENTIALS,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return User(id=token.sub, role=token.role, store_id=token.store_id)
+
+
 async def get_current_customer(
         user: User = Depends(get_current_user)
 ) -> User:
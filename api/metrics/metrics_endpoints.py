@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from middlewares import metrics_exporter, render_prometheus
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics',
+    include_in_schema=False,
+    response_class=PlainTextResponse,
+)
+async def get_metrics():
+    return PlainTextResponse(
+        render_prometheus(metrics_exporter.collect(), metrics_exporter.descriptions),
+        media_type='text/plain; version=0.0.4',
+    )
@@ -1,5 +1,5 @@
 import os
-from typing import List, Union
+from typing import Dict, List, Union
 
 from core.constants import DEV, PROD
 from pydantic import field_validator
@@ -31,6 +31,11 @@ class Settings(BaseSettings):
     refresh_token_expire_minutes: int = (
         60 * 24 * 30
     )  # 60 minutes * 24 hours * 90 days = 30 days
+    # Embed role, store_id and token_version in access tokens so requests
+    # can be authorized without loading the user from the database
+    self_contained_access_tokens: bool = False
+    token_version_cache_max_size: int = 100_000
+    token_version_cache_ttl_seconds: int = 300
     access_token_secret_key: str = 'iqjwof'
     refresh_token_secret_key: str = 'kqkwjfoi'
 
@@ -53,11 +58,93 @@ class Settings(BaseSettings):
 
     project_name: str = "StoreVisit"
     default_pagination_limit: int = 20
+    max_pagination_limit: int = 100
+    max_bulk_orders: int = 500
+    # Rows fetched per round trip from the server-side cursor of an export
+    export_fetch_size: int = 1000
+
+    # bcrypt runs in a thread pool; calls beyond max_pending are rejected
+    # instead of queueing behind a login burst
+    password_hashing_workers: int = 4
+    password_hashing_max_pending: int = 64
+
+    principal_cache_max_size: int = 10_000
+    principal_cache_ttl_seconds: int = 60
+
+    # Stores change a few times a day; writes through the repositories
+    # invalidate entries, the TTL bounds anything written out of band
+    store_cache_max_size: int = 1_000
+    store_cache_ttl_seconds: int = 600
+
+    # Each worker LISTENs for cache invalidations published by the others
+    cache_invalidation_listener: bool = True
+    cache_invalidation_reconnect_seconds: float = 5
+
+    # User and store membership tables published to a file in shared memory
+    # by one worker per host and mapped read-only by all of them
+    lookup_snapshot_enabled: bool = False
+    lookup_snapshot_path: str = "/dev/shm/store_visit_lookup.bin"
+    lookup_snapshot_check_seconds: float = 5
+    lookup_snapshot_refresh_seconds: float = 60
+
+    # With several gunicorn workers, point this at a directory shared by
+    # them (cleared before start) so /metrics reports all of them
+    metrics_multiprocess_dir: str = ""
+    metrics_flush_seconds: float = 5
+
+    # SQL statements a request may run, by route template. Over budget is
+    # logged, or raised when query_budget_strict is set (as in tests)
+    default_query_budget: int = 10
+    query_budgets: Dict[str, int] = {}
+    query_budget_strict: bool = False
+    # The same statement this many times in one request is logged as an N+1
+    n_plus_one_threshold: int = 5
+
+    # Orders past expires_at (plus the grace period) are canceled in the
+    # background by whichever worker holds the expiry advisory lock. Each
+    # run commits batches of order_expiry_batch_size, at most
+    # order_expiry_max_batches of them.
+    order_expiry_enabled: bool = True
+    order_expiry_interval_seconds: float = 30
+    order_expiry_grace_seconds: float = 0
+    order_expiry_batch_size: int = 500
+    order_expiry_max_batches: int = 100
+
+    # GET /customers/orders/stream/ pushes order events as Server-Sent
+    # Events. A comment is sent after order_stream_heartbeat_seconds of
+    # silence. A stream with order_stream_queue_size unread events gets a
+    # resync event instead of the next ones.
+    order_stream_enabled: bool = True
+    order_stream_heartbeat_seconds: float = 15
+    order_stream_queue_size: int = 100
+    order_stream_reconnect_seconds: float = 5
+
+    # Triggers append every order and visit write to the outbox table. The
+    # worker holding the relay advisory lock POSTs the events in order, in
+    # batches, to outbox_relay_url when it is set, and deletes events older
+    # than outbox_retention_seconds once they are relayed.
+    outbox_relay_enabled: bool = True
+    outbox_relay_url: str = ""
+    outbox_relay_timeout_seconds: float = 10
+    outbox_relay_interval_seconds: float = 1
+    outbox_relay_batch_size: int = 500
+    outbox_relay_max_batches: int = 20
+    outbox_retention_seconds: float = 7 * 24 * 60 * 60
+    outbox_prune_batch_size: int = 5_000
 
     async_pool_size: int = 20
     async_max_overflow: int = 10
     async_pool_recycle: int = -1
 
+    # Async URLs of streaming replicas, as a JSON list. Read-only list
+    # usecases use a replica whose measured lag is within
+    # replica_max_lag_seconds, and the primary when none is
+    replica_urls: List[str] = []
+    replica_max_lag_seconds: float = 1
+    replica_lag_check_seconds: float = 1
+    replica_pool_size: int = 20
+    replica_max_overflow: int = 10
+
     sync_pool_size: int = 5
     sync_max_overflow: int = 0
     sync_pool_recycle: int = -1
@@ -7,3 +7,26 @@ LOCAL_TIMEZONE = "Asia/Bishkek"
 
 INVALID_AUTHENTICATION_CREDENTIALS = "Could not validate credentials"
 PERMISSION_DENIED_MESSAGE = 'Access denied'
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+CACHE_INVALIDATION_CHANNEL = 'cache_invalidation'
+ORDER_EVENTS_CHANNEL = 'order_events'
+
+# pg_try_advisory_lock key electing the worker that cancels expired orders
+ORDER_EXPIRY_LOCK_KEY = 7_310_421_905
+# pg_try_advisory_lock key electing the worker that relays the outbox
+OUTBOX_RELAY_LOCK_KEY = 7_310_421_906
+# outbox_cursors row of the relay
+OUTBOX_RELAY_CURSOR = 'relay'
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = 'unmatched'
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EVENT_STREAM_MEDIA_TYPE = 'text/event-stream'
@@ -0,0 +1,39 @@
+import base64
+import json
+from typing import Dict, Tuple
+
+from exceptions import DataValidationException
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise DataValidationException("Invalid pagination cursor")
+
+
+def encode_sync_cursor(positions: Dict[str, Tuple[int, int]]) -> str:
+    """Per table, the (txid, id) of the last change the client has."""
+    payload = json.dumps(
+        {table: [txid, row_id] for table, (txid, row_id) in positions.items()}, separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> Dict[str, Tuple[int, int]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return {
+            table: (int(txid), int(row_id))
+            for table, (txid, row_id) in payload.items()
+        }
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise DataValidationException("Invalid sync cursor")
@@ -0,0 +1,24 @@
+from typing import List, Optional, Type
+
+from pydantic import BaseModel
+
+from exceptions import DataValidationException
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> List[str]:
+    """The fields of `schema` named in a `fields=` parameter, in schema order.
+
+    All of them when the parameter is missing. `id` is always included,
+    clients need it to refer to a row and pagination cursors are built
+    from it.
+    """
+    if not fields:
+        return list(schema.model_fields)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise DataValidationException(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(schema.model_fields)}"
+        )
+    return [name for name in schema.model_fields if name in requested or name == "id"]
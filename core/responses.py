@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+from typing_extensions import TypedDict
+
+
+@lru_cache(maxsize=None)
+def rows_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """Serializer for lists of plain dicts with the fields of `schema`, or some of them.
+
+    A TypedDict serializes dicts as they are. Dumping them through the model
+    itself would need a model instance per row.
+    """
+    row_type = TypedDict(
+        f"{schema.__name__}Row",
+        {name: field.annotation for name, field in schema.model_fields.items()},
+        total=False,
+    )
+    return TypeAdapter(List[row_type])
+
+
+class RowsJSONResponse(Response):
+    """A JSON list of database rows, encoded in one pass by pydantic-core.
+
+    The rows are not validated: they come straight from columns typed like
+    the schema. Output is the same as FastAPI gives for
+    `response_model=List[schema]`, which endpoints keep for the OpenAPI
+    schema; returning a Response skips its validation and jsonable_encoder.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, rows: List[Dict[str, Any]], schema: Type[BaseModel], **kwargs):
+        super().__init__(rows_adapter(schema).dump_json(rows), **kwargs)
@@ -1,4 +1,9 @@
-from exceptions import AuthenticationError
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from core.config import settings
+from exceptions import AuthenticationError, ServiceOverloadedException
 from schemas.user_schemas import User
 from passlib.context import CryptContext
 
@@ -6,15 +11,49 @@ from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashingPool:
+    """Runs bcrypt off the event loop with bounded concurrency and backlog."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        self._max_pending = max_pending
+        self.pending = 0
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        if self.pending >= self._max_pending:
+            raise ServiceOverloadedException()
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(func, *args)
+        self.pending += 1
+        # Counted until the thread is done: cancelling the request does not
+        # stop a bcrypt call that already started
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.password_hashing_workers,
+    max_pending=settings.password_hashing_max_pending,
+)
+
+
 class AuthenticationEngine:
     @staticmethod
     async def validate_password(user: User, password: str):
         valid = False
         if user.hashed_password:
-            valid = pwd_context.verify(password, user.hashed_password)
+            valid = await password_hashing_pool.run(
+                pwd_context.verify, password, user.hashed_password
+            )
         if not valid:
             raise AuthenticationError(message="Wrong password")
 
     @staticmethod
     async def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
+        return await password_hashing_pool.run(pwd_context.hash, password)
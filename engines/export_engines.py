@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List, Mapping
+
+from schemas.enums import ExportFormatEnum
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class ExportEngine:
+    @classmethod
+    def encode_ndjson(cls, rows: List[Mapping], columns: List[str]) -> str:
+        return "".join(
+            json.dumps({column: _plain(row[column]) for column in columns}) + "\n" for row in rows
+        )
+
+    @classmethod
+    def encode_csv(cls, rows: List[Mapping], columns: List[str], header: bool = False) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(columns)
+        writer.writerows([_plain(row[column]) for column in columns] for row in rows)
+        return buffer.getvalue()
+
+    @classmethod
+    async def encode(
+        cls, batches: AsyncIterator[List[Mapping]], columns: List[str], export_format: ExportFormatEnum
+    ) -> AsyncIterator[str]:
+        """One chunk per batch, so memory stays bounded by the fetch size."""
+        if export_format == ExportFormatEnum.csv:
+            yield cls.encode_csv([], columns, header=True)
+            async for rows in batches:
+                yield cls.encode_csv(rows, columns)
+        else:
+            async for rows in batches:
+                yield cls.encode_ndjson(rows, columns)
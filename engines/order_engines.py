@@ -1,11 +1,32 @@
+from typing import List, Set, Tuple
+
 from sqlalchemy.orm import Session
 
 from exceptions import DataValidationException
-from resource_access.repositories.order_repos import StoreRepository
+from resource_access.caches.lookup_tables import lookup_tables
+from resource_access.repositories.user_repos import UserRepository
+from schemas.enums import OrderStatusEnum
 from schemas.user_schemas import User
 
+# Target status -> statuses an order may move to it from
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatusEnum.started: [],
+    OrderStatusEnum.in_process: [OrderStatusEnum.started],
+    OrderStatusEnum.awaiting: [OrderStatusEnum.in_process],
+    OrderStatusEnum.ended: [OrderStatusEnum.awaiting],
+    OrderStatusEnum.canceled: [
+        OrderStatusEnum.started,
+        OrderStatusEnum.in_process,
+        OrderStatusEnum.awaiting,
+    ],
+}
+
 
 class OrderEngine:
+    @classmethod
+    def get_allowed_previous_statuses(cls, status: OrderStatusEnum) -> List[OrderStatusEnum]:
+        return ORDER_STATUS_TRANSITIONS[status]
+
     @classmethod
     async def validate_access_to_store(cls, user: User, store_id: int) -> None:
         if user.store_id != store_id:
@@ -13,9 +34,17 @@ class OrderEngine:
 
     @classmethod
     async def validate_worker_belonging(cls, db_session: Session, worker_id: int, store_id: int) -> None:
-        store_repos = StoreRepository(db_session)
-        store = await store_repos.get_store_by_id(store_id)
+        if lookup_tables.is_user_in_store(worker_id, store_id):
+            return
 
-        if worker_id not in [user.id for user in store.users]:
+        user_repos = UserRepository(db_session)
+        if not await user_repos.is_user_in_store(worker_id, store_id):
             raise DataValidationException(message="You cannot create an order for employee from another store")
 
+    @classmethod
+    async def get_valid_worker_pairs(
+        cls, db_session: Session, pairs: Set[Tuple[int, int]]
+    ) -> Set[Tuple[int, int]]:
+        known = {pair for pair in pairs if lookup_tables.is_user_in_store(*pair)}
+        user_repos = UserRepository(db_session)
+        return known | await user_repos.get_store_memberships(pairs - known)
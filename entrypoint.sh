@@ -22,6 +22,10 @@ else
     echo "Migrate the Database at startup of project"
     alembic upgrade head
 
+    # Every worker writes its metrics here; stale files from a previous run would be summed in
+    export METRICS_MULTIPROCESS_DIR="${METRICS_MULTIPROCESS_DIR:-/dev/shm/store_visit_metrics}"
+    rm -rf "${METRICS_MULTIPROCESS_DIR}" && mkdir -p "${METRICS_MULTIPROCESS_DIR}"
+
     echo "Running uvicorn"
     gunicorn main:app -w ${GUNICORN_WORKERS} -k uvicorn.workers.UvicornWorker -b 0.0.0.0:5000 --access-logfile - --error-logfile - --log-level info
 fi
@@ -45,3 +45,18 @@ class TimeIsUpException(StoreVisitException):
 class AccessDeniedException(StoreVisitException):
     default_message = "Access Denied"
     error_code = "AccessDenied"
+
+
+class ServiceOverloadedException(StoreVisitException):
+    default_message = "Service is overloaded, try again later"
+    error_code = "ServiceOverloaded"
+
+
+class InvalidStatusTransitionException(StoreVisitException):
+    default_message = "Status transition is not allowed"
+    error_code = "InvalidStatusTransition"
+
+
+class QueryBudgetExceededException(StoreVisitException):
+    default_message = "Request ran more SQL statements than its query budget"
+    error_code = "QueryBudgetExceeded"
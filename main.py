@@ -1,13 +1,19 @@
 from logging.config import dictConfig
 
 from api.api import api_router
+from api.metrics import metrics_endpoints
 from core.config import logging_conf, settings
-from core.constants import PROD
+from core.constants import NEXT_CURSOR_HEADER, PROD
 from fastapi import FastAPI, Request
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
-from middlewares import add_process_time_header
-from starlette.middleware.base import BaseHTTPMiddleware
+from middlewares import MetricsMiddleware, QueryBudgetMiddleware, metrics_exporter, request_metrics
+from resource_access.caches.invalidation import cache_invalidation_listener
+from resource_access.caches.lookup_publisher import lookup_snapshot_publisher
+from resource_access.order_events import order_event_hub
+from resource_access.order_expiry import order_expiry_metrics, order_expiry_sweeper
+from resource_access.outbox_relay import outbox_relay
+from resource_access.replicas import replica_router
 from starlette.middleware.cors import CORSMiddleware
 from exceptions import StoreVisitHTTPException
 
@@ -24,7 +30,64 @@ app = FastAPI(title=settings.project_name, openapi_url=openapi_url)
 
 
 app.include_router(api_router, prefix=settings.api_path)
-app.add_middleware(BaseHTTPMiddleware, dispatch=add_process_time_header)
+app.include_router(metrics_endpoints.router)
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+metrics_exporter.add_source(order_expiry_metrics)
+metrics_exporter.add_source(replica_router)
+metrics_exporter.add_source(order_event_hub)
+metrics_exporter.add_source(outbox_relay)
+
+
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    if settings.cache_invalidation_listener:
+        cache_invalidation_listener.start()
+
+
+@app.on_event("startup")
+async def start_lookup_snapshot_publisher():
+    if settings.lookup_snapshot_enabled:
+        lookup_snapshot_publisher.start()
+
+
+@app.on_event("startup")
+async def start_order_expiry_sweeper():
+    if settings.order_expiry_enabled:
+        order_expiry_sweeper.start()
+
+
+@app.on_event("startup")
+async def start_outbox_relay():
+    if settings.outbox_relay_enabled:
+        outbox_relay.start()
+
+
+@app.on_event("startup")
+async def start_order_event_hub():
+    if settings.order_stream_enabled:
+        order_event_hub.start()
+
+
+@app.on_event("startup")
+async def start_replica_lag_checks():
+    replica_router.start()
+
+
+@app.on_event("startup")
+async def start_metrics_exporter():
+    metrics_exporter.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await cache_invalidation_listener.stop()
+    await lookup_snapshot_publisher.stop()
+    await order_expiry_sweeper.stop()
+    await order_event_hub.stop()
+    await outbox_relay.stop()
+    await replica_router.stop()
+    await metrics_exporter.stop()
 
 
 @app.exception_handler(StoreVisitHTTPException)
@@ -42,6 +105,7 @@ if settings.backend_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
 
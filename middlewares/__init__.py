@@ -1 +1,2 @@
-from .response_process_time import *
\ No newline at end of file
+from .metrics import *
+from .query_budget import *
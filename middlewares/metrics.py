@@ -0,0 +1,252 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.constants import LATENCY_BUCKETS, UNMATCHED_ROUTE
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    """Request counters, latency histograms and in-flight gauges of one process."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        # Per (method, route): a count per bucket, one for +Inf, then the sum
+        self.latency: Dict[Tuple[str, str], List[float]] = {}
+        self.in_flight: Dict[str, int] = defaultdict(int)
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.requests[(method, route, status)] += 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "requests": [[*key, count] for key, count in self.requests.items()],
+            "latency": [[*key, histogram] for key, histogram in self.latency.items()],
+            "in_flight": [[method, count] for method, count in self.in_flight.items()],
+        }
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus(snapshots: List[dict], descriptions: Optional[Dict[str, Tuple[str, ...]]] = None) -> str:
+    """Sum the snapshots of all workers into the Prometheus text format.
+
+    `descriptions` maps the names of extra values in the snapshots to their
+    (type, help). Counters are summed, of gauges the largest value is shown,
+    or their sum when the description ends with "sum".
+    """
+    requests = defaultdict(int)
+    latency = {}
+    in_flight = defaultdict(int)
+    buckets = snapshots[0]["buckets"] if snapshots else list(LATENCY_BUCKETS)
+    for snapshot in snapshots:
+        if snapshot["buckets"] != buckets:
+            continue
+        for method, route, status, count in snapshot["requests"]:
+            requests[(method, route, status)] += count
+        for method, route, histogram in snapshot["latency"]:
+            total = latency.setdefault((method, route), [0] * len(histogram))
+            for index, value in enumerate(histogram):
+                total[index] += value
+        for method, count in snapshot["in_flight"]:
+            in_flight[method] += count
+
+    lines = [
+        "# HELP http_requests_total Requests by method, route template and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(requests.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by method and route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip([*buckets, "+Inf"], histogram[:-1]):
+            cumulative += count
+            labels = _labels(method=method, route=route, le=bound)
+            lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"http_request_duration_seconds_sum{labels} {histogram[-1]}")
+        lines.append(f"http_request_duration_seconds_count{labels} {cumulative}")
+
+    lines += [
+        "# HELP http_requests_in_flight Requests being handled right now.",
+        "# TYPE http_requests_in_flight gauge",
+    ]
+    for method, count in sorted(in_flight.items()):
+        lines.append(f"http_requests_in_flight{_labels(method=method)} {count}")
+
+    for name, (metric_type, description, *aggregate) in sorted((descriptions or {}).items()):
+        values = [snapshot["values"][name] for snapshot in snapshots if name in snapshot.get("values", {})]
+        if not values:
+            continue
+        value = sum(values) if metric_type == "counter" or aggregate == ["sum"] else max(values)
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Shares this worker's metrics with the others through one file per pid.
+
+    Without a directory only this process is reported. Counters of workers
+    that exited are kept, so totals never go down; their gauges are dropped.
+    """
+
+    def __init__(self, metrics: RequestMetrics, directory: str, interval: float):
+        self._metrics = metrics
+        self._directory = directory
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._sources = []
+
+    def add_source(self, source) -> None:
+        """Report the values of `source.snapshot()`, described by `source.descriptions`."""
+        self._sources.append(source)
+
+    @property
+    def descriptions(self) -> Dict[str, Tuple[str, ...]]:
+        return {name: description for source in self._sources for name, description in source.descriptions.items()}
+
+    def snapshot(self) -> dict:
+        snapshot = self._metrics.snapshot()
+        snapshot["values"] = {name: value for source in self._sources for name, value in source.snapshot().items()}
+        return snapshot
+
+    def start(self) -> None:
+        if self._directory and self._task is None:
+            os.makedirs(self._directory, exist_ok=True)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.write()
+
+    def write(self) -> None:
+        path = os.path.join(self._directory, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as metrics_file:
+            json.dump(self.snapshot(), metrics_file)
+        os.replace(f"{path}.tmp", path)
+
+    def collect(self) -> List[dict]:
+        if not self._directory:
+            return [self.snapshot()]
+
+        os.makedirs(self._directory, exist_ok=True)
+        self.write()
+        descriptions = self.descriptions
+        snapshots = []
+        for path in glob.glob(os.path.join(self._directory, "*.json")):
+            try:
+                with open(path) as metrics_file:
+                    snapshot = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            if not _is_alive(snapshot["pid"]):
+                snapshot["in_flight"] = []
+                snapshot["values"] = {
+                    name: value for name, value in snapshot.get("values", {}).items()
+                    if descriptions.get(name, ("gauge",))[0] == "counter"
+                }
+            snapshots.append(snapshot)
+        return snapshots
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Cannot write metrics to {self._directory}: {e}")
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsMiddleware:
+    """Times every HTTP request by route template and sets X-Process-Time."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start_time = time.monotonic()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.monotonic() - start_time
+                message["headers"] = [
+                    *message.get("headers", []), (b"x-process-time", str(process_time).encode()),
+                ]
+            await send(message)
+
+        self.metrics.in_flight[method] += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.in_flight[method] -= 1
+            # FastAPI stores the matched route in the scope while routing
+            route = scope.get("route")
+            self.metrics.observe(
+                method,
+                getattr(route, "path_format", UNMATCHED_ROUTE),
+                status_code,
+                time.monotonic() - start_time,
+            )
+
+
+request_metrics = RequestMetrics()
+
+metrics_exporter = MetricsExporter(
+    request_metrics,
+    directory=settings.metrics_multiprocess_dir,
+    interval=settings.metrics_flush_seconds,
+)
@@ -0,0 +1,76 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.constants import UNMATCHED_ROUTE
+from exceptions import QueryBudgetExceededException
+from resource_access.query_stats import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("store_visit.access")
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows"'
+
+
+class QueryBudgetMiddleware:
+    """Counts SQL per request for Server-Timing, the access log and query budgets."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.monotonic()
+        status_code = 500
+
+        with track_queries() as stats:
+            async def send_with_server_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message["headers"] = [
+                        *message.get("headers", []), (b"server-timing", server_timing(stats).encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_server_timing)
+            finally:
+                route = getattr(scope.get("route"), "path_format", UNMATCHED_ROUTE)
+                self._log_request(scope["method"], route, status_code, time.monotonic() - start_time, stats)
+
+        self._check_budget(scope["method"], route, stats)
+
+    @staticmethod
+    def _log_request(method: str, route: str, status_code: int, seconds: float, stats: QueryStats) -> None:
+        fields = {
+            "method": method,
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(seconds * 1000, 2),
+            "db_queries": stats.queries,
+            "db_rows": stats.rows,
+            "db_ms": round(stats.db_time * 1000, 2),
+        }
+        access_logger.info(" ".join(f"{name}={value}" for name, value in fields.items()), extra=fields)
+
+        for statement, count in stats.repeated_statements(settings.n_plus_one_threshold):
+            logger.warning(f"Possible N+1 in {method} {route}: {count} x {statement}")
+
+    @staticmethod
+    def _check_budget(method: str, route: str, stats: QueryStats) -> None:
+        budget = settings.query_budgets.get(route, settings.default_query_budget)
+        if stats.queries <= budget:
+            return
+
+        message = f"{method} {route} ran {stats.queries} SQL statements, budget is {budget}"
+        if settings.query_budget_strict:
+            raise QueryBudgetExceededException(message)
+        logger.warning(message)
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+from typing import Hashable, Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.constants import CACHE_INVALIDATION_CHANNEL
+from resource_access.caches.lookup_tables import lookup_tables
+from resource_access.caches.store_caches import store_catalog_cache
+from resource_access.caches.user_caches import principal_cache, token_version_cache
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL = "principal"
+TOKEN_VERSION = "token_version"
+STORE = "store"
+STORE_USERS = "store_users"
+
+INVALIDATORS = {
+    PRINCIPAL: [principal_cache.invalidate_user, lookup_tables.invalidate_user],
+    TOKEN_VERSION: [token_version_cache.delete],
+    STORE: [store_catalog_cache.invalidate_store, lookup_tables.invalidate_store_users],
+    STORE_USERS: [store_catalog_cache.invalidate_store_users, lookup_tables.invalidate_store_users],
+}
+
+
+async def publish_invalidation(db_session: Session, cache: str, key: Hashable) -> None:
+    """Queue a NOTIFY that is delivered to every worker when the transaction commits."""
+    payload = json.dumps({"cache": cache, "key": key})
+    await db_session.execute(select(func.pg_notify(CACHE_INVALIDATION_CHANNEL, payload)))
+
+
+def apply_invalidation(payload: str) -> None:
+    try:
+        message = json.loads(payload)
+        for invalidate in INVALIDATORS[message["cache"]]:
+            invalidate(message["key"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed cache invalidation: {payload!r}")
+
+
+def clear_all_caches() -> None:
+    principal_cache.clear()
+    token_version_cache.clear()
+    store_catalog_cache.clear()
+    lookup_tables.invalidate_all()
+
+
+class CacheInvalidationListener:
+    """Holds one asyncpg connection that LISTENs for invalidations from other workers."""
+
+    def __init__(self, dsn: str, channel: str, reconnect_delay: float):
+        self._dsn = dsn
+        self._channel = channel
+        self._reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        apply_invalidation(payload)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning(f"Cache invalidation listener cannot connect: {e}")
+                await asyncio.sleep(self._reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self._channel, self._on_notification)
+                # Invalidations sent while nobody was listening are lost,
+                # including those before the first connect
+                clear_all_caches()
+                self.listening.set()
+                await closed.wait()
+            finally:
+                self.listening.clear()
+                await connection.close()
+
+            logger.warning("Cache invalidation listener lost its connection, reconnecting")
+            await asyncio.sleep(self._reconnect_delay)
+
+
+cache_invalidation_listener = CacheInvalidationListener(
+    dsn=make_url(settings.postgres_async_url).set(drivername="postgresql").render_as_string(hide_password=False),
+    channel=CACHE_INVALIDATION_CHANNEL,
+    reconnect_delay=settings.cache_invalidation_reconnect_seconds,
+)
@@ -0,0 +1,86 @@
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from resource_access.caches.lookup_tables import encode_lookup_snapshot
+from resource_access.db_session import AsyncSessionLocal
+from resource_access.repositories.user_repos import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def publish_lookup_snapshot(db_session: Session, path: str) -> int:
+    """Build a new generation from the database and swap it in atomically."""
+    # Taken before reading, so invalidations that race the read stay stale
+    generation = time.time_ns()
+    rows = await UserRepository(db_session).get_lookup_rows()
+    data = encode_lookup_snapshot(generation, rows)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(tmp_path, path)
+    return generation
+
+
+class LookupSnapshotPublisher:
+    """Refreshes the snapshot every `interval` seconds from whichever worker holds the file lock."""
+
+    def __init__(self, path: str, interval: float):
+        self._path = path
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def publish_if_due(self) -> bool:
+        with open(f"{self._path}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                try:
+                    age = time.time() - os.stat(self._path).st_mtime
+                except FileNotFoundError:
+                    age = None
+                # Another worker published during this interval
+                if age is not None and age < self._interval / 2:
+                    return False
+                async with AsyncSessionLocal() as db_session:
+                    await publish_lookup_snapshot(db_session, self._path)
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.publish_if_due()
+            except Exception:
+                logger.exception("Cannot publish lookup snapshot")
+            await asyncio.sleep(self._interval)
+
+
+lookup_snapshot_publisher = LookupSnapshotPublisher(
+    path=settings.lookup_snapshot_path,
+    interval=settings.lookup_snapshot_refresh_seconds,
+)
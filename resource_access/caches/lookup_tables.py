@@ -0,0 +1,230 @@
+import bisect
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from core.config import settings
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SVLT"
+FORMAT_VERSION = 1
+# magic, format version, generation, users, stores, store members
+HEADER = struct.Struct("<4sIqIII4x")
+ROLES = list(UserRoleEnum)
+# users.role is nullable
+NO_ROLE = len(ROLES)
+NO_STORE = 0
+
+
+def _padded(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+
+def encode_lookup_snapshot(
+    generation: int, rows: Iterable[Tuple[int, Optional[UserRoleEnum], Optional[int], bool]]
+) -> bytes:
+    """Pack (user id, role, store id, is_deleted) rows into the snapshot layout.
+
+    Users are sorted id, role and store id arrays of the users that are not
+    deleted. Store members are a sorted store id array with offsets into one
+    array of member ids, sorted within each store.
+    """
+    users = []
+    members = defaultdict(list)
+    for user_id, role, store_id, is_deleted in rows:
+        if store_id is not None:
+            members[store_id].append(user_id)
+        if not is_deleted:
+            users.append((user_id, role, store_id))
+    users.sort()
+
+    store_ids = sorted(members)
+    offsets, member_ids = array("q", [0]), array("q")
+    for store_id in store_ids:
+        member_ids.extend(sorted(members[store_id]))
+        offsets.append(len(member_ids))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, generation, len(users), len(store_ids), len(member_ids))
+    return b"".join([
+        header,
+        array("q", [user_id for user_id, _, _ in users]).tobytes(),
+        array("q", [store_id or NO_STORE for _, _, store_id in users]).tobytes(),
+        _padded(bytes(NO_ROLE if role is None else ROLES.index(role) for _, role, _ in users)),
+        array("q", store_ids).tobytes(),
+        offsets.tobytes(),
+        member_ids.tobytes(),
+    ])
+
+
+class LookupSnapshot:
+    """Read-only view over one generation of the encoded lookup tables."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        if len(buffer) < HEADER.size:
+            raise ValueError("Lookup snapshot is truncated")
+        magic, version, self.generation, users, stores, members = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a lookup snapshot")
+
+        sections = [("q", users), ("q", users), ("B", users), ("q", stores), ("q", stores + 1), ("q", members)]
+        sizes = [length * struct.calcsize(item_format) for item_format, length in sections]
+        if HEADER.size + sum(size + (-size % 8) for size in sizes) > len(buffer):
+            raise ValueError("Lookup snapshot is truncated")
+
+        view = memoryview(buffer)
+        views = []
+        position = HEADER.size
+        for (item_format, _), size in zip(sections, sizes):
+            views.append(view[position:position + size].cast(item_format))
+            position += size + (-size % 8)
+        self._views = [view] + views
+        self._user_ids, self._user_store_ids, self._roles, self._store_ids, self._offsets, self._members = views
+
+    @property
+    def user_count(self) -> int:
+        return len(self._user_ids)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._views[0])
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        index = bisect.bisect_left(self._user_ids, user_id)
+        if index == len(self._user_ids) or self._user_ids[index] != user_id:
+            return None
+        store_id, role = self._user_store_ids[index], self._roles[index]
+        return User(
+            id=user_id,
+            role=ROLES[role] if role != NO_ROLE else None,
+            store_id=store_id if store_id != NO_STORE else None,
+        )
+
+    def is_user_in_store(self, user_id: int, store_id: int) -> bool:
+        index = bisect.bisect_left(self._store_ids, store_id)
+        if index == len(self._store_ids) or self._store_ids[index] != store_id:
+            return False
+        start, end = self._offsets[index], self._offsets[index + 1]
+        position = bisect.bisect_left(self._members, user_id, start, end)
+        return position < end and self._members[position] == user_id
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+class SharedLookupTables:
+    """User and store membership lookups from a snapshot file shared by all workers.
+
+    A publisher replaces the file with os.replace, so every worker maps a
+    complete generation and picks up the next one on its following check.
+    Lookups only answer positively: a miss means "ask the database". Keys
+    invalidated after a generation was built are not answered from it.
+    """
+
+    def __init__(self, path: str, check_interval: float, enabled: bool = True):
+        self._enabled = enabled
+        self._path = path
+        self._check_interval = check_interval
+        self._next_check = 0.0
+        self._file_id = None
+        self._snapshot: Optional[LookupSnapshot] = None
+        self._stale_users: Dict[int, int] = {}
+        self._stale_stores: Dict[int, int] = {}
+        self._min_generation = 0
+
+    def _current(self) -> Optional[LookupSnapshot]:
+        if not self._enabled:
+            return None
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self._check_interval
+            self._remap()
+        if self._snapshot is None or self._snapshot.generation < self._min_generation:
+            return None
+        return self._snapshot
+
+    def _remap(self) -> None:
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id == self._file_id:
+            return
+
+        try:
+            with open(self._path, "rb") as snapshot_file:
+                buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot map lookup snapshot {self._path}: {e}")
+            return
+        try:
+            snapshot = LookupSnapshot(buffer)
+        except ValueError as e:
+            buffer.close()
+            logger.warning(f"Cannot map lookup snapshot {self._path}: {e}")
+            return
+
+        previous, self._snapshot, self._file_id = self._snapshot, snapshot, file_id
+        if previous is not None:
+            previous.close()
+        for stale in (self._stale_users, self._stale_stores):
+            for key in [key for key, at in stale.items() if at < snapshot.generation]:
+                del stale[key]
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        snapshot = self._current()
+        if snapshot is None or user_id in self._stale_users:
+            return None
+        return snapshot.get_user(user_id)
+
+    def is_user_in_store(self, user_id: int, store_id: int) -> bool:
+        snapshot = self._current()
+        if snapshot is None or user_id in self._stale_users or store_id in self._stale_stores:
+            return False
+        return snapshot.is_user_in_store(user_id, store_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        if self._enabled:
+            self._stale_users[user_id] = time.time_ns()
+
+    def invalidate_store_users(self, store_id: int) -> None:
+        if self._enabled:
+            self._stale_stores[store_id] = time.time_ns()
+
+    def invalidate_all(self) -> None:
+        """Ignore every generation built before now."""
+        if self._enabled:
+            self._min_generation = time.time_ns()
+
+    def close(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot, self._file_id, self._next_check = None, None, 0.0
+
+    def stats(self) -> dict:
+        snapshot = self._current()
+        return {
+            "generation": snapshot.generation if snapshot else None,
+            "users": snapshot.user_count if snapshot else 0,
+            "size_bytes": snapshot.size_bytes if snapshot else 0,
+            "stale_keys": len(self._stale_users) + len(self._stale_stores),
+        }
+
+
+lookup_tables = SharedLookupTables(
+    path=settings.lookup_snapshot_path,
+    check_interval=settings.lookup_snapshot_check_seconds,
+    enabled=settings.lookup_snapshot_enabled,
+)
@@ -0,0 +1,68 @@
+from typing import FrozenSet, Hashable, List, Optional
+
+from core.config import settings
+from resource_access.caches.base_cache import TTLCache
+from schemas.order_schemas import Store
+
+
+class StoreCatalogCache:
+    """Store rows, store listings and the ids of the users of each store."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._stores = TTLCache(max_size=max_size, ttl=ttl)
+        self._listings = TTLCache(max_size=max_size, ttl=ttl)
+        self._user_ids = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get_store(self, store_id: int) -> Optional[Store]:
+        return self._stores.get(store_id)
+
+    def set_store(self, store: Store) -> None:
+        self._stores.set(store.id, store)
+
+    def get_listing(self, key: Hashable) -> Optional[List[dict]]:
+        stores = self._listings.get(key)
+        return list(stores) if stores is not None else None
+
+    def set_listing(self, key: Hashable, stores: List[dict]) -> None:
+        self._listings.set(key, tuple(stores))
+
+    def get_user_ids(self, store_id: int) -> Optional[FrozenSet[int]]:
+        return self._user_ids.get(store_id)
+
+    def set_user_ids(self, store_id: int, user_ids: FrozenSet[int]) -> None:
+        self._user_ids.set(store_id, frozenset(user_ids))
+
+    def invalidate_store(self, store_id: int) -> None:
+        self._stores.delete(store_id)
+        self._user_ids.delete(store_id)
+        # Any listing may contain the store
+        self._listings.clear()
+
+    def invalidate_store_users(self, store_id: int) -> None:
+        self._user_ids.delete(store_id)
+
+    def clear(self) -> None:
+        self._stores.clear()
+        self._listings.clear()
+        self._user_ids.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        caches = (self._stores, self._listings, self._user_ids)
+        hits = sum(cache.hits for cache in caches)
+        lookups = hits + sum(cache.misses for cache in caches)
+        return hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "stores": self._stores.stats(),
+            "listings": self._listings.stats(),
+            "user_ids": self._user_ids.stats(),
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+store_catalog_cache = StoreCatalogCache(
+    max_size=settings.store_cache_max_size,
+    ttl=settings.store_cache_ttl_seconds,
+)
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Optional
+
+from core.config import settings
+from resource_access.caches.base_cache import TTLCache
+from schemas.user_schemas import User
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+class PrincipalCache:
+    """Authenticated users keyed by (user id, access token fingerprint)."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: int, token: str) -> Optional[User]:
+        return self._cache.get((user_id, token_fingerprint(token)))
+
+    def set(self, user_id: int, token: str, user: User) -> None:
+        # The password hash is never needed after authentication
+        principal = user.model_copy(update={"hashed_password": None})
+        self._cache.set((user_id, token_fingerprint(token)), principal)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._cache.delete_where(lambda key: key[0] == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+# Current token_version per user id, checked against the `ver` claim of
+# self-contained access tokens
+token_version_cache = TTLCache(
+    max_size=settings.token_version_cache_max_size,
+    ttl=settings.token_version_cache_ttl_seconds,
+)
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
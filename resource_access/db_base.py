@@ -1,3 +1,4 @@
 from .db_base_class import Base
 from .db_models.user_models import *
-from .db_models.order_models import *
\ No newline at end of file
+from .db_models.order_models import *
+from .db_models.outbox_models import *
@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer
+from typing import Iterable
+
+from sqlalchemy import DDL, Boolean, Column, Integer, event
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import expression
 
@@ -12,5 +14,17 @@ class Base:
     )
     __mapper_args__ = {"eager_defaults": True}
 
+    @classmethod
+    def columns(cls, fields: Iterable[str]) -> list:
+        """Columns to select plain rows of, instead of whole entities."""
+        return [getattr(cls, field) for field in fields]
+
 
 Base = declarative_base(cls=Base)
+
+# Extensions the models depend on, so metadata.create_all works on a fresh database
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, Column, TIMESTAMP, func, ForeignKey
+from sqlalchemy import DDL, BigInteger, FetchedValue, String, Integer, Column, TIMESTAMP, event, func, ForeignKey, \
+    Index, column, text
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import relationship
 
@@ -9,19 +10,67 @@ from .user_models import UserDB
 
 class StoreDB(Base):
     __tablename__ = "stores"
+    __table_args__ = (
+        # Case-insensitive substring search (ILIKE '%term%'), needs pg_trgm.
+        # Stores are rarely written, so skip the GIN pending list that every
+        # search would otherwise have to scan.
+        Index(
+            "ix_stores_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_with={"fastupdate": "off"},
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        # Case-insensitive prefix search (lower(title) LIKE 'term%')
+        Index(
+            "ix_stores_lower_title_pattern",
+            func.lower(column("title")).label("lower_title"),
+            postgresql_ops={"lower_title": "text_pattern_ops"},
+            postgresql_where=text("is_deleted IS false"),
+        ),
+    )
 
     title = Column(String(255), nullable=False)
 
     users = relationship(
         'UserDB',
         back_populates='store',
-        lazy='selectin',
+        lazy='raise',
         uselist=True,
     )
 
 
 class OrderDB(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index(
+            "ix_orders_customer_id_status_id",
+            "customer_id",
+            "status",
+            "id",
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        Index(
+            "ix_orders_worker_id_status_id",
+            "worker_id",
+            "status",
+            "id",
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        # Orders the expiry sweeper may still cancel, oldest deadline first
+        Index(
+            "ix_orders_open_expires_at",
+            "expires_at",
+            postgresql_where=text(
+                "is_deleted IS false AND status IN ('started', 'in_process', 'awaiting')"
+            ),
+        ),
+        # Delta sync: a user's changes after a watermark. Not partial,
+        # deleted rows are sent as tombstones.
+        Index("ix_orders_customer_id_txid_id", "customer_id", "txid", "id"),
+        Index("ix_orders_worker_id_txid_id", "worker_id", "txid", "id"),
+    )
 
     created_at = Column(
         TIMESTAMP(timezone=True),
@@ -33,10 +82,24 @@ class OrderDB(Base):
     customer_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
     status = Column(ENUM(OrderStatusEnum, name="order_status_enum"),default=OrderStatusEnum.started, server_default=OrderStatusEnum.started)
     worker_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
+    # Both maintained by the set_updated_at trigger on every insert and update
+    updated_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), nullable=False
+    )
+    txid = Column(BigInteger, server_default=text("0"), server_onupdate=FetchedValue(), nullable=False)
 
 
 class VisitDB(Base):
     __tablename__ = "visits"
+    __table_args__ = (
+        Index(
+            "ix_visits_id_not_deleted",
+            "id",
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        Index("ix_visits_customer_id_txid_id", "customer_id", "txid", "id"),
+        Index("ix_visits_worker_id_txid_id", "worker_id", "txid", "id"),
+    )
 
     created_at = Column(
         TIMESTAMP(timezone=True),
@@ -47,3 +110,30 @@ class VisitDB(Base):
     order_id = Column(Integer, ForeignKey("orders.id", ondelete="RESTRICT"), nullable=False, unique=True)
     customer_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
     store_id = Column(Integer, ForeignKey("stores.id", ondelete="RESTRICT"), nullable=False)
+    # Both maintained by the set_updated_at trigger on every insert and update
+    updated_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), nullable=False
+    )
+    txid = Column(BigInteger, server_default=text("0"), server_onupdate=FetchedValue(), nullable=False)
+
+
+# txid is the id of the transaction writing the row, assigned here if it
+# has none yet. Delta sync reads rows by it, like the outbox.
+SET_UPDATED_AT_FUNCTION = DDL(
+    "CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+    "BEGIN "
+    "NEW.updated_at := clock_timestamp(); "
+    "NEW.txid := CAST(CAST(pg_current_xact_id() AS text) AS bigint); "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql"
+)
+event.listen(Base.metadata, "before_create", SET_UPDATED_AT_FUNCTION.execute_if(dialect="postgresql"))
+for table in (OrderDB.__table__, VisitDB.__table__):
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {table.name}_set_updated_at BEFORE INSERT OR UPDATE ON {table.name} "
+            "FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        ).execute_if(dialect="postgresql"),
+    )
@@ -0,0 +1,86 @@
+from sqlalchemy import DDL, BigInteger, Column, Index, String, TIMESTAMP, event, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from resource_access.db_base_class import Base
+from .order_models import OrderDB, VisitDB
+
+# Id of the transaction writing a row. Rows are read in (txid, id) order
+# and only below the oldest running transaction, so a reader never passes
+# an event that a slower transaction has yet to commit.
+CURRENT_TXID = text("CAST(CAST(pg_current_xact_id() AS text) AS bigint)")
+
+
+class OutboxDB(Base):
+    """Order and visit events, appended by triggers in the transaction of the write."""
+
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_txid_id", "txid", "id"),
+        Index("ix_outbox_created_at", "created_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    txid = Column(BigInteger, server_default=CURRENT_TXID, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    aggregate = Column(String(16), nullable=False)
+    aggregate_id = Column(BigInteger, nullable=False)
+    event = Column(String(32), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+
+class OutboxCursorDB(Base):
+    """How far a reader of the outbox got, by (txid, id) of the last event it has."""
+
+    __tablename__ = "outbox_cursors"
+
+    name = Column(String(64), nullable=False, unique=True)
+    txid = Column(BigInteger, nullable=False)
+    event_id = Column(BigInteger, nullable=False)
+
+
+# Statement level with transition tables: a bulk insert or a batch of
+# expired orders appends its events with one INSERT ... SELECT
+APPEND_OUTBOX_INSERTS_FUNCTION = DDL(
+    "CREATE OR REPLACE FUNCTION append_outbox_inserts() RETURNS trigger AS $$ "
+    "BEGIN "
+    "INSERT INTO outbox (aggregate, aggregate_id, event, payload) "
+    "SELECT TG_ARGV[0], new_rows.id, TG_ARGV[0] || '_created', to_jsonb(new_rows) "
+    "FROM new_rows ORDER BY new_rows.id; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+# Updates that change nothing but updated_at and txid are left out
+APPEND_OUTBOX_UPDATES_FUNCTION = DDL(
+    "CREATE OR REPLACE FUNCTION append_outbox_updates() RETURNS trigger AS $$ "
+    "BEGIN "
+    "INSERT INTO outbox (aggregate, aggregate_id, event, payload) "
+    "SELECT TG_ARGV[0], new_rows.id, TG_ARGV[0] || CASE "
+    "WHEN new_rows.is_deleted AND NOT coalesce(old_rows.is_deleted, false) THEN '_deleted' "
+    "WHEN to_jsonb(new_rows) -> 'status' IS DISTINCT FROM to_jsonb(old_rows) -> 'status' THEN '_status_changed' "
+    "ELSE '_updated' END, to_jsonb(new_rows) "
+    "FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id "
+    "WHERE to_jsonb(new_rows) - 'updated_at' - 'txid' <> to_jsonb(old_rows) - 'updated_at' - 'txid' "
+    "ORDER BY new_rows.id; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql"
+)
+event.listen(Base.metadata, "before_create", APPEND_OUTBOX_INSERTS_FUNCTION.execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "before_create", APPEND_OUTBOX_UPDATES_FUNCTION.execute_if(dialect="postgresql"))
+for table, aggregate in ((OrderDB.__table__, "order"), (VisitDB.__table__, "visit")):
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {table.name}_append_outbox_inserts AFTER INSERT ON {table.name} "
+            f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION append_outbox_inserts('{aggregate}')"
+        ).execute_if(dialect="postgresql"),
+    )
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {table.name}_append_outbox_updates AFTER UPDATE ON {table.name} "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION append_outbox_updates('{aggregate}')"
+        ).execute_if(dialect="postgresql"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import relationship
 
@@ -8,6 +8,19 @@ from schemas.enums import UserRoleEnum
 
 class UserDB(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_username_not_deleted",
+            "username",
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        Index(
+            "ix_users_first_name_not_deleted",
+            "first_name",
+            postgresql_where=text("is_deleted IS false"),
+        ),
+        Index("ix_users_store_id", "store_id"),
+    )
 
     first_name = Column(String(255))
     username = Column(String(255), nullable=False)
@@ -18,10 +31,11 @@ class UserDB(Base):
         nullable=True,
     )
     hashed_password = Column(String(300))
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     store = relationship(
         'StoreDB',
         back_populates='users',
-        lazy='selectin',
+        lazy='raise',
         uselist=False,
     )
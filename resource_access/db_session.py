@@ -3,6 +3,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from resource_access.query_stats import instrument_engine
+
 async_engine = create_async_engine(
     settings.postgres_async_url,
     pool_pre_ping=True,
@@ -10,16 +12,31 @@ async_engine = create_async_engine(
     pool_recycle=settings.async_pool_recycle,
     max_overflow=settings.async_max_overflow,
 )
+instrument_engine(async_engine.sync_engine)
 AsyncSessionLocal = sessionmaker(
     bind=async_engine, expire_on_commit=False, class_=AsyncSession
 )
 
+replica_engines = [
+    create_async_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.replica_pool_size,
+        pool_recycle=settings.async_pool_recycle,
+        max_overflow=settings.replica_max_overflow,
+    )
+    for url in settings.replica_urls
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
+
 sync_engine = create_engine(
     settings.postgres_url,
     pool_size=settings.sync_pool_size,
     pool_recycle=settings.sync_pool_recycle,
     max_overflow=settings.sync_max_overflow,
 )
+instrument_engine(sync_engine)
 SessionLocal = sessionmaker(
     bind=sync_engine, expire_on_commit=False, class_=Session
 )
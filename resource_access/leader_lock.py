@@ -0,0 +1,68 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from resource_access.db_session import async_engine
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLeaderLock:
+    """Elects one worker for a background task with a session-level pg_try_advisory_lock.
+
+    The lock is kept on one connection taken out of the pool for as long as
+    this worker leads. It is released with the connection, by release() or
+    by the connection dying.
+    """
+
+    def __init__(self, lock_key: int, name: str):
+        self._lock_key = lock_key
+        self._name = name
+        self._connection: Optional[AsyncConnection] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None
+
+    async def acquire(self) -> bool:
+        """Take the lock if it is free, or check that the connection holding it is still alive."""
+        try:
+            if self._connection is not None:
+                await self._connection.execute(select(1))
+                await self._connection.commit()
+                return True
+
+            connection = await async_engine.connect()
+            try:
+                acquired = await connection.scalar(select(func.pg_try_advisory_lock(self._lock_key)))
+                # Do not sit idle in a transaction while holding the lock
+                await connection.commit()
+            except BaseException:
+                await connection.close()
+                raise
+            if not acquired:
+                await connection.close()
+                return False
+            self._connection = connection
+            logger.info(f"{self._name} is the leader")
+            return True
+        except (OSError, DBAPIError) as e:
+            logger.warning(f"{self._name} lost its lock connection: {e}")
+            await self.release()
+            return False
+
+    async def release(self) -> None:
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            # Unlocking explicitly, the pool may keep the connection open
+            await connection.scalar(select(func.pg_advisory_unlock(self._lock_key)))
+            await connection.commit()
+        except (OSError, DBAPIError):
+            await connection.invalidate()
+        finally:
+            await connection.close()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import ColumnElement, Text, cast, func, literal
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from core.constants import ORDER_EVENTS_CHANNEL
+from resource_access.db_models.order_models import OrderDB
+from schemas.order_schemas import OrderOut
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = "order_created"
+ORDER_UPDATED = "order_updated"
+ORDER_STATUS_CHANGED = "order_status_changed"
+# Events were dropped, the client refetches its orders
+RESYNC = "resync"
+
+
+def notify_order_event(event: str) -> ColumnElement:
+    """A pg_notify of `event` with the row, for the RETURNING clause of the statement writing orders.
+
+    Each changed row is sent to every worker when the transaction commits,
+    or never if it rolls back, without a round trip of its own.
+    """
+    order = func.json_build_object(
+        *chain.from_iterable((literal(name), getattr(OrderDB, name)) for name in OrderOut.model_fields)
+    )
+    payload = func.json_build_object(literal("event"), literal(event), literal("order"), order)
+    return func.pg_notify(literal(ORDER_EVENTS_CHANNEL), cast(payload, Text)).label("notified")
+
+
+class OrderEventSubscription:
+    """The events of one stream, for the user it was opened by."""
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class OrderEventHub:
+    """Fans order events out to the open streams of the order's customer and worker.
+
+    One asyncpg connection LISTENs for the events published by every worker,
+    this one included. Each stream has a bounded queue: when a client reads
+    slower than events arrive, its queue is emptied and holds a single resync
+    event instead. The same happens to every open stream each time the
+    listener connects, since events sent while it was not are lost.
+    """
+
+    descriptions: Dict[str, Tuple[str, ...]] = {
+        "order_stream_connections": ("gauge", "Open order event streams.", "sum"),
+        "order_stream_events_total": ("counter", "Order events queued to streams."),
+        "order_stream_resyncs_total": ("counter", "Streams told to resync because events were dropped."),
+    }
+
+    def __init__(self, dsn: str, channel: str, queue_size: int, reconnect_delay: float):
+        self._dsn = dsn
+        self._channel = channel
+        self._queue_size = queue_size
+        self._reconnect_delay = reconnect_delay
+        self._subscriptions: Dict[int, Set[OrderEventSubscription]] = defaultdict(set)
+        self._connections = 0
+        self._events = 0
+        self._resyncs = 0
+        self._task: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def subscribe(self, user_id: int) -> OrderEventSubscription:
+        subscription = OrderEventSubscription(user_id, self._queue_size)
+        self._subscriptions[user_id].add(subscription)
+        self._connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: OrderEventSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if not subscriptions or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+        self._connections -= 1
+
+    def dispatch(self, event: dict) -> None:
+        order = event["order"]
+        for user_id in {order.get("customer_id"), order.get("worker_id")}:
+            for subscription in self._subscriptions.get(user_id, ()):
+                try:
+                    subscription.queue.put_nowait(event)
+                    self._events += 1
+                except asyncio.QueueFull:
+                    self._resync(subscription)
+
+    def resync_all(self) -> None:
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                self._resync(subscription)
+
+    def _resync(self, subscription: OrderEventSubscription) -> None:
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait({"event": RESYNC})
+        self._resyncs += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "order_stream_connections": self._connections,
+            "order_stream_events_total": self._events,
+            "order_stream_resyncs_total": self._resyncs,
+        }
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning(f"Ignoring malformed order event: {payload!r}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning(f"Order event listener cannot connect: {e}")
+                await asyncio.sleep(self._reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self._channel, self._on_notification)
+                # Streams opened before this, the first connect included,
+                # may have missed events
+                self.resync_all()
+                self.listening.set()
+                await closed.wait()
+            finally:
+                self.listening.clear()
+                await connection.close()
+
+            logger.warning("Order event listener lost its connection, reconnecting")
+            await asyncio.sleep(self._reconnect_delay)
+
+
+order_event_hub = OrderEventHub(
+    dsn=make_url(settings.postgres_async_url).set(drivername="postgresql").render_as_string(hide_password=False),
+    channel=ORDER_EVENTS_CHANNEL,
+    queue_size=settings.order_stream_queue_size,
+    reconnect_delay=settings.order_stream_reconnect_seconds,
+)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from core.config import settings
+from core.constants import ORDER_EXPIRY_LOCK_KEY
+from engines.order_engines import OrderEngine
+from resource_access.db_session import AsyncSessionLocal
+from resource_access.leader_lock import AdvisoryLeaderLock
+from resource_access.repositories.order_repos import OrderRepository
+from schemas.enums import OrderStatusEnum
+
+logger = logging.getLogger(__name__)
+
+
+class OrderExpiryMetrics:
+    """Sweeper counters for /metrics. Gauges are only reported by the leader."""
+
+    descriptions: Dict[str, Tuple[str, str]] = {
+        "order_expiry_canceled_total": ("counter", "Expired orders moved to canceled."),
+        "order_expiry_batches_total": ("counter", "Cancellation batches committed."),
+        "order_expiry_batch_seconds_total": ("counter", "Seconds spent in cancellation batches."),
+        "order_expiry_lag_seconds": (
+            "gauge", "How long the oldest uncanceled order had been expired when the last run started.",
+        ),
+        "order_expiry_last_run_timestamp_seconds": ("gauge", "Unix time the last run finished."),
+    }
+
+    def __init__(self):
+        self.canceled = 0
+        self.batches = 0
+        self.batch_seconds = 0.0
+        self.lag_seconds: Optional[float] = None
+        self.last_run: Optional[float] = None
+
+    def observe_batch(self, canceled: int, seconds: float) -> None:
+        self.canceled += canceled
+        self.batches += 1
+        self.batch_seconds += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        values = {
+            "order_expiry_canceled_total": self.canceled,
+            "order_expiry_batches_total": self.batches,
+            "order_expiry_batch_seconds_total": self.batch_seconds,
+        }
+        if self.lag_seconds is not None:
+            values["order_expiry_lag_seconds"] = self.lag_seconds
+        if self.last_run is not None:
+            values["order_expiry_last_run_timestamp_seconds"] = self.last_run
+        return values
+
+
+class OrderExpirySweeper:
+    """Cancels expired orders every `interval` seconds from the worker holding the advisory lock."""
+
+    def __init__(
+        self,
+        metrics: OrderExpiryMetrics,
+        interval: float,
+        grace: float,
+        batch_size: int,
+        max_batches: int,
+        lock_key: int = ORDER_EXPIRY_LOCK_KEY,
+    ):
+        self.metrics = metrics
+        self._interval = interval
+        self._grace = timedelta(seconds=grace)
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+        self._lock = AdvisoryLeaderLock(lock_key, "Order expiry sweeper")
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock.is_leader
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._resign()
+
+    async def elect(self) -> bool:
+        if await self._lock.acquire():
+            return True
+        # Gauges are only reported by the leader
+        self.metrics.lag_seconds = self.metrics.last_run = None
+        return False
+
+    async def _resign(self) -> None:
+        await self._lock.release()
+        self.metrics.lag_seconds = self.metrics.last_run = None
+
+    async def sweep(self) -> int:
+        """Cancel what expired before now minus the grace period, in bounded batches."""
+        open_statuses = OrderEngine.get_allowed_previous_statuses(OrderStatusEnum.canceled)
+        # expires_at holds naive local time, as written by create_order_usecase
+        expired_before = datetime.now() - self._grace
+
+        async with AsyncSessionLocal() as db_session:
+            oldest = await OrderRepository(db_session).get_oldest_expired_at(expired_before, open_statuses)
+        self.metrics.lag_seconds = (expired_before - oldest).total_seconds() if oldest else 0.0
+
+        canceled = 0
+        for _ in range(self._max_batches):
+            start = time.monotonic()
+            async with AsyncSessionLocal() as db_session:
+                count = await OrderRepository(db_session).cancel_expired_orders(
+                    expired_before, open_statuses, self._batch_size
+                )
+            self.metrics.observe_batch(count, time.monotonic() - start)
+            canceled += count
+            if count < self._batch_size:
+                break
+        self.metrics.last_run = time.time()
+        return canceled
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.elect():
+                    canceled = await self.sweep()
+                    if canceled:
+                        logger.info(f"Canceled {canceled} expired orders")
+            except Exception:
+                logger.exception("Cannot cancel expired orders")
+            await asyncio.sleep(self._interval)
+
+
+order_expiry_metrics = OrderExpiryMetrics()
+
+order_expiry_sweeper = OrderExpirySweeper(
+    order_expiry_metrics,
+    interval=settings.order_expiry_interval_seconds,
+    grace=settings.order_expiry_grace_seconds,
+    batch_size=settings.order_expiry_batch_size,
+    max_batches=settings.order_expiry_max_batches,
+)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from core.config import settings
+from core.constants import OUTBOX_RELAY_CURSOR, OUTBOX_RELAY_LOCK_KEY
+from core.responses import rows_adapter
+from resource_access.db_session import AsyncSessionLocal
+from resource_access.leader_lock import AdvisoryLeaderLock
+from resource_access.repositories.outbox_repos import OutboxRepository
+from schemas.outbox_schemas import OutboxEventOut
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[[List[dict]], Awaitable[None]]
+
+
+class WebhookPublisher:
+    """POSTs each batch as {"events": [...]}, failing unless the response is 2xx."""
+
+    def __init__(self, url: str, timeout: float):
+        self._url = url
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __call__(self, events: List[dict]) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._timeout)
+        body = b'{"events":' + rows_adapter(OutboxEventOut).dump_json(events) + b"}"
+        response = await self._client.post(self._url, content=body, headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OutboxRelay:
+    """Publishes outbox events in (txid, id) order from the worker holding the relay advisory lock.
+
+    The position of a batch is saved in outbox_cursors once the publisher
+    accepted it, so delivery is at least once: a batch is sent again when
+    the leader dies in between, and consumers drop events by id. Events are
+    deleted after the retention period, relayed ones only when there is a
+    publisher.
+    """
+
+    descriptions: Dict[str, Tuple[str, str]] = {
+        "outbox_published_total": ("counter", "Outbox events published."),
+        "outbox_publish_failures_total": ("counter", "Outbox batches the publisher failed to take."),
+        "outbox_pruned_total": ("counter", "Outbox events deleted after the retention period."),
+        "outbox_relay_lag_seconds": ("gauge", "Age of the oldest unpublished event when the last run started."),
+    }
+
+    def __init__(
+        self,
+        publisher: Optional[Publisher],
+        interval: float,
+        batch_size: int,
+        max_batches: int,
+        retention: float,
+        prune_batch_size: int,
+        lock_key: int = OUTBOX_RELAY_LOCK_KEY,
+    ):
+        self._publisher = publisher
+        self._interval = interval
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+        self._retention = timedelta(seconds=retention)
+        self._prune_batch_size = prune_batch_size
+        self._lock = AdvisoryLeaderLock(lock_key, "Outbox relay")
+        self._task: Optional[asyncio.Task] = None
+        self._published = 0
+        self._failures = 0
+        self._pruned = 0
+        # Only reported by the leader
+        self.lag_seconds: Optional[float] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._lock.release()
+        self.lag_seconds = None
+        if isinstance(self._publisher, WebhookPublisher):
+            await self._publisher.close()
+
+    async def elect(self) -> bool:
+        if await self._lock.acquire():
+            return True
+        self.lag_seconds = None
+        return False
+
+    async def relay(self) -> int:
+        """Publish up to max_batches batches after the saved position."""
+        async with AsyncSessionLocal() as db_session:
+            position = await OutboxRepository(db_session).get_cursor(OUTBOX_RELAY_CURSOR)
+
+        published = 0
+        for batch in range(self._max_batches):
+            # Not inside a transaction while publishing: a long one would
+            # hold back the visible events of everyone else
+            async with AsyncSessionLocal() as db_session:
+                events = await OutboxRepository(db_session).get_events(position, self._batch_size)
+            if batch == 0:
+                oldest = events[0]["created_at"] if events else None
+                self.lag_seconds = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+            if not events:
+                break
+
+            try:
+                await self._publisher(events)
+            except httpx.HTTPError as e:
+                # Retried from the same position on the next run
+                self._failures += 1
+                logger.warning(f"Cannot publish outbox events: {e}")
+                break
+            position = (events[-1]["txid"], events[-1]["id"])
+            async with AsyncSessionLocal() as db_session:
+                await OutboxRepository(db_session).save_cursor(OUTBOX_RELAY_CURSOR, position)
+            published += len(events)
+            self._published += len(events)
+            if len(events) < self._batch_size:
+                break
+        return published
+
+    async def prune(self) -> int:
+        created_before = datetime.now(timezone.utc) - self._retention
+        async with AsyncSessionLocal() as db_session:
+            outbox_repo = OutboxRepository(db_session)
+            up_to = None
+            if self._publisher is not None:
+                up_to = await outbox_repo.get_cursor(OUTBOX_RELAY_CURSOR)
+                if up_to is None:
+                    return 0
+            pruned = await outbox_repo.prune(created_before, up_to, self._prune_batch_size)
+        self._pruned += pruned
+        return pruned
+
+    def snapshot(self) -> Dict[str, float]:
+        values = {
+            "outbox_published_total": self._published,
+            "outbox_publish_failures_total": self._failures,
+            "outbox_pruned_total": self._pruned,
+        }
+        if self.lag_seconds is not None:
+            values["outbox_relay_lag_seconds"] = self.lag_seconds
+        return values
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.elect():
+                    if self._publisher is not None:
+                        await self.relay()
+                    await self.prune()
+            except Exception:
+                logger.exception("Cannot relay the outbox")
+            await asyncio.sleep(self._interval)
+
+
+outbox_relay = OutboxRelay(
+    publisher=(
+        WebhookPublisher(settings.outbox_relay_url, settings.outbox_relay_timeout_seconds)
+        if settings.outbox_relay_url else None
+    ),
+    interval=settings.outbox_relay_interval_seconds,
+    batch_size=settings.outbox_relay_batch_size,
+    max_batches=settings.outbox_relay_max_batches,
+    retention=settings.outbox_retention_seconds,
+    prune_batch_size=settings.outbox_prune_batch_size,
+)
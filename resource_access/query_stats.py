@@ -0,0 +1,67 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Statements, rows and database time of one unit of work, usually a request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, rows: int, seconds: float) -> None:
+        self.queries += 1
+        self.rows += max(rows, 0)
+        self.db_time += seconds
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least `threshold` times, the usual shape of an N+1."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started_at = conn.info.get("query_started_at")
+    if stats is None or not started_at:
+        return
+    stats.record(statement, cursor.rowcount, time.perf_counter() - started_at.pop())
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from resource_access.db_session import AsyncSessionLocal, async_engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+# Seconds of replay lag, 0 when the replica has replayed everything the
+# primary had written when the check started or is not in recovery at all
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_wal_lsn_diff(CAST(CAST(:primary_lsn AS text) AS pg_lsn), pg_last_wal_replay_lsn()) <= 0 THEN 0 "
+    "ELSE extract(epoch FROM clock_timestamp() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaRouter:
+    """Hands out sessions for read-only usecases, on a replica that is not too far behind.
+
+    Lag is measured every `check_interval` seconds. Until a replica has
+    been measured, or when it is unreachable or lags more than `max_lag`,
+    reads go to the primary.
+    """
+
+    descriptions: Dict[str, Tuple[str, str]] = {
+        "db_replica_reads_total": ("counter", "Read-only sessions opened on a replica."),
+        "db_primary_reads_total": ("counter", "Read-only sessions that fell back to the primary."),
+        "db_replicas_usable": ("gauge", "Replicas within the allowed lag at the last check."),
+        "db_replica_max_lag_seconds": ("gauge", "Largest lag of a reachable replica at the last check."),
+    }
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+    ):
+        self._primary = primary
+        self._replicas = replicas
+        self._replica_sessions = [
+            sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession) for engine in replicas
+        ]
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        # None: not measured yet or unreachable
+        self.lags: List[Optional[float]] = [None] * len(replicas)
+        self._unreachable: Set[int] = set()
+        self._next = 0
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def usable_replicas(self) -> List[int]:
+        return [index for index, lag in enumerate(self.lags) if lag is not None and lag <= self._max_lag]
+
+    def read_session(self) -> AsyncSession:
+        usable = self.usable_replicas()
+        if not usable:
+            self._primary_reads += 1
+            return AsyncSessionLocal()
+        # Round robin over the usable replicas
+        self._next = (self._next + 1) % len(usable)
+        self._replica_reads += 1
+        return self._replica_sessions[usable[self._next]]()
+
+    async def check_lag(self) -> None:
+        try:
+            async with self._primary.connect() as connection:
+                primary_lsn = await connection.scalar(text("SELECT pg_current_wal_lsn()::text"))
+        except (OSError, DBAPIError) as e:
+            # Without the primary position lag cannot be told, keep the last values
+            logger.warning(f"Cannot read the primary WAL position: {e}")
+            return
+
+        for index, engine in enumerate(self._replicas):
+            try:
+                async with engine.connect() as connection:
+                    lag = await connection.scalar(REPLICA_LAG_QUERY, {"primary_lsn": primary_lsn})
+                # No replay timestamp yet means nothing was ever replayed
+                self.lags[index] = float(lag) if lag is not None else None
+                self._unreachable.discard(index)
+            except (OSError, DBAPIError) as e:
+                if index not in self._unreachable:
+                    logger.warning(f"Replica {engine.url.host} is unreachable: {e}")
+                    self._unreachable.add(index)
+                self.lags[index] = None
+
+    def snapshot(self) -> Dict[str, float]:
+        values = {
+            "db_replica_reads_total": self._replica_reads,
+            "db_primary_reads_total": self._primary_reads,
+        }
+        if self._replicas:
+            values["db_replicas_usable"] = len(self.usable_replicas())
+            lags = [lag for lag in self.lags if lag is not None]
+            if lags:
+                values["db_replica_max_lag_seconds"] = max(lags)
+        return values
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_lag()
+            except Exception:
+                logger.exception("Cannot measure replica lag")
+            await asyncio.sleep(self._check_interval)
+
+
+replica_router = ReplicaRouter(
+    primary=async_engine,
+    replicas=replica_engines,
+    max_lag=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_lag_check_seconds,
+)
@@ -1,21 +1,32 @@
 import logging
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Mapping, Optional, Tuple
 
 from psycopg2.errorcodes import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION
 from pydantic.tools import parse_obj_as
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, func, select, text, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from exceptions import NotFoundException, AlreadyExistsException
+from exceptions import NotFoundException, AlreadyExistsException, InvalidStatusTransitionException, \
+    DataValidationException
+from resource_access.caches.store_caches import store_catalog_cache
 from resource_access.db_models.order_models import OrderDB, StoreDB, VisitDB
-from schemas.enums import UserRoleEnum
-from schemas.order_schemas import Order, Store, OrderFilter, StoreFilter, Visit, VisitFilter
+from resource_access.order_events import ORDER_CREATED, ORDER_STATUS_CHANGED, ORDER_UPDATED, notify_order_event
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from core.config import settings
+from schemas.order_schemas import Order, Store, OrderFilter, StoreFilter, Visit, VisitFilter, ExportFilter, \
+    OrderOut, StoreOut, VisitOut
 from schemas.user_schemas import User
 
 logger = logging.getLogger(__name__)
 
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class OrderRepository:
 
     def __init__(self, db_session: Session):
@@ -24,14 +35,14 @@ class OrderRepository:
     async def create_order(
         self, order: Order
     ) -> Order:
-        order_db = OrderDB(
-            **order.model_dump(exclude={"id"})
-        )
-        self._db_session.add(order_db)
-
         try:
+            query = await self._db_session.execute(
+                insert(OrderDB)
+                .values(**order.model_dump(exclude={"id"}, exclude_none=True))
+                .returning(OrderDB, notify_order_event(ORDER_CREATED))
+            )
+            order_db, _ = query.one()
             await self._db_session.commit()
-            await self._db_session.refresh(order_db)
             return Order.model_validate(order_db)
         except IntegrityError as error:
             logger.error(
@@ -40,7 +51,31 @@ class OrderRepository:
             await self._db_session.rollback()
             await self.__integrity_error_handler(error, order)
 
-    async def get_orders(self, filters: OrderFilter, user: User) -> List[Order]:
+    async def create_orders(self, orders: List[Order]) -> List[Order]:
+        """Insert all orders with one multi-row INSERT ... RETURNING."""
+        try:
+            query = await self._db_session.scalars(
+                insert(OrderDB).returning(OrderDB, notify_order_event(ORDER_CREATED), sort_by_parameter_order=True),
+                [order.model_dump(exclude={"id"}, exclude_none=True) for order in orders],
+            )
+            orders_db = query.all()
+            await self._db_session.commit()
+            return parse_obj_as(List[Order], orders_db)
+        except IntegrityError as error:
+            logger.error(
+                f"Error while creating Orders. Details: {error.orig.args}"
+            )
+            await self._db_session.rollback()
+            raise DataValidationException("Orders reference a missing store or worker")
+
+    async def get_orders(
+        self,
+        filters: OrderFilter,
+        user: User,
+        after_id: Optional[int] = None,
+        fields: Iterable[str] = tuple(OrderOut.model_fields),
+    ) -> List[dict]:
+        """Rows with the given OrderOut fields, left unvalidated for RowsJSONResponse."""
         where_args = [
             OrderDB.is_deleted.is_(False),
             OrderDB.status == filters.status
@@ -50,14 +85,40 @@ class OrderRepository:
         elif user.role == UserRoleEnum.worker:
             where_args.append(OrderDB.worker_id == user.id)
 
+        # Keyset pagination: continue below the last id of the previous page
+        # instead of OFFSET, so every page costs the same index range scan.
+        if after_id is not None:
+            where_args.append(OrderDB.id < after_id)
+
         stmt = (
-            select(OrderDB)
+            select(*OrderDB.columns(fields))
             .where(*where_args)
             .order_by(OrderDB.id.desc())
+            .limit(filters.limit)
         )
 
         query = await self._db_session.execute(stmt)
-        return parse_obj_as(List[Order], query.scalars().all())
+        return [row._asdict() for row in query]
+
+    async def stream_orders(self, filters: ExportFilter) -> AsyncIterator[List[Mapping]]:
+        """Orders oldest first, in batches read from a server-side cursor."""
+        where_args = [OrderDB.is_deleted.is_(False)]
+        if filters.store_id is not None:
+            where_args.append(OrderDB.store_id == filters.store_id)
+        if filters.created_from:
+            where_args.append(OrderDB.created_at >= filters.created_from)
+        if filters.created_to:
+            where_args.append(OrderDB.created_at < filters.created_to)
+
+        stmt = (
+            select(*OrderDB.columns(OrderOut.model_fields))
+            .where(*where_args)
+            .order_by(OrderDB.id)
+            .execution_options(yield_per=settings.export_fetch_size)
+        )
+        result = await self._db_session.stream(stmt)
+        async for rows in result.mappings().partitions():
+            yield rows
 
     async def update_order(self, order: Order) -> Order:
         await self.get_order_by_id(order.id)
@@ -66,10 +127,10 @@ class OrderRepository:
                 update(OrderDB)
                 .where(OrderDB.id == order.id)
                 .values(**order.model_dump(exclude_unset=True, exclude={"id", "created_at"}))
-                .returning(OrderDB)
+                .returning(OrderDB, notify_order_event(ORDER_UPDATED))
             )
             await self._db_session.commit()
-            order_db, = query.one()  # Unpacking the tuple
+            order_db, _ = query.one()
             return Order.model_validate(order_db)
         except IntegrityError as error:
             logger.error(
@@ -78,6 +139,89 @@ class OrderRepository:
             await self._db_session.rollback()
             await self.__integrity_error_handler(error, order)
 
+    async def update_order_status(
+        self,
+        order_id: int,
+        status: OrderStatusEnum,
+        allowed_from: List[OrderStatusEnum],
+    ) -> Order:
+        # One round trip: `target` snapshots the current status so an empty
+        # `updated` can be told apart from a missing order. The status check
+        # sits in the UPDATE itself, so it is re-evaluated on the locked row.
+        target = (
+            select(OrderDB.id, OrderDB.status)
+            .where(OrderDB.id == order_id, OrderDB.is_deleted.is_(False))
+            .cte("target")
+        )
+        updated = (
+            update(OrderDB)
+            .where(
+                OrderDB.id == order_id,
+                OrderDB.is_deleted.is_(False),
+                OrderDB.status.in_(allowed_from),
+            )
+            .values(status=status)
+            .returning(OrderDB.id, OrderDB.status, notify_order_event(ORDER_STATUS_CHANGED))
+            .cte("updated")
+        )
+        query = await self._db_session.execute(
+            select(target.c.status.label("current_status"), updated.c.id, updated.c.status)
+            .select_from(target.outerjoin(updated, true()))
+        )
+        await self._db_session.commit()
+
+        row = query.one_or_none()
+        if row is None:
+            raise NotFoundException(f"There is no order with this id: {order_id}")
+        if row.id is None:
+            raise InvalidStatusTransitionException(
+                f"Cannot change order status from {row.current_status.value} to {status.value}"
+            )
+        return Order(id=row.id, status=row.status)
+
+    def __expired_where(self, expired_before: datetime, open_statuses: List[OrderStatusEnum]) -> list:
+        # Statuses are inlined so the predicate still matches the partial
+        # ix_orders_open_expires_at index under a generic prepared plan
+        return [
+            OrderDB.is_deleted.is_(False),
+            OrderDB.status.in_(bindparam("open_statuses", open_statuses, expanding=True, literal_execute=True)),
+            OrderDB.expires_at <= expired_before,
+        ]
+
+    async def get_oldest_expired_at(
+        self, expired_before: datetime, open_statuses: List[OrderStatusEnum]
+    ) -> Optional[datetime]:
+        query = await self._db_session.execute(
+            select(func.min(OrderDB.expires_at)).where(*self.__expired_where(expired_before, open_statuses))
+        )
+        return query.scalar()
+
+    async def cancel_expired_orders(
+        self, expired_before: datetime, open_statuses: List[OrderStatusEnum], limit: int
+    ) -> int:
+        """Cancel up to `limit` of the oldest expired orders in one short transaction.
+
+        Rows locked by a status update or another sweeper are skipped rather
+        than waited for; they are picked up by a later batch.
+        """
+        expired = (
+            select(OrderDB.id)
+            .where(*self.__expired_where(expired_before, open_statuses))
+            .order_by(OrderDB.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = await self._db_session.execute(
+            update(OrderDB)
+            .where(OrderDB.id.in_(expired.scalar_subquery()))
+            .values(status=OrderStatusEnum.canceled)
+            .returning(OrderDB.id, notify_order_event(ORDER_STATUS_CHANGED))
+            .execution_options(synchronize_session=False)
+        )
+        rows = query.all()
+        await self._db_session.commit()
+        return len(rows)
+
     async def delete_order(
         self, order_id: int
     ) -> None:
@@ -117,6 +261,10 @@ class StoreRepository:
         self._db_session = db_session
 
     async def get_store_by_id(self, store_id: int) -> Store:
+        store = store_catalog_cache.get_store(store_id)
+        if store is not None:
+            return store
+
         stmt = select(StoreDB).where(
             StoreDB.id == store_id,
             StoreDB.is_deleted.is_(False),
@@ -125,26 +273,55 @@ class StoreRepository:
         store_db = query.scalar()
 
         if store_db:
-            return store_db
+            store = Store.model_validate(store_db)
+            store_catalog_cache.set_store(store)
+            return store
         raise NotFoundException(f"Does not store with id: {store_id}")
 
-    async def get_stores(self, filters: StoreFilter) -> List[Store]:
+    async def get_stores(
+        self, filters: StoreFilter, fields: Iterable[str] = tuple(StoreOut.model_fields)
+    ) -> List[dict]:
+        """Rows with the given StoreOut fields, left unvalidated for RowsJSONResponse."""
+        fields = tuple(fields)
+        cache_key = (*filters.model_dump(exclude={"fields"}).items(), fields)
+        stores = store_catalog_cache.get_listing(cache_key)
+        if stores is not None:
+            return stores
+
         where_args = [StoreDB.is_deleted.is_(False)]
+        order_by = [StoreDB.id.desc()]
 
         if filters.id is not None:
             where_args.append(StoreDB.id == filters.id)
 
+        if filters.title and filters.prefix:
+            # A byte-wise range on the lower(title) text_pattern_ops index.
+            # Unlike LIKE :pattern it stays indexable in the generic plans
+            # asyncpg's prepared statements end up with.
+            prefix = filters.title.lower()
+            lower_title = func.lower(StoreDB.title)
+            where_args.append(lower_title.op("~>=~")(prefix))
+            if prefix[-1] != chr(0x10FFFF):
+                where_args.append(lower_title.op("~<~")(prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+            # Alphabetical in the index's own byte order, so the scan stops
+            # after `limit` rows whether or not anything matches
+            order_by = [text("lower(stores.title) USING ~<~"), StoreDB.id]
+        elif filters.title:
+            # Served by the pg_trgm GIN index, closest titles first
+            pattern = _escape_like(filters.title)
+            where_args.append(StoreDB.title.ilike(f"%{pattern}%"))
+            order_by.insert(0, func.similarity(StoreDB.title, filters.title).desc())
+
+        stmt = select(*StoreDB.columns(fields)).where(*where_args).order_by(*order_by)
         if filters.title:
-            where_args.append(StoreDB.title.like(f"%{filters.title}%"))
-
-        stmt = (
-            select(StoreDB)
-            .where(*where_args)
-            .order_by(StoreDB.id.desc())
-        )
+            # Only searches are cut to the best `limit` matches, the plain
+            # listing has no cursor to fetch the rest with
+            stmt = stmt.limit(filters.limit)
 
         query = await self._db_session.execute(stmt)
-        return parse_obj_as(List[Store], query.scalars().all())
+        stores = [row._asdict() for row in query]
+        store_catalog_cache.set_listing(cache_key, stores)
+        return stores
 
 
 class VisitRepository:
@@ -170,6 +347,73 @@ class VisitRepository:
             await self._db_session.rollback()
             await self.__integrity_error_handler(error, visit)
 
+    async def create_visit_for_order(
+            self, order_id: int, customer: User, received_at: datetime
+    ) -> Tuple[Order, Optional[Visit]]:
+        # Checks and insert in one statement. `target` snapshots the order so
+        # the caller can tell why nothing was inserted; the order_id unique
+        # constraint turns a duplicate visit into an empty `inserted`.
+        target = (
+            select(
+                OrderDB.id,
+                OrderDB.expires_at,
+                OrderDB.store_id,
+                OrderDB.customer_id,
+                OrderDB.worker_id,
+            )
+            .where(OrderDB.id == order_id, OrderDB.is_deleted.is_(False))
+            .cte("target")
+        )
+        inserted = (
+            insert(VisitDB)
+            .from_select(
+                ["worker_id", "order_id", "customer_id", "store_id"],
+                select(
+                    target.c.worker_id,
+                    target.c.id,
+                    target.c.customer_id,
+                    target.c.store_id,
+                ).where(
+                    target.c.expires_at <= received_at,
+                    target.c.store_id == customer.store_id,
+                    target.c.customer_id == customer.id,
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=[VisitDB.order_id])
+            .returning(VisitDB.id, VisitDB.created_at)
+            .cte("inserted")
+        )
+        query = await self._db_session.execute(
+            select(
+                target,
+                inserted.c.id.label("visit_id"),
+                inserted.c.created_at.label("visit_created_at"),
+            ).select_from(target.outerjoin(inserted, true()))
+        )
+        await self._db_session.commit()
+
+        row = query.one_or_none()
+        if row is None:
+            raise NotFoundException(f"There is no order with this id: {order_id}")
+
+        order = Order(
+            id=row.id,
+            expires_at=row.expires_at,
+            store_id=row.store_id,
+            customer_id=row.customer_id,
+            worker_id=row.worker_id,
+        )
+        if row.visit_id is None:
+            return order, None
+        return order, Visit(
+            id=row.visit_id,
+            created_at=row.visit_created_at,
+            worker_id=row.worker_id,
+            order_id=row.id,
+            customer_id=row.customer_id,
+            store_id=row.store_id,
+        )
+
     async def get_visit_by_order_id(self, order_id: int) -> Visit:
         stmt = select(VisitDB).where(
             VisitDB.order_id == order_id,
@@ -180,7 +424,10 @@ class VisitRepository:
 
         return visit_db
 
-    async def get_visits(self, filters: VisitFilter) -> List[Visit]:
+    async def get_visits(
+        self, filters: VisitFilter, fields: Iterable[str] = tuple(VisitOut.model_fields)
+    ) -> List[dict]:
+        """Rows with the given VisitOut fields, left unvalidated for RowsJSONResponse."""
         where_args = [
             VisitDB.is_deleted.is_(False),
         ]
@@ -188,13 +435,33 @@ class VisitRepository:
             where_args.append(VisitDB.order_id == filters.order_id)
 
         stmt = (
-            select(VisitDB)
+            select(*VisitDB.columns(fields))
             .where(*where_args)
             .order_by(VisitDB.id.desc())
         )
 
         query = await self._db_session.execute(stmt)
-        return parse_obj_as(List[Visit], query.scalars().all())
+        return [row._asdict() for row in query]
+
+    async def stream_visits(self, filters: ExportFilter) -> AsyncIterator[List[Mapping]]:
+        """Visits oldest first, in batches read from a server-side cursor."""
+        where_args = [VisitDB.is_deleted.is_(False)]
+        if filters.store_id is not None:
+            where_args.append(VisitDB.store_id == filters.store_id)
+        if filters.created_from:
+            where_args.append(VisitDB.created_at >= filters.created_from)
+        if filters.created_to:
+            where_args.append(VisitDB.created_at < filters.created_to)
+
+        stmt = (
+            select(*VisitDB.columns(VisitOut.model_fields))
+            .where(*where_args)
+            .order_by(VisitDB.id)
+            .execution_options(yield_per=settings.export_fetch_size)
+        )
+        result = await self._db_session.stream(stmt)
+        async for rows in result.mappings().partitions():
+            yield rows
 
     async def delete_visit(
         self, visit_id: int
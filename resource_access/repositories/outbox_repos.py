@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from resource_access.db_models.outbox_models import OutboxCursorDB, OutboxDB
+from schemas.outbox_schemas import OutboxEventOut
+
+# Transactions below this id have all ended: their events are committed or
+# gone, while a running transaction may still commit events sorting earlier
+# than the ones already visible
+VISIBLE_TXID_BOUND = literal_column("CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)")
+
+
+class OutboxRepository:
+
+    def __init__(self, db_session: Session):
+        self._db_session = db_session
+
+    async def get_events(self, after: Optional[Tuple[int, int]], limit: int) -> List[dict]:
+        """Up to `limit` events after the (txid, id) position, in order."""
+        where_args = [OutboxDB.txid < VISIBLE_TXID_BOUND]
+        if after is not None:
+            where_args.append(tuple_(OutboxDB.txid, OutboxDB.id) > tuple_(*after))
+
+        query = await self._db_session.execute(
+            select(*OutboxDB.columns(OutboxEventOut.model_fields))
+            .where(*where_args)
+            .order_by(OutboxDB.txid, OutboxDB.id)
+            .limit(limit)
+        )
+        return [row._asdict() for row in query]
+
+    async def get_cursor(self, name: str) -> Optional[Tuple[int, int]]:
+        query = await self._db_session.execute(
+            select(OutboxCursorDB.txid, OutboxCursorDB.event_id).where(OutboxCursorDB.name == name)
+        )
+        row = query.one_or_none()
+        return tuple(row) if row else None
+
+    async def save_cursor(self, name: str, position: Tuple[int, int]) -> None:
+        txid, event_id = position
+        stmt = insert(OutboxCursorDB).values(name=name, txid=txid, event_id=event_id)
+        await self._db_session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[OutboxCursorDB.name],
+                set_={"txid": stmt.excluded.txid, "event_id": stmt.excluded.event_id},
+            )
+        )
+        await self._db_session.commit()
+
+    async def prune(self, created_before: datetime, up_to: Optional[Tuple[int, int]], limit: int) -> int:
+        """Delete up to `limit` of the oldest events created before `created_before`, and not after `up_to`."""
+        where_args = [OutboxDB.created_at < created_before]
+        if up_to is not None:
+            where_args.append(tuple_(OutboxDB.txid, OutboxDB.id) <= tuple_(*up_to))
+        oldest = select(OutboxDB.id).where(*where_args).order_by(OutboxDB.created_at).limit(limit)
+
+        query = await self._db_session.execute(
+            delete(OutboxDB)
+            .where(OutboxDB.id.in_(oldest.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await self._db_session.commit()
+        return query.rowcount
@@ -0,0 +1,61 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.orm import Session
+
+from resource_access.db_models.order_models import OrderDB, VisitDB
+from schemas.enums import UserRoleEnum
+from schemas.order_schemas import OrderOut, VisitOut
+from schemas.user_schemas import User
+
+# Rows below this txid are written by transactions that have all ended,
+# as in the outbox: the smallest transaction id still running in the
+# cluster, whatever its role, or the next one to be assigned. The
+# transaction reading counts as ended, so it sees its own writes.
+SYNC_HORIZON_QUERY = text(
+    "SELECT coalesce("
+    "(SELECT min(CAST(CAST(xip AS text) AS bigint)) FROM pg_snapshot_xip(snapshot) xip), "
+    "greatest("
+    "CAST(CAST(pg_snapshot_xmax(snapshot) AS text) AS bigint), "
+    "CAST(CAST(pg_current_xact_id_if_assigned() AS text) AS bigint) + 1"
+    ")) FROM pg_current_snapshot() snapshot"
+)
+
+
+class SyncRepository:
+    """Rows of one user changed after a (txid, id) position, for delta sync."""
+
+    def __init__(self, db_session: Session):
+        self._db_session = db_session
+
+    async def get_horizon(self) -> int:
+        query = await self._db_session.execute(SYNC_HORIZON_QUERY)
+        return query.scalar()
+
+    async def get_order_changes(
+        self, user: User, after: Optional[Tuple[int, int]], horizon: int, limit: int
+    ) -> List[dict]:
+        return await self.__get_changes(OrderDB, OrderOut, user, after, horizon, limit)
+
+    async def get_visit_changes(
+        self, user: User, after: Optional[Tuple[int, int]], horizon: int, limit: int
+    ) -> List[dict]:
+        return await self.__get_changes(VisitDB, VisitOut, user, after, horizon, limit)
+
+    async def __get_changes(
+        self, db_model, schema, user: User, after: Optional[Tuple[int, int]], horizon: int, limit: int
+    ) -> List[dict]:
+        owner = db_model.customer_id if user.role == UserRoleEnum.customer else db_model.worker_id
+        # Deleted rows are included, the caller sends them as tombstones
+        where_args = [owner == user.id, db_model.txid < horizon]
+        if after is not None:
+            where_args.append(tuple_(db_model.txid, db_model.id) > tuple_(*after))
+
+        stmt = (
+            select(*db_model.columns(schema.model_fields), db_model.txid, db_model.is_deleted)
+            .where(*where_args)
+            .order_by(db_model.txid, db_model.id)
+            .limit(limit)
+        )
+        query = await self._db_session.execute(stmt)
+        return [row._asdict() for row in query]
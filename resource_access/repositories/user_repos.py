@@ -1,15 +1,19 @@
 import logging
-from typing import List
-from pydantic.tools import parse_obj_as
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from psycopg2.errorcodes import UNIQUE_VIOLATION
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from exceptions import NotFoundException, AlreadyExistsException
+from resource_access.caches.invalidation import PRINCIPAL, STORE_USERS, TOKEN_VERSION, publish_invalidation
+from resource_access.caches.lookup_tables import lookup_tables
+from resource_access.caches.store_caches import store_catalog_cache
+from resource_access.caches.user_caches import principal_cache, token_version_cache
 from resource_access.db_models.user_models import UserDB
-from schemas.user_schemas import User, UserFilter
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User, UserFilter, UserOut
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +30,14 @@ class UserRepository:
         )
         self._db_session.add(user_db)
         try:
+            if user_db.store_id is not None:
+                await publish_invalidation(self._db_session, STORE_USERS, user_db.store_id)
             await self._db_session.commit()
             await self._db_session.refresh(user_db)
+            principal_cache.invalidate_user(user_db.id)
+            if user_db.store_id is not None:
+                store_catalog_cache.invalidate_store_users(user_db.store_id)
+                lookup_tables.invalidate_store_users(user_db.store_id)
             return User.model_validate(user_db)
         except IntegrityError as e:
             logger.error(
@@ -62,7 +72,90 @@ class UserRepository:
             return User.model_validate(user_db)
         raise NotFoundException(f"Not found user with id: {user_id}")
 
-    async def get_users(self, filters: UserFilter) -> List[User]:
+    async def get_token_version(self, user_id: int) -> int:
+        query = await self._db_session.execute(
+            select(UserDB.token_version).where(
+                UserDB.id == user_id, UserDB.is_deleted.is_(False)
+            )
+        )
+        token_version = query.scalar()
+        if token_version is None:
+            raise NotFoundException(f"Not found user with id: {user_id}")
+
+        token_version_cache.set(user_id, token_version)
+        return token_version
+
+    async def bump_token_version(self, user_id: int) -> int:
+        query = await self._db_session.execute(
+            update(UserDB)
+            .where(UserDB.id == user_id, UserDB.is_deleted.is_(False))
+            .values(token_version=UserDB.token_version + 1)
+            .returning(UserDB.token_version)
+        )
+        token_version = query.scalar()
+        await publish_invalidation(self._db_session, TOKEN_VERSION, user_id)
+        await publish_invalidation(self._db_session, PRINCIPAL, user_id)
+        await self._db_session.commit()
+        if token_version is None:
+            raise NotFoundException(f"Not found user with id: {user_id}")
+
+        token_version_cache.set(user_id, token_version)
+        principal_cache.invalidate_user(user_id)
+        lookup_tables.invalidate_user(user_id)
+        return token_version
+
+    async def get_store_user_ids(
+        self, store_ids: Set[int]
+    ) -> Dict[int, FrozenSet[int]]:
+        """Ids of the users of each store, read through the store catalog cache."""
+        user_ids = {}
+        missing = set()
+        for store_id in store_ids:
+            cached = store_catalog_cache.get_user_ids(store_id)
+            if cached is None:
+                missing.add(store_id)
+            else:
+                user_ids[store_id] = cached
+
+        if missing:
+            query = await self._db_session.execute(
+                select(UserDB.store_id, UserDB.id).where(UserDB.store_id.in_(missing))
+            )
+            loaded = {store_id: set() for store_id in missing}
+            for store_id, user_id in query.tuples():
+                loaded[store_id].add(user_id)
+            for store_id, ids in loaded.items():
+                user_ids[store_id] = frozenset(ids)
+                store_catalog_cache.set_user_ids(store_id, user_ids[store_id])
+        return user_ids
+
+    async def is_user_in_store(self, user_id: int, store_id: int) -> bool:
+        user_ids = await self.get_store_user_ids({store_id})
+        return user_id in user_ids[store_id]
+
+    async def get_store_memberships(
+        self, pairs: Set[Tuple[int, int]]
+    ) -> Set[Tuple[int, int]]:
+        """Return the (user_id, store_id) pairs that exist among `pairs`."""
+        if not pairs:
+            return set()
+        user_ids = await self.get_store_user_ids({store_id for _, store_id in pairs})
+        return {
+            (user_id, store_id) for user_id, store_id in pairs
+            if user_id in user_ids[store_id]
+        }
+
+    async def get_lookup_rows(self) -> List[Tuple[int, UserRoleEnum, Optional[int], bool]]:
+        """(id, role, store_id, is_deleted) of every user, for the shared lookup tables."""
+        query = await self._db_session.execute(
+            select(UserDB.id, UserDB.role, UserDB.store_id, UserDB.is_deleted)
+        )
+        return query.tuples().all()
+
+    async def get_users(
+        self, filters: UserFilter, fields: Iterable[str] = tuple(UserOut.model_fields)
+    ) -> List[dict]:
+        """Rows with the given UserOut fields, left unvalidated for RowsJSONResponse."""
         where_args = [
             UserDB.is_deleted.is_(False),
         ]
@@ -72,10 +165,10 @@ class UserRepository:
             where_args.append(UserDB.username == filters.username)
 
         stmt = (
-            select(UserDB)
+            select(*UserDB.columns(fields))
             .where(*where_args)
             .order_by(UserDB.id.desc())
         )
 
         query = await self._db_session.execute(stmt)
-        return parse_obj_as(List[User], query.scalars().all())
+        return [row._asdict() for row in query]
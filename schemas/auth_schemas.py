@@ -2,9 +2,14 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from .enums import UserRoleEnum
+
 
 class TokenPayload(BaseModel):
     sub: int
+    role: Optional[UserRoleEnum] = None
+    store_id: Optional[int] = None
+    ver: Optional[int] = None
 
 
 class TokenSchema(BaseModel):
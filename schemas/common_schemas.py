@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel, field_validator
+
+from core.config import settings
+
+
+class LimitFilter(BaseModel):
+    limit: int = settings.default_pagination_limit
+
+    @field_validator("limit")
+    @classmethod
+    def clamp_limit(cls, v: int) -> int:
+        return max(1, min(v, settings.max_pagination_limit))
+
+
+class FieldsFilter(BaseModel):
+    # Comma-separated subset of the response fields, e.g. `id,status,expires_at`
+    fields: Optional[str] = None
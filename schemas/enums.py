@@ -12,3 +12,8 @@ class OrderStatusEnum(str, Enum):
     in_process = "in_process"
     awaiting = "awaiting"
     canceled = "canceled"
+
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
@@ -1,12 +1,13 @@
 from datetime import datetime, timezone
 from typing import Optional, List
 
-from pydantic import BaseModel, root_validator, model_validator
+from pydantic import BaseModel, Field, root_validator, model_validator
 from typing_extensions import Any
 
+from core.config import settings
 from exceptions import DataValidationException
-from schemas.enums import OrderStatusEnum
-from schemas.user_schemas import User
+from schemas.common_schemas import FieldsFilter, LimitFilter
+from schemas.enums import ExportFormatEnum, OrderStatusEnum
 
 
 class Order(BaseModel):
@@ -25,7 +26,6 @@ class Order(BaseModel):
 class Store(BaseModel):
     id: Optional[int] = None
     title: Optional[str] = None
-    users: Optional[User] = None
 
     class Config:
         from_attributes = True
@@ -36,9 +36,11 @@ class StoreOut(BaseModel):
     title: str
 
 
-class StoreFilter(BaseModel):
+class StoreFilter(LimitFilter, FieldsFilter):
     id: Optional[int] = None
     title: Optional[str] = None
+    # Match titles starting with `title` instead of containing it
+    prefix: bool = False
 
 
 expires_at = datetime(2023, 9, 3, 9, 29, 6, tzinfo=timezone.utc)
@@ -60,9 +62,28 @@ class OrderOut(BaseModel):
     worker_id: int
 
 
-class OrderFilter(BaseModel):
+class OrderBulkIn(BaseModel):
+    orders: List[OrderIn] = Field(min_length=1, max_length=settings.max_bulk_orders)
+
+
+class OrderBulkItem(BaseModel):
+    index: int
+    order: Optional[Order] = None
+    message: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class OrderBulkItemOut(BaseModel):
+    index: int
+    order: Optional[OrderOut] = None
+    message: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class OrderFilter(LimitFilter, FieldsFilter):
     my_order: Optional[bool] = None
     status: Optional[OrderStatusEnum] = None
+    cursor: Optional[str] = None
 
 
 class OrderUpdateIn(BaseModel):
@@ -112,5 +133,27 @@ class VisitIn(BaseModel):
     order_id: int
 
 
-class VisitFilter(BaseModel):
+class VisitFilter(FieldsFilter):
     order_id: Optional[int] = None
+
+
+class ExportFilter(BaseModel):
+    store_id: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    format: ExportFormatEnum = ExportFormatEnum.ndjson
+
+
+class SyncFilter(LimitFilter):
+    # `cursor` of the previous sync, none for the first one
+    cursor: Optional[str] = None
+
+
+class SyncOut(BaseModel):
+    orders: List[OrderOut]
+    deleted_order_ids: List[int]
+    visits: List[VisitOut]
+    deleted_visit_ids: List[int]
+    cursor: str
+    # More changes are waiting, sync again right away with `cursor`
+    has_more: bool
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+
+class OutboxEventOut(BaseModel):
+    id: int
+    # Events are ordered by (txid, id)
+    txid: int
+    created_at: datetime
+    # "order" or "visit"
+    aggregate: str
+    aggregate_id: int
+    # e.g. order_created, order_status_changed, visit_deleted
+    event: str
+    # The row after the write
+    payload: Dict[str, Any]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from .common_schemas import FieldsFilter
 from .enums import UserRoleEnum
 
 
@@ -11,6 +12,7 @@ class User(BaseModel):
     role: Optional[UserRoleEnum] = None
     store_id: Optional[int] = None
     hashed_password: Optional[str] = None
+    token_version: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -37,6 +39,6 @@ class UserLoginIn(BaseModel):
     password: str
 
 
-class UserFilter(BaseModel):
+class UserFilter(FieldsFilter):
     first_name: Optional[str] = None
     username: Optional[str] = None
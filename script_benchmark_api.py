@@ -0,0 +1,270 @@
+"""Drive the FastAPI app in process against the local Postgres and report latency.
+
+    python script_benchmark_api.py --concurrency 16 --duration 20 \
+        --mix list_orders=10,create_order=4,create_visit=2,update_status=2,login=1 \
+        --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import subprocess
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from core.config import settings
+from main import app
+from resource_access.db_session import AsyncSessionLocal
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from schemas.user_schemas import User
+from usecases.crm_usecases import create_user_usecase
+
+PASSWORD = "benchmark-password"
+DEFAULT_MIX = "list_orders=10,create_order=4,create_visit=2,update_status=2,login=1"
+NEXT_STATUS = {
+    OrderStatusEnum.started: OrderStatusEnum.in_process,
+    OrderStatusEnum.in_process: OrderStatusEnum.awaiting,
+    OrderStatusEnum.awaiting: OrderStatusEnum.ended,
+}
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("store_visit.access").setLevel(logging.WARNING)
+
+
+class BenchmarkState:
+    def __init__(self, customer: User, worker: User, token: str, visit_orders: List[int], status_orders: List[int]):
+        self.customer = customer
+        self.worker = worker
+        self.headers = {"Authorization": f"Bearer {token}"}
+        # Expired orders, each can take one visit
+        self.visit_orders = deque(visit_orders)
+        # (order id, current status), advanced one step per request
+        self.status_orders = deque((order_id, OrderStatusEnum.started) for order_id in status_orders)
+
+
+async def login(client: AsyncClient, state: BenchmarkState) -> int:
+    response = await client.post(
+        "/auth/login/", json={"username": state.customer.username, "password": PASSWORD}
+    )
+    return response.status_code
+
+
+async def create_order(client: AsyncClient, state: BenchmarkState) -> int:
+    response = await client.post(
+        "/customers/create-order/",
+        json={
+            "expires_at": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+            "store_id": state.worker.store_id,
+            "worker_id": state.worker.id,
+        },
+        headers=state.headers,
+    )
+    return response.status_code
+
+
+async def list_orders(client: AsyncClient, state: BenchmarkState) -> int:
+    response = await client.get("/customers/orders/", headers=state.headers)
+    return response.status_code
+
+
+async def create_visit(client: AsyncClient, state: BenchmarkState) -> Optional[int]:
+    if not state.visit_orders:
+        return None
+    response = await client.post(
+        "/customers/create-visit/", json={"order_id": state.visit_orders.popleft()}, headers=state.headers
+    )
+    return response.status_code
+
+
+async def update_status(client: AsyncClient, state: BenchmarkState) -> Optional[int]:
+    if not state.status_orders:
+        return None
+    order_id, current = state.status_orders.popleft()
+    response = await client.put(
+        f"/customers/order/{order_id}/status/", json={"status": NEXT_STATUS[current]}, headers=state.headers
+    )
+    if NEXT_STATUS[current] in NEXT_STATUS:
+        state.status_orders.append((order_id, NEXT_STATUS[current]))
+    return response.status_code
+
+
+OPERATIONS: Dict[str, Callable] = {
+    "login": login,
+    "create_order": create_order,
+    "list_orders": list_orders,
+    "create_visit": create_visit,
+    "update_status": update_status,
+}
+EXPECTED_STATUS = {"login": 200, "create_order": 201, "list_orders": 200, "create_visit": 201, "update_status": 200}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+async def setup(pool_size: int) -> BenchmarkState:
+    async with AsyncSessionLocal() as session:
+        store_id = (await session.execute(
+            text("INSERT INTO stores (title) VALUES ('benchmark store') RETURNING id")
+        )).scalar()
+        await session.commit()
+        suffix = random.randrange(10 ** 9)
+        customer = await create_user_usecase(session, User(
+            username=f"benchmark_api_customer_{suffix}", role=UserRoleEnum.customer, store_id=store_id,
+        ), PASSWORD)
+        worker = await create_user_usecase(session, User(
+            username=f"benchmark_api_worker_{suffix}", role=UserRoleEnum.worker, store_id=store_id,
+        ), PASSWORD)
+
+        order_ids = (await session.execute(
+            text(
+                "INSERT INTO orders (expires_at, store_id, customer_id, worker_id, status) "
+                "SELECT now() - interval '1 hour', :store_id, :customer_id, :worker_id, 'started' "
+                "FROM generate_series(1, :count) RETURNING id"
+            ),
+            {"store_id": store_id, "customer_id": customer.id, "worker_id": worker.id, "count": 2 * pool_size},
+        )).scalars().all()
+        await session.commit()
+
+    async with AsyncClient(app=app, base_url=f"http://benchmark{settings.api_path}") as client:
+        response = await client.post("/auth/login/", json={"username": customer.username, "password": PASSWORD})
+    return BenchmarkState(customer, worker, response.json()["access_token"], order_ids[:pool_size], order_ids[pool_size:])
+
+
+async def cleanup(state: BenchmarkState) -> None:
+    async with AsyncSessionLocal() as session:
+        params = {"customer_id": state.customer.id, "worker_id": state.worker.id, "store_id": state.worker.store_id}
+        await session.execute(text("DELETE FROM visits WHERE customer_id = :customer_id"), params)
+        await session.execute(text("DELETE FROM orders WHERE customer_id = :customer_id"), params)
+        await session.execute(text("DELETE FROM users WHERE id IN (:customer_id, :worker_id)"), params)
+        await session.execute(text("DELETE FROM stores WHERE id = :store_id"), params)
+        await session.commit()
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    state = await setup(args.pool_size)
+    try:
+        async with AsyncClient(app=app, base_url=f"http://benchmark{settings.api_path}") as client:
+            deadline = time.perf_counter() + args.warmup + args.duration
+            measure_from = time.perf_counter() + args.warmup
+
+            async def user_loop() -> None:
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights=weights)[0]
+                    start = time.perf_counter()
+                    status_code = await OPERATIONS[name](client, state)
+                    if status_code is None or start < measure_from:
+                        continue
+                    latencies[name].append((time.perf_counter() - start) * 1000)
+                    if status_code != EXPECTED_STATUS[name]:
+                        errors[name] += 1
+
+            await asyncio.gather(*(user_loop() for _ in range(args.concurrency)))
+    finally:
+        await cleanup(state)
+
+    operations = {}
+    for name in names:
+        values = sorted(latencies[name])
+        operations[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / args.duration, 2),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    return {
+        "commit": git_commit(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "total": {
+            "requests": len(all_values),
+            "errors": sum(errors.values()),
+            "throughput_rps": round(len(all_values) / args.duration, 2),
+            "p50_ms": round(percentile(all_values, 50), 2),
+            "p95_ms": round(percentile(all_values, 95), 2),
+            "p99_ms": round(percentile(all_values, 99), 2),
+        },
+        "operations": operations,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(baseline: dict, result: dict) -> None:
+    print(f"{'operation':>14} {'rps':>16} {'p50, ms':>18} {'p99, ms':>18}")
+    rows = [("total", baseline["total"], result["total"])] + [
+        (name, baseline["operations"][name], stats)
+        for name, stats in result["operations"].items() if name in baseline["operations"]
+    ]
+    for name, before, after in rows:
+        columns = [
+            f"{before[key]:>7} -> {after[key]:<7}" for key in ("throughput_rps", "p50_ms", "p99_ms")
+        ]
+        print(f"{name:>14} {columns[0]:>16} {columns[1]:>18} {columns[2]:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated clients")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds run before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight pairs")
+    parser.add_argument("--pool-size", type=int, default=5000, help="orders seeded for visits and status updates")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare with")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report + "\n")
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            print_comparison(json.load(baseline_file), result)
+
+
+if __name__ == "__main__":
+    main()
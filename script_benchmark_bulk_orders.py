@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from core.config import settings
+from main import app
+from resource_access.db_session import AsyncSessionLocal
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User
+from usecases.crm_usecases import create_user_usecase
+
+ORDER_COUNTS = [10, 100, 500]
+PASSWORD = "benchmark-password"
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def create_users() -> tuple:
+    async with AsyncSessionLocal() as session:
+        store_id = (await session.execute(
+            text("INSERT INTO stores (title) VALUES ('benchmark store') RETURNING id")
+        )).scalar()
+        await session.commit()
+        customer = await create_user_usecase(
+            session,
+            User(username="benchmark_bulk_customer", first_name="Customer", role=UserRoleEnum.customer, store_id=store_id),
+            PASSWORD,
+        )
+        worker = await create_user_usecase(
+            session,
+            User(username="benchmark_bulk_worker", first_name="Worker", role=UserRoleEnum.worker, store_id=store_id),
+            PASSWORD,
+        )
+        return customer, worker
+
+
+async def cleanup(customer: User, worker: User) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM orders WHERE customer_id = :id"), {"id": customer.id})
+        await session.execute(text("DELETE FROM users WHERE id IN (:customer, :worker)"), {
+            "customer": customer.id, "worker": worker.id,
+        })
+        await session.execute(text("DELETE FROM stores WHERE id = :id"), {"id": customer.store_id})
+        await session.commit()
+
+
+def order_payload(worker: User) -> dict:
+    return {
+        "expires_at": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+        "store_id": worker.store_id,
+        "worker_id": worker.id,
+    }
+
+
+async def single_calls(client: AsyncClient, headers: dict, worker: User, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        response = await client.post("/customers/create-order/", json=order_payload(worker), headers=headers)
+        assert response.status_code == 201, response.text
+    return time.perf_counter() - start
+
+
+async def bulk_call(client: AsyncClient, headers: dict, worker: User, count: int) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/customers/orders/bulk/",
+        json={"orders": [order_payload(worker) for _ in range(count)]},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert all(item["order"] for item in response.json())
+    return time.perf_counter() - start
+
+
+async def main():
+    customer, worker = await create_users()
+    try:
+        async with AsyncClient(app=app, base_url=f"http://benchmark{settings.api_path}") as client:
+            response = await client.post(
+                "/auth/login/", json={"username": customer.username, "password": PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            print(f"{'orders':>8} {'single calls, ms':>18} {'bulk call, ms':>15} {'speedup':>9}")
+            for count in ORDER_COUNTS:
+                single = await single_calls(client, headers, worker, count)
+                bulk = await bulk_call(client, headers, worker, count)
+                print(f"{count:>8} {single * 1000:>18.1f} {bulk * 1000:>15.1f} {single / bulk:>8.1f}x")
+    finally:
+        await cleanup(customer, worker)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import statistics
+import time
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from core.config import settings
+from main import app
+from resource_access.db_session import AsyncSessionLocal
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User
+from usecases.crm_usecases import create_user_usecase
+
+USERNAME = "benchmark_login_customer"
+PASSWORD = "benchmark-password"
+ORDER_REQUESTS = 200
+# Keep below the async pool size so orders requests never wait for a connection
+LOGIN_CONCURRENCY = 16
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def create_customer() -> User:
+    async with AsyncSessionLocal() as session:
+        store_id = (await session.execute(
+            text("INSERT INTO stores (title) VALUES ('benchmark store') RETURNING id")
+        )).scalar()
+        await session.commit()
+        user = User(username=USERNAME, first_name="Benchmark", role=UserRoleEnum.customer, store_id=store_id)
+        return await create_user_usecase(session, user, PASSWORD)
+
+
+async def cleanup(user: User) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user.id})
+        await session.execute(text("DELETE FROM stores WHERE id = :id"), {"id": user.store_id})
+        await session.commit()
+
+
+async def login(client: AsyncClient) -> str:
+    response = await client.post("/auth/login/", json={"username": USERNAME, "password": PASSWORD})
+    return response.json().get("access_token")
+
+
+async def measure_orders(client: AsyncClient, token: str) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    timings = []
+    for _ in range(ORDER_REQUESTS):
+        start = time.perf_counter()
+        await client.get("/customers/orders/", headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+    quantiles = statistics.quantiles(timings, n=100)
+    return {"p50": quantiles[49], "p99": quantiles[98]}
+
+
+async def saturate_login(client: AsyncClient, stop: asyncio.Event, counter: list) -> None:
+    while not stop.is_set():
+        await login(client)
+        counter[0] += 1
+
+
+async def main():
+    user = await create_customer()
+    try:
+        async with AsyncClient(app=app, base_url=f"http://benchmark{settings.api_path}") as client:
+            token = await login(client)
+            idle = await measure_orders(client, token)
+
+            stop, logins = asyncio.Event(), [0]
+            workers = [
+                asyncio.create_task(saturate_login(client, stop, logins))
+                for _ in range(LOGIN_CONCURRENCY)
+            ]
+            await asyncio.sleep(1)
+            start = time.perf_counter()
+            saturated = await measure_orders(client, token)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await asyncio.gather(*workers)
+
+        print(f"{'':>24} {'p50, ms':>10} {'p99, ms':>10}")
+        print(f"{'orders, idle':>24} {idle['p50']:>10.2f} {idle['p99']:>10.2f}")
+        print(f"{'orders, login saturated':>24} {saturated['p50']:>10.2f} {saturated['p99']:>10.2f}")
+        print(f"logins completed: {logins[0]} ({logins[0] / elapsed:.1f}/s while measuring)")
+    finally:
+        await cleanup(user)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
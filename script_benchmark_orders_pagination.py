@@ -0,0 +1,93 @@
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from core.config import settings
+from resource_access.db_session import AsyncSessionLocal
+from resource_access.repositories.order_repos import OrderRepository
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from schemas.order_schemas import OrderFilter
+from schemas.user_schemas import User
+
+TABLE_SIZES = [10_000, 100_000, 1_000_000]
+REPEATS = 20
+
+
+async def create_customer(session) -> User:
+    store_id = (await session.execute(
+        text("INSERT INTO stores (title) VALUES ('benchmark store') RETURNING id")
+    )).scalar()
+    user_id = (await session.execute(
+        text(
+            "INSERT INTO users (username, first_name, role, store_id) "
+            "VALUES ('benchmark_customer', 'Benchmark', 'customer', :store_id) RETURNING id"
+        ),
+        {"store_id": store_id},
+    )).scalar()
+    await session.commit()
+    return User(id=user_id, role=UserRoleEnum.customer, store_id=store_id)
+
+
+async def seed_orders(session, user: User, count: int) -> None:
+    await session.execute(
+        text(
+            "INSERT INTO orders (expires_at, store_id, customer_id, worker_id, status) "
+            "SELECT now() + interval '7 days', :store_id, :user_id, :user_id, 'started' "
+            "FROM generate_series(1, :count)"
+        ),
+        {"store_id": user.store_id, "user_id": user.id, "count": count},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE orders"))
+
+
+async def last_page_after_id(session, user: User) -> int:
+    # The cursor that returns the oldest page of this customer's orders.
+    return (await session.execute(
+        text(
+            "SELECT id FROM orders WHERE customer_id = :user_id "
+            "ORDER BY id ASC OFFSET :limit LIMIT 1"
+        ),
+        {"user_id": user.id, "limit": settings.default_pagination_limit},
+    )).scalar()
+
+
+async def measure(session, user: User, after_id: int = None) -> float:
+    order_repo = OrderRepository(session)
+    filters = OrderFilter(status=OrderStatusEnum.started)
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await order_repo.get_orders(filters, user, after_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def cleanup(session, user: User) -> None:
+    await session.execute(text("DELETE FROM orders WHERE customer_id = :id"), {"id": user.id})
+    await session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user.id})
+    await session.execute(text("DELETE FROM stores WHERE id = :id"), {"id": user.store_id})
+    await session.commit()
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        user = await create_customer(session)
+        seeded = 0
+        try:
+            print(f"{'rows':>10} {'first page, ms':>16} {'last page, ms':>16}")
+            for size in TABLE_SIZES:
+                await seed_orders(session, user, size - seeded)
+                seeded = size
+
+                first_page = await measure(session, user)
+                last_page = await measure(session, user, await last_page_after_id(session, user))
+                print(f"{size:>10} {first_page:>16.2f} {last_page:>16.2f}")
+        finally:
+            await cleanup(session, user)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
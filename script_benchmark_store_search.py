@@ -0,0 +1,68 @@
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from resource_access.db_session import AsyncSessionLocal
+from resource_access.repositories.order_repos import StoreRepository
+from schemas.order_schemas import StoreFilter
+
+STORE_COUNT = 100_000
+REPEATS = 20
+SEARCH_TERMS = ["fresh", "Green Mar", "bazaar 7", "zz"]
+
+
+async def seed_stores(session) -> int:
+    first_id = (await session.execute(text("SELECT coalesce(max(id), 0) + 1 FROM stores"))).scalar()
+    await session.execute(
+        text(
+            "INSERT INTO stores (title) "
+            "SELECT (ARRAY['Green', 'Fresh', 'Family', 'Golden', 'Corner', 'Central', 'Happy', 'Daily'])[g % 8 + 1] "
+            "|| ' ' || (ARRAY['Market', 'Grocery', 'Bazaar', 'Store', 'Mart', 'Shop', 'Outlet'])[g % 7 + 1] "
+            "|| ' ' || g "
+            "FROM generate_series(1, :count) g"
+        ),
+        {"count": STORE_COUNT},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE stores"))
+    return first_id
+
+
+async def cleanup(session, first_id: int) -> None:
+    await session.execute(text("DELETE FROM stores WHERE id >= :id"), {"id": first_id})
+    await session.commit()
+
+
+async def timed(func) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        first_id = await seed_stores(session)
+        store_repo = StoreRepository(session)
+        try:
+            print(f"{STORE_COUNT} stores, median of {REPEATS} runs")
+            print(f"{'term':>12} {'old LIKE, ms':>14} {'contains, ms':>14} {'prefix, ms':>12}")
+            for term in SEARCH_TERMS:
+                # The previous query: case-sensitive, unanchored, no limit
+                old_like = await timed(lambda: session.execute(
+                    text("SELECT * FROM stores WHERE is_deleted IS false AND title LIKE :pattern ORDER BY id DESC"),
+                    {"pattern": f"%{term}%"},
+                ))
+                contains = await timed(lambda: store_repo.get_stores(StoreFilter(title=term)))
+                prefix = await timed(lambda: store_repo.get_stores(StoreFilter(title=term, prefix=True)))
+                print(f"{term:>12} {old_like:>14.2f} {contains:>14.2f} {prefix:>12.2f}")
+        finally:
+            await cleanup(session, first_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+"""Seed production-sized tables with COPY.
+
+    python script_seed_database.py --stores 1000 --customers 200000 --orders 2000000
+
+Rows get ids after the current maximum of each table, so the command can
+run against a database that already has data. Every seeded user shares
+one bcrypt hash of --password.
+
+The outbox triggers on orders and visits are disabled for the seeding
+transaction: seeded rows are not lifecycle events and must not reach the
+outbox relay. The table locks this takes are held until the commit. The
+set_updated_at row trigger still runs, so timings include it.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Sequence
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from engines.auth_engines import pwd_context
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+
+STORE_WORDS = (
+    ["Green", "Fresh", "Family", "Golden", "Corner", "Central", "Happy", "Daily", "Royal", "Sunny"],
+    ["Market", "Grocery", "Bazaar", "Store", "Mart", "Shop", "Outlet", "Deli"],
+)
+FIRST_NAMES = ["Aibek", "Aigerim", "Nurlan", "Dana", "Timur", "Aliya", "Azamat", "Elnura", "Bakyt", "Saltanat"]
+
+# Tables whose inserts the outbox triggers record
+OUTBOX_TABLES = ("orders", "visits")
+
+# Orders that already expired mostly end, the rest are still being worked on
+EXPIRED_STATUSES = (
+    [OrderStatusEnum.ended, OrderStatusEnum.canceled, OrderStatusEnum.awaiting],
+    [80, 15, 5],
+)
+OPEN_STATUSES = (
+    [OrderStatusEnum.started, OrderStatusEnum.in_process, OrderStatusEnum.awaiting, OrderStatusEnum.canceled],
+    [50, 30, 15, 5],
+)
+
+
+def batched(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def next_id(connection, table: str) -> int:
+    return await connection.fetchval(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+
+
+async def copy_rows(connection, table: str, columns: Sequence[str], rows: Iterator[tuple], batch_size: int) -> int:
+    count = 0
+    for batch in batched(rows, batch_size):
+        await connection.copy_records_to_table(table, records=batch, columns=list(columns))
+        count += len(batch)
+    return count
+
+
+class Seeder:
+    def __init__(self, args, hashed_password: str):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.hashed_password = hashed_password
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def stores(self, first_id: int) -> Iterator[tuple]:
+        for store_id in range(first_id, first_id + self.args.stores):
+            title = f"{self.rng.choice(STORE_WORDS[0])} {self.rng.choice(STORE_WORDS[1])} {store_id}"
+            yield store_id, title, False
+
+    def users(self, first_id: int, store_ids: range) -> Iterator[tuple]:
+        user_id = first_id
+        for store_id in store_ids:
+            for _ in range(self.args.workers_per_store):
+                yield self._user(user_id, UserRoleEnum.worker, store_id)
+                user_id += 1
+        for customer_index in range(self.args.customers):
+            yield self._user(user_id, UserRoleEnum.customer, store_ids[customer_index % len(store_ids)])
+            user_id += 1
+
+    def _user(self, user_id: int, role: UserRoleEnum, store_id: int) -> tuple:
+        return (
+            user_id, f"{role.value}_{user_id}", self.rng.choice(FIRST_NAMES), role.value,
+            store_id, self.hashed_password, 0, False,
+        )
+
+    def orders_and_visits(self, first_order_id: int, first_visit_id: int, store_ids: range, customers: range):
+        """Yield (order, visit or None). Customers order from their own store."""
+        workers_per_store = self.args.workers_per_store
+        first_worker_id = customers.start - len(store_ids) * workers_per_store
+        visit_id = first_visit_id
+        for order_id in range(first_order_id, first_order_id + self.args.orders):
+            customer_index = self.rng.randrange(len(customers))
+            customer_id = customers[customer_index]
+            store_index = customer_index % len(store_ids)
+            store_id = store_ids[store_index]
+            worker_id = first_worker_id + store_index * workers_per_store + self.rng.randrange(workers_per_store)
+
+            created_at = self.now - timedelta(seconds=self.rng.randrange(self.args.days * 86400))
+            expires_at = created_at + timedelta(minutes=self.rng.randrange(30, 7 * 24 * 60))
+            statuses = EXPIRED_STATUSES if expires_at <= self.now else OPEN_STATUSES
+            status = self.rng.choices(*statuses)[0]
+            is_deleted = self.rng.random() < 0.01
+            order = (
+                order_id, created_at, expires_at, store_id, customer_id, status.value, worker_id, is_deleted,
+            )
+
+            visit = None
+            if status == OrderStatusEnum.ended and not is_deleted:
+                visited_at = min(expires_at + timedelta(minutes=self.rng.randrange(0, 120)), self.now)
+                visit = (visit_id, visited_at, worker_id, order_id, customer_id, store_id, False)
+                visit_id += 1
+            yield order, visit
+
+
+async def seed(args) -> None:
+    dsn = make_url(settings.postgres_async_url).set(drivername="postgresql").render_as_string(hide_password=False)
+    connection = await asyncpg.connect(dsn)
+    hashed_password = pwd_context.hash(args.password)
+    seeder = Seeder(args, hashed_password)
+    timings = {}
+    try:
+        async with connection.transaction():
+            first_store_id = await next_id(connection, "stores")
+            first_user_id = await next_id(connection, "users")
+            first_order_id = await next_id(connection, "orders")
+            first_visit_id = await next_id(connection, "visits")
+            store_ids = range(first_store_id, first_store_id + args.stores)
+            workers = args.stores * args.workers_per_store
+            customers = range(first_user_id + workers, first_user_id + workers + args.customers)
+
+            start = time.perf_counter()
+            count = await copy_rows(
+                connection, "stores", ["id", "title", "is_deleted"],
+                seeder.stores(first_store_id), args.batch_size,
+            )
+            timings["stores"] = (count, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            count = await copy_rows(
+                connection, "users",
+                ["id", "username", "first_name", "role", "store_id", "hashed_password", "token_version", "is_deleted"],
+                seeder.users(first_user_id, store_ids), args.batch_size,
+            )
+            timings["users"] = (count, time.perf_counter() - start)
+
+            for table in OUTBOX_TABLES:
+                await connection.execute(f"ALTER TABLE {table} DISABLE TRIGGER {table}_append_outbox_inserts")
+
+            start = time.perf_counter()
+            orders_count = visits_count = 0
+            pairs = seeder.orders_and_visits(first_order_id, first_visit_id, store_ids, customers)
+            for batch in batched(pairs, args.batch_size):
+                orders = [order for order, _ in batch]
+                visits = [visit for _, visit in batch if visit is not None]
+                await connection.copy_records_to_table(
+                    "orders", records=orders,
+                    columns=["id", "created_at", "expires_at", "store_id", "customer_id", "status", "worker_id",
+                             "is_deleted"],
+                )
+                await connection.copy_records_to_table(
+                    "visits", records=visits,
+                    columns=["id", "created_at", "worker_id", "order_id", "customer_id", "store_id", "is_deleted"],
+                )
+                orders_count += len(orders)
+                visits_count += len(visits)
+            elapsed = time.perf_counter() - start
+            timings["orders + visits"] = (orders_count + visits_count, elapsed)
+
+            for table in OUTBOX_TABLES:
+                await connection.execute(f"ALTER TABLE {table} ENABLE TRIGGER {table}_append_outbox_inserts")
+
+            for table in ("stores", "users", "orders", "visits"):
+                await connection.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                )
+
+        start = time.perf_counter()
+        await connection.execute("ANALYZE stores, users, orders, visits")
+        timings["analyze"] = (0, time.perf_counter() - start)
+    finally:
+        await connection.close()
+
+    print(f"{'table':>16} {'rows':>10} {'seconds':>9} {'rows/s':>10}")
+    for table, (count, elapsed) in timings.items():
+        rate = f"{count / elapsed:>10.0f}" if count else f"{'':>10}"
+        print(f"{table:>16} {count:>10} {elapsed:>9.2f} {rate}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", type=int, default=1_000)
+    parser.add_argument("--workers-per-store", type=int, default=5)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=180, help="spread order creation over this many days")
+    parser.add_argument("--password", default="seed-password", help="password of every seeded user")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.stores < 1 or args.workers_per_store < 1 or args.customers < 1:
+        parser.error("--stores, --workers-per-store and --customers must be at least 1")
+    asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    main()
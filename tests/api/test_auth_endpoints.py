@@ -0,0 +1,64 @@
+import pytest
+from jose import jwt
+
+from core.config import settings
+from core.constants import JWT_ALGORITHM
+from exceptions import NotFoundException, ServiceOverloadedException
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User
+from usecases.customer_usecases import user_login_usecase
+
+
+@pytest.mark.asyncio
+async def test_revoke_tokens_success(sqlite_client, mocker):
+    usecase = mocker.patch("api.customer.auth_endpoints.revoke_tokens_usecase")
+
+    response = await sqlite_client.post("/auth/revoke-tokens/")
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Tokens revoked"}
+    assert usecase.call_args.args[1].id == 1
+
+
+@pytest.mark.asyncio
+async def test_revoke_tokens_fail_not_found(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.auth_endpoints.revoke_tokens_usecase",
+        side_effect=NotFoundException("Not found user"),
+    )
+
+    response = await sqlite_client.post("/auth/revoke-tokens/")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_login_issues_self_contained_token(mocker):
+    mocker.patch.object(settings, "self_contained_access_tokens", True)
+    mocker.patch(
+        "usecases.customer_usecases.UserRepository.get_user_by_username",
+        return_value=User(id=7, role=UserRoleEnum.worker, store_id=2, token_version=4),
+    )
+    mocker.patch("usecases.customer_usecases.AuthenticationEngine.validate_password")
+
+    tokens = await user_login_usecase(None, username="worker", password="password")
+
+    payload = jwt.decode(
+        tokens["access_token"], settings.access_token_secret_key, algorithms=[JWT_ALGORITHM]
+    )
+    assert (payload["sub"], payload["role"], payload["store_id"], payload["ver"]) == ("7", "worker", 2, 4)
+
+
+@pytest.mark.asyncio
+async def test_login_fail_overloaded(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.auth_endpoints.user_login_usecase",
+        side_effect=ServiceOverloadedException(),
+    )
+
+    response = await sqlite_client.post(
+        "/auth/login/", json={"username": "test", "password": "password"}
+    )
+
+    assert response.status_code == 503
+    assert response.json()["error_code"] == "ServiceOverloaded"
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+
+@pytest.mark.asyncio
+async def test_export_orders_streams_usecase_chunks(sqlite_client, mocker):
+    async def chunks(db_session, filters):
+        yield '{"id": 1}\n'
+        yield '{"id": 2}\n'
+
+    usecase = mocker.patch("api.crm.crm_endpoints.export_orders_usecase", side_effect=chunks)
+
+    response = await sqlite_client.get("/crm/orders/export/", params={"store_id": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text == '{"id": 1}\n{"id": 2}\n'
+    assert usecase.call_args.args[1].store_id == 3
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_unknown_format(sqlite_client):
+    response = await sqlite_client.get("/crm/visits/export/", params={"format": "xml"})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_export_orders_csv(client, db_session, mocker):
+    mocker.patch("resource_access.repositories.order_repos.settings.export_fetch_size", 7)
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store'), (2, 'other store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) VALUES (1, 'customer', 'customer', 1)"
+    ))
+    await db_session.execute(text(
+        "INSERT INTO orders (id, created_at, expires_at, store_id, customer_id, worker_id, status) "
+        "SELECT g, timestamp '2026-01-01' + g * interval '1 day', now(), 1 + g % 2, 1, 1, 'started' "
+        "FROM generate_series(1, 40) g"
+    ))
+
+    response = await client.get("/crm/orders/export/", params={
+        "format": "csv", "store_id": 1, "created_from": "2026-01-10T00:00:00", "created_to": "2026-02-01T00:00:00",
+    })
+
+    lines = response.text.splitlines()
+    assert response.headers["content-type"].startswith("text/csv")
+    assert lines[0] == "id,created_at,expires_at,store_id,customer_id,status,worker_id"
+    assert [int(line.split(",")[0]) for line in lines[1:]] == list(range(10, 31, 2))
+
+
+@pytest.mark.asyncio
+async def test_get_users_rejects_fields_outside_user_out(sqlite_client):
+    response = await sqlite_client.get("/crm/get-users/", params={"fields": "username,hashed_password"})
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "Unknown fields: hashed_password. Allowed: id, username, first_name, role, store_id",
+        "error_code": "IncorrectDataError",
+    }
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_users_selects_only_requested_fields(client, db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, first_name, role, store_id) "
+        "VALUES (1, 'first', 'First', 'customer', 1), (2, 'second', 'Second', 'worker', 1)"
+    ))
+
+    response = await client.get("/crm/get-users/", params={"fields": "role, username"})
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 2, "username": "second", "role": "worker"},
+        {"id": 1, "username": "first", "role": "customer"},
+    ]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_export_orders_keeps_created_range_offset(client, db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) VALUES (1, 'customer', 'customer', 1)"
+    ))
+    # One order an hour around 2026-10-01T00:00+06:00, which is 2026-09-30T18:00Z
+    await db_session.execute(text(
+        "INSERT INTO orders (id, created_at, expires_at, store_id, customer_id, worker_id, status) "
+        "SELECT g, timestamptz '2026-09-30T15:00:00Z' + g * interval '1 hour', now(), 1, 1, 1, 'started' "
+        "FROM generate_series(1, 8) g"
+    ))
+
+    response = await client.get("/crm/orders/export/", params={
+        "store_id": 1, "created_from": "2026-10-01T00:00:00+06:00", "created_to": "2026-10-01T02:00:00+06:00",
+    })
+
+    # [18:00Z, 20:00Z): the 18:00 edge is in, the 20:00 edge is out
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [3, 4]
@@ -1,14 +1,22 @@
-from datetime import datetime
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
 
 import pytest
 from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import text
 
 import usecases.customer_usecases
-from exceptions import NotFoundException, DataValidationException, AccessDeniedException
+from core.pagination import decode_cursor
+from core.responses import RowsJSONResponse
+from exceptions import NotFoundException, DataValidationException, AccessDeniedException, \
+    InvalidStatusTransitionException, TimeIsUpException
 from schemas.enums import OrderStatusEnum, UserRoleEnum
-from schemas.order_schemas import OrderIn, Order, Store, VisitIn, Visit
+from schemas.order_schemas import OrderIn, Order, OrderOut, Store, VisitIn, Visit, OrderBulkItem, SyncFilter, SyncOut
 from schemas.user_schemas import User
-from usecases.customer_usecases import create_visit_usecase
+from tests.fixtures.common_setup import AsyncTestSession
+from usecases.customer_usecases import create_visit_usecase, sync_usecase
 
 
 @pytest.mark.asyncio
@@ -101,7 +109,7 @@ async def test_get_orders_success(sqlite_client, mocker):
 
     mocker.patch(
         "api.customer.customer_endpoints.get_orders_usecase",
-        return_value=[order]
+        return_value=[order.model_dump()]
     )
 
     response = await sqlite_client.get(
@@ -121,6 +129,97 @@ async def test_get_orders_success(sqlite_client, mocker):
     ]
 
 
+def test_rows_response_matches_response_model():
+    rows = [{
+        "id": 1,
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+        "expires_at": datetime(2026, 1, 3),
+        "store_id": 1,
+        "customer_id": 2,
+        "status": OrderStatusEnum.awaiting,
+        "worker_id": 3,
+    }]
+
+    response = RowsJSONResponse(rows, OrderOut)
+
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == jsonable_encoder(TypeAdapter(List[OrderOut]).validate_python(rows))
+
+
+@pytest.mark.asyncio
+async def test_get_orders_full_page_returns_next_cursor(sqlite_client, mocker):
+    date = datetime.now()
+    orders = [
+        Order(
+            id=order_id,
+            created_at=date.isoformat(),
+            expires_at=date.isoformat(),
+            store_id=1,
+            worker_id=1,
+            customer_id=1,
+            status=OrderStatusEnum.started
+        )
+        for order_id in (3, 2)
+    ]
+
+    usecase = mocker.patch(
+        "api.customer.customer_endpoints.get_orders_usecase",
+        return_value=[order.model_dump() for order in orders]
+    )
+
+    response = await sqlite_client.get(
+        "/customers/orders/", params={"limit": 2}
+    )
+    assert response.status_code == 200
+    assert [order["id"] for order in response.json()] == [3, 2]
+
+    next_cursor = response.headers["X-Next-Cursor"]
+    assert decode_cursor(next_cursor) == 2
+
+    await sqlite_client.get(
+        "/customers/orders/", params={"limit": 2, "cursor": next_cursor}
+    )
+    assert usecase.call_args.args[1].cursor == next_cursor
+
+
+@pytest.mark.asyncio
+async def test_get_orders_last_page_has_no_next_cursor(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.customer_endpoints.get_orders_usecase",
+        return_value=[]
+    )
+
+    response = await sqlite_client.get("/customers/orders/")
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_orders_fail_invalid_cursor(sqlite_client):
+    response = await sqlite_client.get(
+        "/customers/orders/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "Invalid pagination cursor",
+        "error_code": "IncorrectDataError",
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_orders_limit_is_capped(sqlite_client, mocker):
+    usecase = mocker.patch(
+        "api.customer.customer_endpoints.get_orders_usecase",
+        return_value=[]
+    )
+
+    response = await sqlite_client.get(
+        "/customers/orders/", params={"limit": 10_000}
+    )
+    assert response.status_code == 200
+    assert usecase.call_args.args[1].limit == 100
+
+
 @pytest.mark.asyncio
 async def test_update_orders_success(sqlite_client, mocker):
     date = datetime.now()
@@ -201,7 +300,7 @@ async def test_get_stores_success(sqlite_client, mocker):
 
     mocker.patch(
         "api.customer.customer_endpoints.get_stores_usecase",
-        return_value=[store],
+        return_value=[store.model_dump()],
     )
 
     response = await sqlite_client.get(
@@ -300,7 +399,7 @@ async def test_get_visits_success(sqlite_client, mocker):
 
     mocker.patch(
         "api.customer.customer_endpoints.get_visits_usecase",
-        return_value=[visit],
+        return_value=[visit.model_dump()],
     )
 
     response = await sqlite_client.get(
@@ -372,3 +471,199 @@ async def test_update_order_status_fail_not_found(sqlite_client, mocker):
 
     assert "message" in response.json()
     assert "error_code" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_update_order_status_fail_invalid_transition(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.customer_endpoints.update_order_status_usecase",
+        side_effect=InvalidStatusTransitionException("Cannot change order status from ended to started"),
+    )
+
+    response = await sqlite_client.put("/customers/order/1/status/", json={"status": "started"})
+
+    assert response.status_code == 409
+    assert response.json() == {
+        "message": "Cannot change order status from ended to started",
+        "error_code": "InvalidStatusTransition",
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_visit_fail_not_found(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.customer_endpoints.create_visit_usecase",
+        side_effect=NotFoundException("There is no order with this id: 1"),
+    )
+    response = await sqlite_client.post("/customers/create-visit/", json={"order_id": 1})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_visit_fail_time_is_up(sqlite_client, mocker):
+    mocker.patch(
+        "api.customer.customer_endpoints.create_visit_usecase",
+        side_effect=TimeIsUpException("Order receipt time"),
+    )
+    response = await sqlite_client.post("/customers/create-visit/", json={"order_id": 1})
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "TimeIsUpException"
+
+
+@pytest.mark.asyncio
+async def test_create_orders_bulk_success(sqlite_client, mocker):
+    date = datetime.now()
+    order = Order(
+        id=1,
+        created_at=date,
+        expires_at=date,
+        store_id=1,
+        worker_id=1,
+        customer_id=1,
+        status=OrderStatusEnum.started
+    )
+    mocker.patch(
+        "api.customer.customer_endpoints.create_orders_bulk_usecase",
+        return_value=[
+            OrderBulkItem(index=0, order=order),
+            OrderBulkItem(index=1, message="You cannot create an order for another store", error_code="IncorrectDataError"),
+        ],
+    )
+    order_in = {"expires_at": date.isoformat(), "store_id": 1, "worker_id": 1}
+
+    response = await sqlite_client.post(
+        "/customers/orders/bulk/", json={"orders": [order_in, {**order_in, "store_id": 2}]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()[0]["order"]["id"] == 1
+    assert response.json()[1] == {
+        "index": 1,
+        "order": None,
+        "message": "You cannot create an order for another store",
+        "error_code": "IncorrectDataError",
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_orders_bulk_fail_empty(sqlite_client):
+    response = await sqlite_client.post("/customers/orders/bulk/", json={"orders": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sync_fail_invalid_cursor(sqlite_client):
+    response = await sqlite_client.get("/customers/sync/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json() == {"message": "Invalid sync cursor", "error_code": "IncorrectDataError"}
+
+
+async def sync_committed(user: User, cursor: Optional[str] = None) -> SyncOut:
+    async with AsyncTestSession() as session:
+        return await sync_usecase(session, SyncFilter(cursor=cursor), user)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_sync_returns_only_changes_since_cursor():
+    customer = User(id=911, role=UserRoleEnum.customer)
+    async with AsyncTestSession() as session:
+        await session.execute(text("INSERT INTO stores (id, title) VALUES (911, 'store')"))
+        await session.execute(text(
+            "INSERT INTO users (id, username, role, store_id) "
+            "VALUES (911, 'customer 911', 'customer', 911), (912, 'customer 912', 'customer', 911)"
+        ))
+        await session.execute(text(
+            "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status) "
+            "SELECT 910 + g, now(), 911, 911 + g / 4, 911, 'started' FROM generate_series(1, 5) g"
+        ))
+        await session.execute(text(
+            "INSERT INTO visits (id, order_id, customer_id, worker_id, store_id) VALUES (911, 911, 911, 911, 911)"
+        ))
+        await session.commit()
+    try:
+        first = await sync_committed(customer)
+        assert [order.id for order in first.orders] == [911, 912, 913]
+        assert [visit.id for visit in first.visits] == [911]
+        assert first.has_more is False
+
+        unchanged = await sync_committed(customer, first.cursor)
+        assert unchanged.orders == unchanged.visits == []
+
+        async with AsyncTestSession() as session:
+            await session.execute(text("UPDATE orders SET status = 'in_process' WHERE id = 912"))
+            await session.execute(text("UPDATE orders SET is_deleted = true WHERE id = 913"))
+            await session.execute(text("UPDATE orders SET status = 'in_process' WHERE id = 914"))
+            await session.commit()
+        changed = await sync_committed(customer, first.cursor)
+
+        assert [(order.id, order.status) for order in changed.orders] == [(912, OrderStatusEnum.in_process)]
+        assert changed.deleted_order_ids == [913]
+        assert changed.visits == changed.deleted_visit_ids == []
+    finally:
+        async with AsyncTestSession() as session:
+            await session.execute(text("DELETE FROM visits WHERE store_id = 911"))
+            await session.execute(text("DELETE FROM orders WHERE store_id = 911"))
+            await session.execute(text("DELETE FROM users WHERE id IN (911, 912)"))
+            await session.execute(text("DELETE FROM stores WHERE id = 911"))
+            await session.commit()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_sync_waits_for_slow_writers():
+    customer = User(id=921, role=UserRoleEnum.customer)
+    async with AsyncTestSession() as session:
+        await session.execute(text("INSERT INTO stores (id, title) VALUES (921, 'store')"))
+        await session.execute(text("INSERT INTO users (id, username, role, store_id) VALUES (921, 'c921', 'customer', 921)"))
+        await session.commit()
+    insert_order = text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id) VALUES (:id, now(), 921, 921, 921)"
+    )
+    try:
+        async with AsyncTestSession() as slow:
+            # Open, but without a transaction id until it writes
+            await slow.execute(text("SELECT 1"))
+            async with AsyncTestSession() as fast:
+                await fast.execute(insert_order, {"id": 922})
+                await fast.commit()
+            first = await sync_committed(customer)
+            assert [order.id for order in first.orders] == [922]
+
+            await slow.execute(insert_order, {"id": 921})
+            async with AsyncTestSession() as fast:
+                await fast.execute(insert_order, {"id": 923})
+                await fast.commit()
+            # 923 is committed, but the slow writer may still commit rows before it
+            second = await sync_committed(customer, first.cursor)
+            assert second.orders == []
+            await slow.commit()
+
+        third = await sync_committed(customer, second.cursor)
+        assert [order.id for order in third.orders] == [921, 923]
+    finally:
+        async with AsyncTestSession() as session:
+            await session.execute(text("DELETE FROM orders WHERE store_id = 921"))
+            await session.execute(text("DELETE FROM users WHERE id = 921"))
+            await session.execute(text("DELETE FROM stores WHERE id = 921"))
+            await session.commit()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_sync_pages_through_changes(client, db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text("INSERT INTO users (id, username, role, store_id) VALUES (1, 'customer', 'customer', 1)"))
+    await db_session.execute(text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status) "
+        "SELECT g, now(), 1, 1, 1, 'started' FROM generate_series(1, 5) g"
+    ))
+
+    synced, cursor, has_more = [], None, True
+    while has_more:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/customers/sync/", params=params)).json()
+        synced += [order["id"] for order in page["orders"]]
+        cursor, has_more = page["cursor"], page["has_more"]
+
+    assert synced == [1, 2, 3, 4, 5]
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import HTTPException
+
+from api.depends import get_current_user
+from core.config import settings
+from resource_access.caches.user_caches import principal_cache, token_version_cache
+from schemas.auth_schemas import TokenPayload
+from schemas.enums import UserRoleEnum
+from schemas.user_schemas import User
+
+
+@pytest.fixture(scope="function")
+def empty_principal_cache():
+    principal_cache.clear()
+    yield principal_cache
+    principal_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_principal_cache(empty_principal_cache, mocker):
+    user = User(id=1, username="test", role=UserRoleEnum.customer, store_id=1)
+    get_user_by_id = mocker.patch(
+        "api.depends.UserRepository.get_user_by_id",
+        return_value=user,
+    )
+
+    first = await get_current_user(TokenPayload(sub=1), "token", db_session=None)
+    second = await get_current_user(TokenPayload(sub=1), "token", db_session=None)
+    await get_current_user(TokenPayload(sub=1), "new-token", db_session=None)
+
+    assert first.id == second.id == 1
+    assert get_user_by_id.call_count == 2
+
+
+@pytest.fixture(scope="function")
+def self_contained_tokens(mocker):
+    mocker.patch.object(settings, "self_contained_access_tokens", True)
+    token_version_cache.clear()
+    yield
+    token_version_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_from_token_claims(self_contained_tokens, mocker):
+    get_token_version = mocker.patch("api.depends.UserRepository.get_token_version")
+    token_version_cache.set(1, 3)
+    token = TokenPayload(sub=1, role=UserRoleEnum.customer, store_id=5, ver=3)
+
+    user = await get_current_user(token, "token", db_session=None)
+
+    assert (user.id, user.role, user.store_id) == (1, UserRoleEnum.customer, 5)
+    get_token_version.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_revoked_token(self_contained_tokens, mocker):
+    mocker.patch("api.depends.UserRepository.get_token_version", return_value=4)
+    token = TokenPayload(sub=1, role=UserRoleEnum.customer, store_id=5, ver=3)
+
+    with pytest.raises(HTTPException) as error:
+        await get_current_user(token, "token", db_session=None)
+    assert error.value.status_code == 401
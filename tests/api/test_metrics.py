@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from middlewares.metrics import MetricsExporter, RequestMetrics, render_prometheus
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_route_templates(sqlite_client, mocker):
+    mocker.patch("api.customer.customer_endpoints.get_stores_usecase", return_value=[])
+
+    response = await sqlite_client.get("/customers/stores/", params={"id": 1})
+    assert "x-process-time" in response.headers
+    await sqlite_client.get("/no-such-route/")
+
+    metrics = (await sqlite_client.get("http://127.0.0.1:5000/metrics")).text
+    assert 'http_requests_total{method="GET",route="/api/customers/stores/",status="200"}' in metrics
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in metrics
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/customers/stores/",le="+Inf"}' in metrics
+    assert 'http_requests_in_flight{method="GET"} 1' in metrics
+
+
+def test_render_prometheus_sums_workers():
+    first, second = RequestMetrics(buckets=(0.1, 1.0)), RequestMetrics(buckets=(0.1, 1.0))
+    first.observe("GET", "/orders/", 200, 0.05)
+    second.observe("GET", "/orders/", 200, 0.5)
+    second.observe("GET", "/orders/", 500, 5)
+
+    metrics = render_prometheus([first.snapshot(), second.snapshot()])
+
+    assert 'http_requests_total{method="GET",route="/orders/",status="200"} 2' in metrics
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/",le="0.1"} 1' in metrics
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/",le="1.0"} 2' in metrics
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/orders/",le="+Inf"} 3' in metrics
+    assert 'http_request_duration_seconds_count{method="GET",route="/orders/"} 3' in metrics
+
+
+def test_render_prometheus_aggregates_gauges_as_described():
+    descriptions = {
+        "lag_seconds": ("gauge", "Largest of the workers."),
+        "open_streams": ("gauge", "Total of the workers.", "sum"),
+    }
+    snapshots = [
+        {**RequestMetrics().snapshot(), "values": {"lag_seconds": 2, "open_streams": 3}},
+        {**RequestMetrics().snapshot(), "values": {"lag_seconds": 5, "open_streams": 4}},
+    ]
+
+    metrics = render_prometheus(snapshots, descriptions)
+
+    assert "lag_seconds 5" in metrics
+    assert "open_streams 7" in metrics
+
+
+def test_exporter_keeps_counters_of_exited_workers(tmp_path):
+    exited = RequestMetrics()
+    exited.observe("POST", "/orders/", 201, 0.01)
+    exited.in_flight["POST"] = 3
+    snapshot = exited.snapshot()
+    # No process has a pid this large
+    snapshot["pid"] = 2 ** 22 + 1
+    with open(tmp_path / "exited.json", "w") as metrics_file:
+        json.dump(snapshot, metrics_file)
+
+    exporter = MetricsExporter(RequestMetrics(), directory=str(tmp_path), interval=5)
+    snapshots = exporter.collect()
+    metrics = render_prometheus(snapshots)
+
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
+    assert 'http_requests_total{method="POST",route="/orders/",status="201"} 1' in metrics
+    assert 'http_requests_in_flight{method="POST"}' not in metrics
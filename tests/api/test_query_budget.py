@@ -0,0 +1,51 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from core.config import settings
+from exceptions import QueryBudgetExceededException
+from resource_access.query_stats import track_queries
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(sqlite_client, mocker):
+    mocker.patch("api.customer.customer_endpoints.get_stores_usecase", return_value=[])
+
+    response = await sqlite_client.get("/customers/stores/")
+
+    assert response.headers["server-timing"] == 'db;dur=0.00;desc="0 queries, 0 rows"'
+
+
+@pytest.mark.asyncio
+async def test_query_budget_is_enforced_in_tests(sqlite_client, mocker):
+    mocker.patch("api.customer.customer_endpoints.get_stores_usecase", return_value=[])
+    mocker.patch.object(settings, "query_budgets", {"/api/customers/stores/": -1})
+
+    with pytest.raises(QueryBudgetExceededException):
+        await sqlite_client.get("/customers/stores/")
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_queries_are_counted_per_request(client, db_session, caplog):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store'), (2, 'other store')"))
+
+    with caplog.at_level(logging.INFO, logger="store_visit.access"):
+        response = await client.get("/customers/stores/")
+
+    assert response.status_code == 200
+    assert 'desc="1 queries, 2 rows"' in response.headers["server-timing"]
+    assert "route=/api/customers/stores/ status=200" in caplog.text
+    assert "db_queries=1 db_rows=2" in caplog.text
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_repeated_statements_are_reported(db_session):
+    with track_queries() as stats:
+        for store_id in range(5):
+            await db_session.execute(text("SELECT id FROM stores WHERE id = :id"), {"id": store_id})
+
+    assert stats.queries == 5
+    assert stats.repeated_statements(5) == [("SELECT id FROM stores WHERE id = $1", 5)]
@@ -3,6 +3,7 @@ import pytest
 from tests.fixtures.common_fixtures import *
 from tests.fixtures.common_setup import *
 
+from core.config import settings
 from resource_access.db_base_class import Base
 from resource_access.db_session import sync_engine
 
@@ -15,6 +16,8 @@ def pytest_addoption(parser):
 
 def pytest_configure(config):
     config.addinivalue_line("markers", "slow: mark test as slow to run")
+    # Requests over their SQL budget fail the test instead of logging
+    settings.query_budget_strict = True
 
 
 def pytest_collection_modifyitems(config, items):
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+
+from engines.auth_engines import AuthenticationEngine, PasswordHashingPool
+from exceptions import AuthenticationError, ServiceOverloadedException
+from schemas.user_schemas import User
+
+
+@pytest.mark.asyncio
+async def test_password_hash_round_trip():
+    hashed_password = await AuthenticationEngine.get_password_hash("password")
+    user = User(id=1, hashed_password=hashed_password)
+
+    await AuthenticationEngine.validate_password(user, "password")
+    with pytest.raises(AuthenticationError):
+        await AuthenticationEngine.validate_password(user, "wrong")
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_pool_rejects_when_backlog_is_full():
+    pool = PasswordHashingPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    blocked = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceOverloadedException):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*blocked)
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_pool_counts_cancelled_calls_until_they_finish():
+    pool = PasswordHashingPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    try:
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.1)
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+
+        # The queued call never started, the running one still holds a thread
+        assert pool.pending == 1
+        queued = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceOverloadedException):
+            await pool.run(release.wait)
+    finally:
+        release.set()
+
+    await queued
+    for _ in range(50):
+        if pool.pending == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert pool.pending == 0
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from engines.export_engines import ExportEngine
+from schemas.enums import ExportFormatEnum, OrderStatusEnum
+
+COLUMNS = ["id", "created_at", "status"]
+ROWS = [
+    {"id": 1, "created_at": datetime(2026, 1, 2, 3, 4, 5), "status": OrderStatusEnum.started},
+    {"id": 2, "created_at": datetime(2026, 1, 3), "status": OrderStatusEnum.ended},
+]
+
+
+async def batches():
+    yield ROWS[:1]
+    yield ROWS[1:]
+
+
+@pytest.mark.asyncio
+async def test_encode_ndjson():
+    chunks = [chunk async for chunk in ExportEngine.encode(batches(), COLUMNS, ExportFormatEnum.ndjson)]
+
+    assert chunks == [
+        '{"id": 1, "created_at": "2026-01-02T03:04:05", "status": "started"}\n',
+        '{"id": 2, "created_at": "2026-01-03T00:00:00", "status": "ended"}\n',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_encode_csv():
+    chunks = [chunk async for chunk in ExportEngine.encode(batches(), COLUMNS, ExportFormatEnum.csv)]
+
+    assert "".join(chunks) == (
+        "id,created_at,status\r\n"
+        "1,2026-01-02T03:04:05,started\r\n"
+        "2,2026-01-03T00:00:00,ended\r\n"
+    )
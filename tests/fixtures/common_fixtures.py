@@ -3,9 +3,10 @@ import sqlite3
 
 import aiosqlite
 import pytest
-from api.depends import get_current_user, get_session, get_current_customer
+from api.depends import get_current_user, get_session, get_read_session, get_current_customer
 from httpx import AsyncClient
 from main import app
+from resource_access.caches.store_caches import store_catalog_cache
 from resource_access.db_base import *
 from tests.fixtures.dependency_overrides import (
     get_current_customer_override,
@@ -32,6 +33,8 @@ async def db_session(event_loop):
     # Rollback the overall transaction, restoring the state before the test ran.
     await session.close()
     await connection.close()
+    # Rows cached during the test were rolled back with it
+    store_catalog_cache.clear()
 
 
 @pytest.fixture(scope="function")
@@ -57,6 +60,7 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_session] = test_session
+    app.dependency_overrides[get_read_session] = test_session
     app.dependency_overrides[get_current_user] = get_user_override
     app.dependency_overrides[get_current_customer] = get_current_customer_override
 
@@ -78,6 +82,7 @@ async def sqlite_client(db_sqlite_session):
     async def test_session():
         yield db_sqlite_session
     app.dependency_overrides[get_session] = test_session
+    app.dependency_overrides[get_read_session] = test_session
     app.dependency_overrides[get_current_user] = get_user_override
     app.dependency_overrides[get_current_customer] = get_current_customer_override
 
@@ -3,11 +3,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from resource_access.query_stats import instrument_engine
+
 ASYNC_TEST_DB_URL = f"{settings.postgres_async_url}"
 TEST_DB_URL = f"{settings.postgres_url}"
 
 async_engine = create_async_engine(ASYNC_TEST_DB_URL, echo=True)
 sync_engine = create_engine(TEST_DB_URL)
+instrument_engine(async_engine.sync_engine)
+instrument_engine(sync_engine)
 
 AsyncTestSession = sessionmaker(
     bind=async_engine,
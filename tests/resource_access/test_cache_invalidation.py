@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from core.constants import CACHE_INVALIDATION_CHANNEL
+from resource_access.caches.invalidation import (
+    STORE_USERS, TOKEN_VERSION, CacheInvalidationListener, apply_invalidation, cache_invalidation_listener,
+    publish_invalidation,
+)
+from resource_access.caches.store_caches import store_catalog_cache
+from resource_access.caches.user_caches import token_version_cache
+from tests.fixtures.common_setup import AsyncTestSession
+
+
+def test_apply_invalidation_evicts_named_key():
+    token_version_cache.set(1, 3)
+    token_version_cache.set(2, 5)
+
+    apply_invalidation('{"cache": "token_version", "key": 1}')
+    apply_invalidation('{"cache": "unknown", "key": 2}')
+    apply_invalidation("not json")
+
+    assert token_version_cache.get(1) is None
+    assert token_version_cache.get(2) == 5
+    token_version_cache.clear()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_listener_evicts_keys_published_by_another_session():
+    listener = CacheInvalidationListener(
+        dsn=cache_invalidation_listener._dsn, channel=CACHE_INVALIDATION_CHANNEL, reconnect_delay=0.1,
+    )
+    # Cached before anyone listened
+    token_version_cache.set(2, 5)
+    listener.start()
+    try:
+        await asyncio.wait_for(listener.listening.wait(), timeout=5)
+        assert token_version_cache.get(2) is None
+        store_catalog_cache.set_user_ids(1, {10})
+        token_version_cache.set(1, 3)
+
+        async with AsyncTestSession() as session:
+            await publish_invalidation(session, STORE_USERS, 1)
+            await publish_invalidation(session, TOKEN_VERSION, 1)
+            # Not delivered before the transaction commits
+            await asyncio.sleep(0.2)
+            assert store_catalog_cache.get_user_ids(1) == {10}
+            await session.commit()
+
+        for _ in range(50):
+            if token_version_cache.get(1) is None:
+                break
+            await asyncio.sleep(0.1)
+        assert store_catalog_cache.get_user_ids(1) is None
+        assert token_version_cache.get(1) is None
+    finally:
+        await listener.stop()
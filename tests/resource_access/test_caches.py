@@ -0,0 +1,72 @@
+import sys
+
+from resource_access.caches.base_cache import TTLCache
+from resource_access.caches.store_caches import StoreCatalogCache
+from resource_access.caches.user_caches import PrincipalCache
+from schemas.enums import UserRoleEnum
+from schemas.order_schemas import Store
+from schemas.user_schemas import User
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["size"] == 2
+
+
+def test_ttl_cache_expires_entries(mocker):
+    now = mocker.patch("resource_access.caches.base_cache.time.monotonic", return_value=100.0)
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+
+    now.return_value = 104.0
+    assert cache.get("a") == 1
+    now.return_value = 105.0
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_principal_cache_is_keyed_by_token_and_invalidated_by_user():
+    cache = PrincipalCache(max_size=10, ttl=60)
+    user = User(id=1, username="test", role=UserRoleEnum.customer, store_id=1, hashed_password="hash")
+    cache.set(1, "token-a", user)
+    cache.set(1, "token-b", user)
+    cache.set(2, "token-c", user)
+
+    assert cache.get(1, "token-a").hashed_password is None
+    assert cache.get(1, "token-other") is None
+
+    cache.invalidate_user(1)
+    assert cache.get(1, "token-a") is None
+    assert cache.get(1, "token-b") is None
+    assert cache.get(2, "token-c") is not None
+
+
+def test_store_catalog_cache_invalidation():
+    cache = StoreCatalogCache(max_size=10, ttl=60)
+    cache.set_store(Store(id=1, title="store"))
+    cache.set_listing("all", [Store(id=1, title="store")])
+    cache.set_user_ids(1, {10, 11})
+
+    cache.invalidate_store_users(1)
+    assert cache.get_user_ids(1) is None
+    assert cache.get_store(1) is not None
+
+    cache.invalidate_store(1)
+    assert cache.get_store(1) is None
+    assert cache.get_listing("all") is None
+    assert cache.stats()["hit_ratio"] == 0.25
+
+
+def test_ttl_cache_reports_memory_use():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set(1, frozenset(range(100)))
+
+    assert cache.stats()["memory_bytes"] > sys.getsizeof(frozenset(range(100)))
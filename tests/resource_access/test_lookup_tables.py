@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+
+from resource_access.caches.lookup_publisher import publish_lookup_snapshot
+from resource_access.caches.lookup_tables import SharedLookupTables, encode_lookup_snapshot
+from schemas.enums import UserRoleEnum
+
+ROWS = [
+    (3, UserRoleEnum.worker, 1, False),
+    (1, UserRoleEnum.customer, 1, False),
+    (2, UserRoleEnum.worker, 2, True),
+    (4, UserRoleEnum.customer, None, False),
+    (5, None, 1, False),
+]
+
+
+def write_snapshot(path, generation, rows) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(encode_lookup_snapshot(generation, rows))
+    os.replace(tmp_path, path)
+
+
+def test_lookup_tables_answer_from_snapshot(tmp_path):
+    path = str(tmp_path / "lookup.bin")
+    write_snapshot(path, time.time_ns(), ROWS)
+    tables = SharedLookupTables(path, check_interval=0)
+
+    user = tables.get_user(3)
+    assert (user.id, user.role, user.store_id) == (3, UserRoleEnum.worker, 1)
+    assert tables.get_user(4).store_id is None
+    user = tables.get_user(5)
+    assert (user.id, user.role, user.store_id) == (5, None, 1)
+    assert tables.get_user(2) is None
+    assert tables.get_user(6) is None
+    assert tables.is_user_in_store(3, 1) is True
+    assert tables.is_user_in_store(2, 2) is True
+    assert tables.is_user_in_store(3, 2) is False
+    assert tables.is_user_in_store(3, 9) is False
+    tables.close()
+
+
+def test_lookup_tables_swap_generations_and_skip_stale_keys(tmp_path):
+    path = str(tmp_path / "lookup.bin")
+    write_snapshot(path, time.time_ns(), ROWS)
+    tables = SharedLookupTables(path, check_interval=0)
+    assert tables.is_user_in_store(3, 1) is True
+
+    tables.invalidate_store_users(1)
+    assert tables.is_user_in_store(3, 1) is False
+
+    write_snapshot(path, time.time_ns(), [(3, UserRoleEnum.worker, 2, False)])
+    assert tables.is_user_in_store(3, 1) is False
+    assert tables.is_user_in_store(3, 2) is True
+    assert tables.stats()["stale_keys"] == 0
+
+    tables.invalidate_all()
+    assert tables.is_user_in_store(3, 2) is False
+    tables.close()
+
+
+def test_lookup_tables_ignore_missing_or_corrupt_file(tmp_path):
+    path = str(tmp_path / "lookup.bin")
+    tables = SharedLookupTables(path, check_interval=0)
+    assert tables.get_user(1) is None
+
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(b"garbage")
+    assert tables.get_user(1) is None
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_publish_lookup_snapshot(db_session, tmp_path):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) "
+        "SELECT g, 'user_' || g, 'worker', 1 FROM generate_series(1, 1000) g"
+    ))
+    path = str(tmp_path / "lookup.bin")
+
+    await publish_lookup_snapshot(db_session, path)
+    tables = SharedLookupTables(path, check_interval=0)
+
+    assert tables.get_user(500).role == UserRoleEnum.worker
+    assert tables.is_user_in_store(1000, 1) is True
+    assert tables.stats()["users"] == 1000
+    tables.close()
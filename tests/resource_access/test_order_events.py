@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from core.constants import ORDER_EVENTS_CHANNEL
+from resource_access.order_events import ORDER_CREATED, ORDER_STATUS_CHANGED, RESYNC, OrderEventHub, order_event_hub
+from resource_access.repositories.order_repos import OrderRepository
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from schemas.order_schemas import Order
+from schemas.user_schemas import User
+from tests.fixtures.common_setup import AsyncTestSession
+from usecases.customer_usecases import stream_order_events_usecase
+
+
+def make_hub(queue_size: int = 10) -> OrderEventHub:
+    return OrderEventHub(dsn="", channel=ORDER_EVENTS_CHANNEL, queue_size=queue_size, reconnect_delay=0.1)
+
+
+def order_event(order_id: int, customer_id: int = 1, worker_id: int = 2) -> dict:
+    return {"event": ORDER_CREATED, "order": {"id": order_id, "customer_id": customer_id, "worker_id": worker_id}}
+
+
+def test_dispatch_reaches_customer_and_worker_only():
+    hub = make_hub()
+    customer, worker, other = hub.subscribe(1), hub.subscribe(2), hub.subscribe(3)
+
+    hub.dispatch(order_event(10))
+
+    assert customer.queue.get_nowait()["order"]["id"] == 10
+    assert worker.queue.get_nowait()["order"]["id"] == 10
+    assert other.queue.empty()
+    assert hub.snapshot()["order_stream_events_total"] == 2
+
+
+def test_full_queue_is_replaced_by_resync():
+    hub = make_hub(queue_size=2)
+    subscription = hub.subscribe(1)
+
+    for order_id in range(3):
+        hub.dispatch(order_event(order_id))
+    hub.dispatch(order_event(3))
+
+    assert subscription.queue.get_nowait() == {"event": RESYNC}
+    assert subscription.queue.get_nowait()["order"]["id"] == 3
+    assert hub.snapshot()["order_stream_resyncs_total"] == 1
+
+
+def test_unsubscribe_closes_connection_once():
+    hub = make_hub()
+    first, second = hub.subscribe(1), hub.subscribe(1)
+    assert hub.snapshot()["order_stream_connections"] == 2
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)
+    hub.dispatch(order_event(10))
+
+    assert hub.snapshot()["order_stream_connections"] == 1
+    assert first.queue.empty()
+    assert not second.queue.empty()
+
+
+async def test_stream_sends_heartbeats_and_events(mocker):
+    mocker.patch("usecases.customer_usecases.settings.order_stream_heartbeat_seconds", 0.05)
+    user = User(id=1, role=UserRoleEnum.worker, store_id=1)
+    stream = stream_order_events_usecase(user)
+
+    assert await stream.__anext__() == ": connected\n\n"
+    assert await stream.__anext__() == ": heartbeat\n\n"
+    order_event_hub.dispatch(order_event(10, worker_id=1))
+    assert await stream.__anext__() == 'event: order_created\ndata: {"id": 10, "customer_id": 1, "worker_id": 1}\n\n'
+
+    await stream.aclose()
+    assert order_event_hub.snapshot()["order_stream_connections"] == 0
+
+
+@pytest.mark.slow
+async def test_committed_order_writes_are_streamed():
+    hub = OrderEventHub(
+        dsn=order_event_hub._dsn, channel=ORDER_EVENTS_CHANNEL, queue_size=10, reconnect_delay=0.1,
+    )
+    early = hub.subscribe(901)
+    hub.start()
+    async with AsyncTestSession() as session:
+        await session.execute(text("INSERT INTO stores (id, title) VALUES (901, 'store')"))
+        await session.execute(text(
+            "INSERT INTO users (id, username, role, store_id) "
+            "VALUES (901, 'customer 901', 'customer', 901), (902, 'worker 902', 'worker', 901)"
+        ))
+        await session.commit()
+    try:
+        await asyncio.wait_for(hub.listening.wait(), timeout=5)
+        # Opened before the hub listened
+        assert early.queue.get_nowait() == {"event": RESYNC}
+        hub.unsubscribe(early)
+        subscription = hub.subscribe(902)
+
+        async with AsyncTestSession() as session:
+            order_repo = OrderRepository(session)
+            order = await order_repo.create_order(Order(
+                expires_at=datetime.now() + timedelta(hours=1), store_id=901, customer_id=901, worker_id=902,
+            ))
+            await order_repo.update_order_status(order.id, OrderStatusEnum.in_process, [OrderStatusEnum.started])
+            await session.execute(text("UPDATE orders SET expires_at = now() - interval '1 hour' WHERE store_id = 901"))
+            await session.commit()
+            assert await order_repo.cancel_expired_orders(datetime.now(), [OrderStatusEnum.in_process], 10) == 1
+
+        created = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+        changed = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+        canceled = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+        assert (created["event"], created["order"]["id"]) == (ORDER_CREATED, order.id)
+        assert (changed["event"], changed["order"]["status"]) == (ORDER_STATUS_CHANGED, "in_process")
+        assert (canceled["event"], canceled["order"]["status"]) == (ORDER_STATUS_CHANGED, "canceled")
+    finally:
+        await hub.stop()
+        async with AsyncTestSession() as session:
+            await session.execute(text("DELETE FROM orders WHERE store_id = 901"))
+            await session.execute(text("DELETE FROM users WHERE id IN (901, 902)"))
+            await session.execute(text("DELETE FROM stores WHERE id = 901"))
+            await session.commit()
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from engines.order_engines import OrderEngine
+from middlewares.metrics import MetricsExporter, RequestMetrics, render_prometheus
+from resource_access.order_expiry import OrderExpiryMetrics, OrderExpirySweeper
+from resource_access.repositories.order_repos import OrderRepository
+from schemas.enums import OrderStatusEnum
+
+OPEN_STATUSES = OrderEngine.get_allowed_previous_statuses(OrderStatusEnum.canceled)
+
+
+@pytest.fixture(scope="function")
+async def expiring_orders(db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) "
+        "VALUES (1, 'customer', 'customer', 1), (2, 'worker', 'worker', 1)"
+    ))
+    await db_session.execute(text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status, is_deleted) VALUES "
+        "(1, '2026-01-03', 1, 1, 2, 'started', false), "
+        "(2, '2026-01-01', 1, 1, 2, 'awaiting', false), "
+        "(3, '2026-01-02', 1, 1, 2, 'in_process', false), "
+        "(4, '2026-01-01', 1, 1, 2, 'ended', false), "
+        "(5, '2026-01-01', 1, 1, 2, 'started', true), "
+        "(6, '2026-02-01', 1, 1, 2, 'started', false)"
+    ))
+    yield db_session
+
+
+async def get_statuses(db_session) -> dict:
+    query = await db_session.execute(text("SELECT id, status FROM orders ORDER BY id"))
+    return {order_id: status for order_id, status in query.all()}
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_cancel_expired_orders_oldest_first_in_batches(expiring_orders):
+    order_repo = OrderRepository(expiring_orders)
+    expired_before = datetime(2026, 1, 15)
+
+    assert await order_repo.get_oldest_expired_at(expired_before, OPEN_STATUSES) == datetime(2026, 1, 1)
+    assert await order_repo.cancel_expired_orders(expired_before, OPEN_STATUSES, limit=2) == 2
+    assert await get_statuses(expiring_orders) == {
+        1: "started", 2: "canceled", 3: "canceled", 4: "ended", 5: "started", 6: "started",
+    }
+
+    assert await order_repo.cancel_expired_orders(expired_before, OPEN_STATUSES, limit=2) == 1
+    assert await order_repo.cancel_expired_orders(expired_before, OPEN_STATUSES, limit=2) == 0
+    assert await order_repo.get_oldest_expired_at(expired_before, OPEN_STATUSES) is None
+    assert (await get_statuses(expiring_orders))[1] == "canceled"
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_only_one_sweeper_leads():
+    first, second = (
+        OrderExpirySweeper(OrderExpiryMetrics(), interval=1, grace=0, batch_size=10, max_batches=1, lock_key=42)
+        for _ in range(2)
+    )
+    try:
+        assert await first.elect()
+        assert not await second.elect()
+        assert await first.elect()
+
+        first.metrics.lag_seconds = 3.0
+        await first.stop()
+        assert not first.is_leader
+        assert "order_expiry_lag_seconds" not in first.metrics.snapshot()
+        assert await second.elect()
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+def test_render_sweeper_metrics_of_all_workers():
+    leader, follower = OrderExpiryMetrics(), OrderExpiryMetrics()
+    leader.observe_batch(500, 0.2)
+    leader.observe_batch(120, 0.05)
+    leader.lag_seconds = 12.5
+    follower.observe_batch(30, 0.01)
+
+    exporters = []
+    for metrics in (leader, follower):
+        exporter = MetricsExporter(RequestMetrics(), directory="", interval=5)
+        exporter.add_source(metrics)
+        exporters.append(exporter)
+    metrics = render_prometheus(
+        [exporter.snapshot() for exporter in exporters], exporters[0].descriptions
+    )
+
+    assert "# TYPE order_expiry_canceled_total counter" in metrics
+    assert "order_expiry_canceled_total 650" in metrics
+    assert "order_expiry_batches_total 3" in metrics
+    assert "order_expiry_lag_seconds 12.5" in metrics
+    assert "order_expiry_last_run_timestamp_seconds" not in metrics
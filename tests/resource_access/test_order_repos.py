@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from engines.order_engines import OrderEngine
+from exceptions import NotFoundException, InvalidStatusTransitionException
+from resource_access.repositories.order_repos import OrderRepository
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from schemas.order_schemas import Order, OrderFilter
+from schemas.user_schemas import User
+from tests.fixtures.common_setup import async_engine
+from usecases.customer_usecases import create_orders_bulk_usecase
+
+
+@pytest.fixture(scope="function")
+async def started_order(db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) "
+        "VALUES (1, 'customer', 'customer', 1), (2, 'worker', 'worker', 1)"
+    ))
+    await db_session.execute(text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status) "
+        "VALUES (1, now(), 1, 1, 2, 'started')"
+    ))
+    await db_session.execute(text("SELECT setval('orders_id_seq', 1)"))
+    yield db_session
+
+
+async def change_status(db_session, order_id: int, status: OrderStatusEnum):
+    allowed_from = OrderEngine.get_allowed_previous_statuses(status)
+    return await OrderRepository(db_session).update_order_status(order_id, status, allowed_from)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_update_order_status_single_statement(started_order):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        order = await change_status(started_order, 1, OrderStatusEnum.in_process)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert (order.id, order.status) == (1, OrderStatusEnum.in_process)
+    assert len(statements) == 1
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_update_order_status_rejects_invalid_transition(started_order):
+    with pytest.raises(InvalidStatusTransitionException) as error:
+        await change_status(started_order, 1, OrderStatusEnum.ended)
+    assert error.value.message == "Cannot change order status from started to ended"
+
+    await change_status(started_order, 1, OrderStatusEnum.canceled)
+    with pytest.raises(InvalidStatusTransitionException):
+        await change_status(started_order, 1, OrderStatusEnum.in_process)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_update_order_status_not_found(started_order):
+    with pytest.raises(NotFoundException):
+        await change_status(started_order, 999, OrderStatusEnum.in_process)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_create_orders_bulk_mixed_results(started_order):
+    customer = User(id=1, role=UserRoleEnum.customer, store_id=1)
+    orders = [
+        Order(expires_at=datetime.now(), store_id=1, worker_id=2),
+        Order(expires_at=datetime.now(), store_id=2, worker_id=2),
+        Order(expires_at=datetime.now(), store_id=1, worker_id=999),
+        Order(expires_at=datetime.now(), store_id=1, worker_id=1),
+    ]
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        results = await create_orders_bulk_usecase(started_order, orders, customer)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 2
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert results[0].order.worker_id == 2 and results[3].order.worker_id == 1
+    assert results[0].order.id < results[3].order.id
+    assert results[0].order.status == OrderStatusEnum.started
+    assert results[1].error_code == results[2].error_code == "IncorrectDataError"
+    assert results[1].order is None and results[2].order is None
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_orders_selects_requested_fields(started_order):
+    customer = User(id=1, role=UserRoleEnum.customer, store_id=1)
+
+    orders = await OrderRepository(started_order).get_orders(
+        OrderFilter(status=OrderStatusEnum.started), customer, fields=["id", "status"]
+    )
+
+    assert orders == [{"id": 1, "status": OrderStatusEnum.started}]
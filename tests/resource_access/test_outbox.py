@@ -0,0 +1,117 @@
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from core.constants import OUTBOX_RELAY_CURSOR
+from resource_access.outbox_relay import OutboxRelay, WebhookPublisher
+from resource_access.repositories.order_repos import OrderRepository
+from resource_access.repositories.outbox_repos import OutboxRepository
+from schemas.enums import OrderStatusEnum
+from tests.fixtures.common_setup import AsyncTestSession
+
+
+class RecordingPublisher:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    async def __call__(self, events):
+        if self.fail:
+            raise httpx.ConnectError("refused")
+        self.batches.append([(event["aggregate_id"], event["event"]) for event in events])
+
+
+async def test_webhook_publisher_posts_events(mocker):
+    post = mocker.patch(
+        "httpx.AsyncClient.post",
+        return_value=httpx.Response(200, request=httpx.Request("POST", "http://consumer/events")),
+    )
+    publisher = WebhookPublisher("http://consumer/events", timeout=1)
+    event = {
+        "id": 1, "txid": 7, "created_at": datetime(2026, 10, 18, tzinfo=timezone.utc), "aggregate": "order",
+        "aggregate_id": 3, "event": "order_created", "payload": {"id": 3},
+    }
+
+    await publisher([event])
+    await publisher.close()
+
+    body = json.loads(post.call_args.kwargs["content"])
+    assert body == {"events": [{**event, "created_at": "2026-10-18T00:00:00Z"}]}
+
+
+@pytest.mark.slow
+async def test_writes_append_outbox_events(db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store')"))
+    await db_session.execute(text("INSERT INTO users (id, username, role, store_id) VALUES (1, 'customer', 'customer', 1)"))
+    await db_session.execute(text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status) "
+        "SELECT g, now(), 1, 1, 1, 'started' FROM generate_series(1, 2) g"
+    ))
+    order_repo = OrderRepository(db_session)
+    await order_repo.update_order_status(1, OrderStatusEnum.in_process, [OrderStatusEnum.started])
+    await db_session.execute(text("UPDATE orders SET expires_at = expires_at"))
+    await db_session.execute(text("UPDATE orders SET is_deleted = true WHERE id = 2"))
+
+    query = await db_session.execute(text(
+        "SELECT aggregate_id, event, payload ->> 'status' FROM outbox "
+        "WHERE txid = CAST(CAST(pg_current_xact_id() AS text) AS bigint) ORDER BY id"
+    ))
+    assert [tuple(row) for row in query] == [
+        (1, "order_created", "started"),
+        (2, "order_created", "started"),
+        (1, "order_status_changed", "in_process"),
+        (2, "order_deleted", "started"),
+    ]
+
+
+@pytest.mark.slow
+async def test_relay_publishes_committed_events_in_order():
+    publisher = RecordingPublisher()
+    relay = OutboxRelay(
+        publisher, interval=1, batch_size=2, max_batches=10, retention=0, prune_batch_size=100, lock_key=1,
+    )
+    async with AsyncTestSession() as session:
+        await session.execute(text("DELETE FROM outbox"))
+        await session.execute(text("DELETE FROM outbox_cursors"))
+        await session.execute(text("INSERT INTO stores (id, title) VALUES (903, 'store')"))
+        await session.execute(text("INSERT INTO users (id, username, role, store_id) VALUES (903, 'c903', 'customer', 903)"))
+        await session.commit()
+    insert_order = text(
+        "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id) VALUES (:id, now(), 903, 903, 903)"
+    )
+    try:
+        async with AsyncTestSession() as first, AsyncTestSession() as second:
+            await first.execute(insert_order, {"id": 903})
+            await second.execute(insert_order, {"id": 904})
+            await second.execute(insert_order, {"id": 905})
+            await second.commit()
+            # 904 and 905 wait for the older transaction still running
+            assert await relay.relay() == 0
+            await first.commit()
+
+        publisher.fail = True
+        assert await relay.relay() == 0
+        publisher.fail = False
+        assert await relay.relay() == 3
+        assert await relay.relay() == 0
+        assert publisher.batches == [
+            [(903, "order_created"), (904, "order_created")],
+            [(905, "order_created")],
+        ]
+        assert relay.snapshot()["outbox_publish_failures_total"] == 1
+
+        assert await relay.prune() == 3
+        async with AsyncTestSession() as session:
+            assert await OutboxRepository(session).get_events(None, 10) == []
+            assert await OutboxRepository(session).get_cursor(OUTBOX_RELAY_CURSOR) is not None
+    finally:
+        async with AsyncTestSession() as session:
+            await session.execute(text("DELETE FROM orders WHERE store_id = 903"))
+            await session.execute(text("DELETE FROM users WHERE id = 903"))
+            await session.execute(text("DELETE FROM stores WHERE id = 903"))
+            await session.execute(text("DELETE FROM outbox"))
+            await session.execute(text("DELETE FROM outbox_cursors"))
+            await session.commit()
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from engines.order_engines import OrderEngine
+from resource_access.repositories.order_repos import OrderRepository, StoreRepository, VisitRepository
+from resource_access.repositories.user_repos import UserRepository
+from schemas.enums import OrderStatusEnum, UserRoleEnum
+from schemas.order_schemas import OrderFilter, StoreFilter, VisitFilter
+from schemas.user_schemas import User, UserFilter
+from tests.fixtures.common_setup import async_engine
+
+SEED_STATEMENTS = [
+    "INSERT INTO stores (id, title) SELECT g, 'store ' || g FROM generate_series(1, 50000) g",
+    "INSERT INTO users (id, username, first_name, role, store_id) "
+    "SELECT g, 'user_' || g, 'name_' || g, "
+    "CASE WHEN g % 2 = 0 THEN 'worker' ELSE 'customer' END::user_role_enum, g % 5000 + 1 "
+    "FROM generate_series(1, 20000) g",
+    "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status, is_deleted) "
+    "SELECT g, now(), g % 5000 + 1, (g % 10000) * 2 + 1, (g % 10000) * 2 + 2, "
+    "(ARRAY['started', 'in_process', 'awaiting', 'ended', 'canceled'])[g % 5 + 1]::order_status_enum, "
+    "g % 50 = 0 "
+    "FROM generate_series(1, 100000) g",
+    "INSERT INTO visits (id, worker_id, order_id, customer_id, store_id) "
+    "SELECT g, (g % 10000) * 2 + 2, g, (g % 10000) * 2 + 1, g % 5000 + 1 "
+    "FROM generate_series(1, 50000) g",
+    "ANALYZE stores, users, orders, visits",
+]
+
+
+def find_seq_scans(plan: dict) -> list:
+    scans = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+
+@pytest.fixture(scope="function")
+async def seeded_db_session(db_session):
+    for statement in SEED_STATEMENTS:
+        await db_session.execute(text(statement))
+    yield db_session
+
+
+async def run_repository_queries(db_session) -> None:
+    customer = User(id=1, role=UserRoleEnum.customer, store_id=2)
+    worker = User(id=2, role=UserRoleEnum.worker, store_id=3)
+
+    order_repo = OrderRepository(db_session)
+    await order_repo.get_orders(OrderFilter(status=OrderStatusEnum.started), customer)
+    await order_repo.get_orders(OrderFilter(status=OrderStatusEnum.awaiting), worker, after_id=50000)
+    await order_repo.get_order_by_id(42)
+    await order_repo.get_oldest_expired_at(
+        datetime.now(), OrderEngine.get_allowed_previous_statuses(OrderStatusEnum.canceled)
+    )
+
+    store_repo = StoreRepository(db_session)
+    await store_repo.get_store_by_id(7)
+    await store_repo.get_stores(StoreFilter(id=7))
+    await store_repo.get_stores(StoreFilter(title="4217"))
+    await store_repo.get_stores(StoreFilter(title="Store 42", prefix=True))
+
+    visit_repo = VisitRepository(db_session)
+    await visit_repo.get_visit_by_order_id(42)
+    await visit_repo.get_visits(VisitFilter())
+    await visit_repo.get_visits(VisitFilter(order_id=42))
+
+    user_repo = UserRepository(db_session)
+    await user_repo.get_user_by_id(42)
+    await user_repo.get_user_by_username("user_42")
+    await user_repo.get_users(UserFilter(first_name="name_42"))
+    await user_repo.get_users(UserFilter(username="user_42"))
+    await user_repo.is_user_in_store(42, 43)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_repository_queries_do_not_seq_scan(seeded_db_session):
+    statements = []
+
+    def capture_select(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture_select)
+    try:
+        await run_repository_queries(seeded_db_session)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture_select)
+
+    assert statements
+    connection = await seeded_db_session.connection()
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar()[0]["Plan"]
+        assert not find_seq_scans(plan), f"Sequential scan in plan for: {statement}"
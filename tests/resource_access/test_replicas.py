@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import settings
+from resource_access.db_session import async_engine
+from resource_access.replicas import ReplicaRouter
+from tests.fixtures.common_setup import async_engine as replica_engine
+
+
+def make_router(replicas: int) -> ReplicaRouter:
+    engines = [create_async_engine(settings.postgres_async_url) for _ in range(replicas)]
+    return ReplicaRouter(async_engine, engines, max_lag=1, check_interval=1)
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary_until_replicas_are_measured():
+    router = make_router(2)
+
+    session = router.read_session()
+    assert session.bind is async_engine
+    await session.close()
+
+    router.lags = [0.2, 5.0]
+    sessions = [router.read_session() for _ in range(2)]
+    assert [session.bind for session in sessions] == [router._replicas[0]] * 2
+    assert router.snapshot() == {
+        "db_replica_reads_total": 2,
+        "db_primary_reads_total": 1,
+        "db_replicas_usable": 1,
+        "db_replica_max_lag_seconds": 5.0,
+    }
+
+    router.lags = [0.2, 0.4]
+    assert {router.read_session().bind for _ in range(2)} == set(router._replicas)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_check_lag_of_server_not_in_recovery():
+    router = ReplicaRouter(async_engine, [replica_engine], max_lag=1, check_interval=1)
+
+    await router.check_lag()
+
+    assert router.lags == [0.0]
+    assert router.read_session().bind is replica_engine
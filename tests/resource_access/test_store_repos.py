@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import event, text
+
+from resource_access.repositories.order_repos import StoreRepository
+from resource_access.repositories.user_repos import UserRepository
+from schemas.enums import UserRoleEnum
+from schemas.order_schemas import StoreFilter
+from schemas.user_schemas import User
+from tests.fixtures.common_setup import async_engine
+
+
+@pytest.fixture(scope="function")
+async def store_with_staff(db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store'), (2, 'other store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) "
+        "SELECT g, 'worker_' || g, 'worker', 1 FROM generate_series(1, 500) g"
+    ))
+    yield db_session
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_stores_does_not_load_staff(store_with_staff):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        stores = await StoreRepository(store_with_staff).get_stores(StoreFilter())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert [store["id"] for store in stores] == [2, 1]
+    assert len(statements) == 1
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_is_user_in_store(store_with_staff):
+    user_repo = UserRepository(store_with_staff)
+
+    assert await user_repo.is_user_in_store(250, 1) is True
+    assert await user_repo.is_user_in_store(250, 2) is False
+    assert await user_repo.is_user_in_store(999, 1) is False
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_stores_lists_all_stores_past_the_limit(db_session):
+    await db_session.execute(text(
+        "INSERT INTO stores (id, title) SELECT g, 'store ' || g FROM generate_series(1, 150) g"
+    ))
+
+    stores = await StoreRepository(db_session).get_stores(StoreFilter(limit=20))
+
+    assert [store["id"] for store in stores] == list(range(150, 0, -1))
+
+
+@pytest.fixture(scope="function")
+async def stores_to_search(db_session):
+    await db_session.execute(text(
+        "INSERT INTO stores (id, title) VALUES "
+        "(1, 'Green Market'), (2, 'Market Square'), (3, 'green grocer'), (4, '100% Fresh'), (5, '1000 Goods')"
+    ))
+    yield db_session
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, expected_ids",
+    [
+        (StoreFilter(title="MARKET"), {1, 2}),
+        (StoreFilter(title="green", prefix=True), {1, 3}),
+        (StoreFilter(title="100%"), {4}),
+        (StoreFilter(title="market", limit=1), {1}),
+    ],
+)
+async def test_get_stores_title_search(stores_to_search, filters, expected_ids):
+    stores = await StoreRepository(stores_to_search).get_stores(filters)
+
+    assert {store["id"] for store in stores} == expected_ids
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_store_lookups_are_cached_until_users_change(store_with_staff):
+    store_repo = StoreRepository(store_with_staff)
+    user_repo = UserRepository(store_with_staff)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    await store_repo.get_store_by_id(1)
+    await user_repo.is_user_in_store(250, 1)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        assert (await store_repo.get_store_by_id(1)).title == "store"
+        assert await user_repo.is_user_in_store(250, 1) is True
+        assert await user_repo.get_store_memberships({(250, 1), (501, 1)}) == {(250, 1)}
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    assert statements == []
+
+    await store_with_staff.execute(text("SELECT setval('users_id_seq', 500)"))
+    user = await user_repo.create_user(User(username="worker_501", role=UserRoleEnum.worker, store_id=1))
+    assert await user_repo.is_user_in_store(user.id, 1) is True
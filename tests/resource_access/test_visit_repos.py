@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from exceptions import NotFoundException, AccessDeniedException, DataValidationException, TimeIsUpException
+from resource_access.repositories.order_repos import VisitRepository
+from schemas.enums import UserRoleEnum
+from schemas.order_schemas import Visit
+from schemas.user_schemas import User
+from tests.fixtures.common_setup import async_engine
+from usecases.customer_usecases import create_visit_usecase
+
+customer = User(id=1, role=UserRoleEnum.customer, store_id=1)
+
+
+@pytest.fixture(scope="function")
+async def orders_for_visit(db_session):
+    await db_session.execute(text("INSERT INTO stores (id, title) VALUES (1, 'store'), (2, 'other store')"))
+    await db_session.execute(text(
+        "INSERT INTO users (id, username, role, store_id) VALUES "
+        "(1, 'customer', 'customer', 1), (2, 'worker', 'worker', 1), (3, 'other', 'customer', 1)"
+    ))
+    await db_session.execute(
+        text(
+            "INSERT INTO orders (id, expires_at, store_id, customer_id, worker_id, status) VALUES "
+            "(1, :past, 1, 1, 2, 'started'), "
+            "(2, :future, 1, 1, 2, 'started'), "
+            "(3, :past, 2, 1, 2, 'started'), "
+            "(4, :past, 1, 3, 2, 'started')"
+        ),
+        {"past": datetime.now() - timedelta(hours=1), "future": datetime.now() + timedelta(hours=1)},
+    )
+    yield db_session
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_create_visit_single_statement(orders_for_visit):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        order, visit = await VisitRepository(orders_for_visit).create_visit_for_order(1, customer, datetime.now())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 1
+    assert (visit.order_id, visit.worker_id, visit.customer_id, visit.store_id) == (1, 2, 1, 1)
+    assert visit.id is not None and visit.created_at is not None
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "order_id, error",
+    [
+        (2, TimeIsUpException),
+        (3, DataValidationException),
+        (4, AccessDeniedException),
+        (999, NotFoundException),
+    ],
+)
+async def test_create_visit_rejected(orders_for_visit, order_id, error):
+    with pytest.raises(error):
+        await create_visit_usecase(orders_for_visit, customer, Visit(order_id=order_id))
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_create_visit_rejects_duplicate(orders_for_visit):
+    await create_visit_usecase(orders_for_visit, customer, Visit(order_id=1))
+
+    with pytest.raises(AccessDeniedException) as error:
+        await create_visit_usecase(orders_for_visit, customer, Visit(order_id=1))
+    assert error.value.message == "You cannot create visits already in a completed order"
@@ -1,10 +1,15 @@
-from typing import List
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
 
 from sqlalchemy.orm import Session
 
+from core.projection import parse_fields
 from engines.auth_engines import AuthenticationEngine
+from engines.export_engines import ExportEngine
+from resource_access.repositories.order_repos import OrderRepository, VisitRepository
 from resource_access.repositories.user_repos import UserRepository
-from schemas.user_schemas import User, UserFilter
+from schemas.order_schemas import ExportFilter, OrderOut, VisitOut
+from schemas.user_schemas import User, UserFilter, UserOut
 
 
 async def create_user_usecase(db_session: Session, user: User, password: str) -> User:
@@ -14,7 +19,37 @@ async def create_user_usecase(db_session: Session, user: User, password: str) ->
     return await user_repo.create_user(user)
 
 
-async def get_users_usecase(db_session: Session, filters: UserFilter) -> List[User]:
+async def get_users_usecase(db_session: Session, filters: UserFilter) -> List[dict]:
+    fields = parse_fields(filters.fields, UserOut)
     user_repo = UserRepository(db_session)
-    return await user_repo.get_users(filters)
+    return await user_repo.get_users(filters, fields)
 
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # created_at is timestamptz: keep the offset the client sent, naive input is UTC
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _utc_export_filter(filters: ExportFilter) -> ExportFilter:
+    return filters.model_copy(update={
+        "created_from": _as_utc(filters.created_from),
+        "created_to": _as_utc(filters.created_to),
+    })
+
+
+async def export_orders_usecase(db_session: Session, filters: ExportFilter) -> AsyncIterator[str]:
+    order_repo = OrderRepository(db_session)
+    batches = order_repo.stream_orders(_utc_export_filter(filters))
+    async for chunk in ExportEngine.encode(batches, list(OrderOut.model_fields), filters.format):
+        yield chunk
+
+
+async def export_visits_usecase(db_session: Session, filters: ExportFilter) -> AsyncIterator[str]:
+    visit_repo = VisitRepository(db_session)
+    batches = visit_repo.stream_visits(_utc_export_filter(filters))
+    async for chunk in ExportEngine.encode(batches, list(VisitOut.model_fields), filters.format):
+        yield chunk
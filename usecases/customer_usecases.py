@@ -1,16 +1,24 @@
+import asyncio
+import json
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from engines.auth_engines import AuthenticationEngine
 from engines.order_engines import OrderEngine
-from exceptions import DataValidationException, TimeIsUpException, AccessDeniedException
+from exceptions import DataValidationException, TimeIsUpException, AccessDeniedException, StoreVisitException
+from resource_access.order_events import order_event_hub
 from resource_access.repositories.order_repos import OrderRepository, StoreRepository, VisitRepository
+from resource_access.repositories.sync_repos import SyncRepository
 from resource_access.repositories.user_repos import UserRepository
 from schemas.enums import OrderStatusEnum
-from schemas.order_schemas import Order, OrderFilter, StoreFilter, Store, Visit, VisitFilter
+from schemas.order_schemas import Order, OrderFilter, StoreFilter, Visit, VisitFilter, OrderBulkItem, OrderOut, \
+    StoreOut, VisitOut, SyncFilter, SyncOut
+from core.config import settings
 from core.jwt_tokens import create_access_token, create_refresh_token
+from core.pagination import decode_cursor, decode_sync_cursor, encode_sync_cursor
+from core.projection import parse_fields
 from schemas.user_schemas import User
 
 
@@ -20,13 +28,22 @@ async def user_login_usecase(db_session: Session, username: str, password: str):
 
     await AuthenticationEngine.validate_password(user, password)
 
+    claims = None
+    if settings.self_contained_access_tokens:
+        claims = {"role": user.role, "store_id": user.store_id, "ver": user.token_version}
+
     return {
-        "access_token": create_access_token(user_id=user.id),
+        "access_token": create_access_token(user_id=user.id, claims=claims),
         "refresh_token": create_refresh_token(user_id=user.id),
         "token_type": "bearer",
     }
 
 
+async def revoke_tokens_usecase(db_session: Session, user: User) -> None:
+    user_repo = UserRepository(db_session)
+    await user_repo.bump_token_version(user.id)
+
+
 async def create_order_usecase(db_session: Session, order: Order, user: User) -> Order:
     order_engine = OrderEngine
     await order_engine.validate_access_to_store(user, order.store_id)
@@ -38,9 +55,40 @@ async def create_order_usecase(db_session: Session, order: Order, user: User) ->
     return await order_repos.create_order(order)
 
 
-async def get_orders_usecase(db_session: Session, filters: OrderFilter, user: User) -> List[Order]:
+async def create_orders_bulk_usecase(db_session: Session, orders: List[Order], user: User) -> List[OrderBulkItem]:
+    order_engine = OrderEngine
+    worker_pairs = await order_engine.get_valid_worker_pairs(
+        db_session, {(order.worker_id, order.store_id) for order in orders}
+    )
+
+    results = [OrderBulkItem(index=index) for index in range(len(orders))]
+    valid_orders = []
+    for result, order in zip(results, orders):
+        try:
+            await order_engine.validate_access_to_store(user, order.store_id)
+            if (order.worker_id, order.store_id) not in worker_pairs:
+                raise DataValidationException(message="You cannot create an order for employee from another store")
+        except StoreVisitException as e:
+            result.message, result.error_code = e.message, e.error_code
+            continue
+
+        order.customer_id = user.id
+        order.expires_at = order.expires_at.replace(tzinfo=None)
+        valid_orders.append((result, order))
+
+    if valid_orders:
+        order_repos = OrderRepository(db_session)
+        created_orders = await order_repos.create_orders([order for _, order in valid_orders])
+        for (result, _), created_order in zip(valid_orders, created_orders):
+            result.order = created_order
+    return results
+
+
+async def get_orders_usecase(db_session: Session, filters: OrderFilter, user: User) -> List[dict]:
+    after_id = decode_cursor(filters.cursor) if filters.cursor else None
+    fields = parse_fields(filters.fields, OrderOut)
     order_repos = OrderRepository(db_session)
-    return await order_repos.get_orders(filters, user)
+    return await order_repos.get_orders(filters, user, after_id, fields)
 
 
 async def update_order_usecase(db_session: Session, order: Order) -> Order:
@@ -53,33 +101,32 @@ async def delete_order_usecase(db_session: Session, order_id: int) -> None:
     return await order_repo.delete_order(order_id)
 
 
-async def get_stores_usecase(db_session: Session, filters: StoreFilter) -> List[Store]:
+async def get_stores_usecase(db_session: Session, filters: StoreFilter) -> List[dict]:
+    fields = parse_fields(filters.fields, StoreOut)
     store_repo = StoreRepository(db_session)
-    return await store_repo.get_stores(filters)
+    return await store_repo.get_stores(filters, fields)
 
 
 async def create_visit_usecase(db_session: Session, user: User, visit: Visit) -> Visit:
-    order_repos = OrderRepository(db_session)
-    order = await order_repos.get_order_by_id(visit.order_id)
-    if order.expires_at > datetime.now():
-        raise TimeIsUpException("Order receipt time")
-
-    visit.store_id = order.store_id
-    await OrderEngine.validate_access_to_store(user, visit.store_id)
+    received_at = datetime.now()
+    visit_repo = VisitRepository(db_session)
+    order, created_visit = await visit_repo.create_visit_for_order(visit.order_id, user, received_at)
+    if created_visit:
+        return created_visit
 
-    store_repos = VisitRepository(db_session)
-    if await store_repos.get_visit_by_order_id(visit.order_id):
-        raise AccessDeniedException("You cannot create visits already in a completed order")
+    # Nothing was inserted, the order snapshot tells which check failed
+    if order.expires_at > received_at:
+        raise TimeIsUpException("Order receipt time")
+    await OrderEngine.validate_access_to_store(user, order.store_id)
     if user.id != order.customer_id:
         raise AccessDeniedException("You cannot create visits for another order(dont create order)")
+    raise AccessDeniedException("You cannot create visits already in a completed order")
 
-    visit.worker_id = order.worker_id
-    return await store_repos.create_visit(visit)
 
-
-async def get_visits_usecase(db_session: Session, filters: VisitFilter) -> List[Visit]:
+async def get_visits_usecase(db_session: Session, filters: VisitFilter) -> List[dict]:
+    fields = parse_fields(filters.fields, VisitOut)
     visit_repo = VisitRepository(db_session)
-    return await visit_repo.get_visits(filters)
+    return await visit_repo.get_visits(filters, fields)
 
 
 async def delete_visit_usecase(db_session: Session, visit_id: int) -> None:
@@ -88,6 +135,71 @@ async def delete_visit_usecase(db_session: Session, visit_id: int) -> None:
 
 
 async def update_order_status_usecase(db_session: Session, order: Order) -> Order:
+    allowed_from = OrderEngine.get_allowed_previous_statuses(order.status)
     order_repo = OrderRepository(db_session)
-    return await order_repo.update_order(order)
-
+    return await order_repo.update_order_status(order.id, order.status, allowed_from)
+
+
+def _split_changes(
+    rows: List[dict], after: Optional[Tuple[int, int]], horizon: int, limit: int
+) -> Tuple[List[dict], List[int], Tuple[int, int], bool]:
+    """Live rows, tombstone ids, the next position and whether more changes are waiting."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        position = (rows[-1]["txid"], rows[-1]["id"])
+    else:
+        # Everything before the horizon was sent, never move the position back
+        position = max(after, (horizon, 0)) if after is not None else (horizon, 0)
+
+    live, deleted_ids = [], []
+    for row in rows:
+        if row.pop("is_deleted"):
+            deleted_ids.append(row["id"])
+        else:
+            del row["txid"]
+            live.append(row)
+    return live, deleted_ids, position, has_more
+
+
+async def sync_usecase(db_session: Session, filters: SyncFilter, user: User) -> SyncOut:
+    positions: Dict[str, Tuple[int, int]] = decode_sync_cursor(filters.cursor) if filters.cursor else {}
+    sync_repo = SyncRepository(db_session)
+    horizon = await sync_repo.get_horizon()
+
+    # One extra row tells whether there are more changes
+    order_rows = await sync_repo.get_order_changes(user, positions.get("orders"), horizon, filters.limit + 1)
+    visit_rows = await sync_repo.get_visit_changes(user, positions.get("visits"), horizon, filters.limit + 1)
+
+    orders, deleted_order_ids, orders_position, orders_more = _split_changes(
+        order_rows, positions.get("orders"), horizon, filters.limit
+    )
+    visits, deleted_visit_ids, visits_position, visits_more = _split_changes(
+        visit_rows, positions.get("visits"), horizon, filters.limit
+    )
+    return SyncOut(
+        orders=orders,
+        deleted_order_ids=deleted_order_ids,
+        visits=visits,
+        deleted_visit_ids=deleted_visit_ids,
+        cursor=encode_sync_cursor({"orders": orders_position, "visits": visits_position}),
+        has_more=orders_more or visits_more,
+    )
+
+
+async def stream_order_events_usecase(user: User) -> AsyncIterator[str]:
+    """Server-Sent Events for the orders `user` is the customer or worker of, until the client leaves."""
+    subscription = order_event_hub.subscribe(user.id)
+    try:
+        # Sent right away so the client knows the stream is open
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.order_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # A comment line: keeps proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {event['event']}\ndata: {json.dumps(event.get('order', {}))}\n\n"
+    finally:
+        order_event_hub.unsubscribe(subscription)